@@ -23,8 +23,12 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 from app.db.session import Base
 from app.models.analysis import Analysis
+from app.models.blobs import Blob
 from app.models.posts import Post
+from app.models.reactions import Reaction, ReactionLogCheckpoint
 from app.models.users import User
+from app.models.verdict_cache import VerdictCache
+from app.models.verification_jobs import VerificationJob
 
 target_metadata = Base.metadata
 
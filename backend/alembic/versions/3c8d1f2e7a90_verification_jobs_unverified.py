@@ -0,0 +1,44 @@
+"""verification jobs unverified status
+
+Revision ID: 3c8d1f2e7a90
+Revises: 9b3e0f6a2d41
+Create Date: 2026-10-17 15:22:48.306114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8d1f2e7a90'
+down_revision: Union[str, Sequence[str], None] = '9b3e0f6a2d41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Jobs deferred while the LLM circuit is open must stay claimable
+    op.drop_index('ix_verification_jobs_claimable', table_name='verification_jobs')
+    op.create_index(
+        'ix_verification_jobs_claimable',
+        'verification_jobs',
+        ['status', 'next_attempt_at'],
+        unique=False,
+        postgresql_where=sa.text("status IN ('pending', 'running', 'unverified')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("UPDATE verification_jobs SET status = 'pending' WHERE status = 'unverified'")
+    op.drop_index('ix_verification_jobs_claimable', table_name='verification_jobs')
+    op.create_index(
+        'ix_verification_jobs_claimable',
+        'verification_jobs',
+        ['status', 'next_attempt_at'],
+        unique=False,
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+    )
@@ -0,0 +1,44 @@
+"""blobs
+
+Revision ID: 7e21a4c9b5d3
+Revises: 3c8d1f2e7a90
+Create Date: 2026-10-17 17:05:12.448019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e21a4c9b5d3'
+down_revision: Union[str, Sequence[str], None] = '3c8d1f2e7a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('extension', sa.String(length=8), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('unreferenced_since', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    op.create_index(
+        'ix_blobs_unreferenced',
+        'blobs',
+        ['unreferenced_since'],
+        unique=False,
+        postgresql_where=sa.text('ref_count = 0'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_blobs_unreferenced', table_name='blobs')
+    op.drop_table('blobs')
@@ -0,0 +1,28 @@
+"""verification jobs verified by
+
+Revision ID: 9b3e0f6a2d41
+Revises: 4712e12b20c9
+Create Date: 2026-10-17 13:41:05.117392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e0f6a2d41'
+down_revision: Union[str, Sequence[str], None] = '4712e12b20c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('verification_jobs', sa.Column('verified_by', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('verification_jobs', 'verified_by')
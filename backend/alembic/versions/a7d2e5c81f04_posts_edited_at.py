@@ -0,0 +1,40 @@
+"""posts edited_at
+
+Revision ID: a7d2e5c81f04
+Revises: c35f1c29db5e
+Create Date: 2026-10-17 09:41:26.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d2e5c81f04'
+down_revision: Union[str, Sequence[str], None] = 'c35f1c29db5e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable without a default, only the catalog changes
+    op.add_column('posts', sa.Column('edited_at', sa.DateTime(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_posts_edited_at',
+            'posts',
+            ['edited_at'],
+            unique=False,
+            postgresql_where=sa.text('edited_at IS NOT NULL'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_posts_edited_at', table_name='posts', postgresql_concurrently=True)
+    op.drop_column('posts', 'edited_at')
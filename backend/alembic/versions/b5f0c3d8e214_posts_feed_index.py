@@ -0,0 +1,37 @@
+"""posts feed index
+
+Revision ID: b5f0c3d8e214
+Revises: 7e21a4c9b5d3
+Create Date: 2026-10-17 21:14:37.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5f0c3d8e214'
+down_revision: Union[str, Sequence[str], None] = '7e21a4c9b5d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so posts stay writable while the index is created
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_posts_created_at_id',
+            'posts',
+            ['created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_posts_created_at_id', table_name='posts', postgresql_concurrently=True)
@@ -0,0 +1,41 @@
+"""posts and analysis indexes
+
+Revision ID: d41a7c2e9f58
+Revises: b5f0c3d8e214
+Create Date: 2026-10-17 22:03:51.337845
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a7c2e9f58'
+down_revision: Union[str, Sequence[str], None] = 'b5f0c3d8e214'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so the tables stay writable while the indexes are created
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_posts_user_id_created_at',
+            'posts',
+            ['user_id', 'created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index('ix_analysis_post_id', 'analysis', ['post_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_analysis_user_id', 'analysis', ['user_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_analysis_user_id', table_name='analysis', postgresql_concurrently=True)
+        op.drop_index('ix_analysis_post_id', table_name='analysis', postgresql_concurrently=True)
+        op.drop_index('ix_posts_user_id_created_at', table_name='posts', postgresql_concurrently=True)
@@ -0,0 +1,37 @@
+"""verdict cache
+
+Revision ID: dc7c55e7c500
+Revises: f6c7c5cb9f3d
+Create Date: 2026-10-17 10:12:41.208733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dc7c55e7c500'
+down_revision: Union[str, Sequence[str], None] = 'f6c7c5cb9f3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('verdict_cache',
+    sa.Column('text_hash', sa.String(length=64), nullable=False),
+    sa.Column('real', sa.Boolean(), nullable=False),
+    sa.Column('credibility_score', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('text_hash')
+    )
+    op.create_index(op.f('ix_verdict_cache_expires_at'), 'verdict_cache', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_verdict_cache_expires_at'), table_name='verdict_cache')
+    op.drop_table('verdict_cache')
@@ -0,0 +1,119 @@
+"""posts verdict native types
+
+Revision ID: e8b3f1a6c972
+Revises: d41a7c2e9f58
+Create Date: 2026-10-17 23:41:09.512377
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b3f1a6c972'
+down_revision: Union[str, Sequence[str], None] = 'd41a7c2e9f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows converted per transaction, each batch holds its row locks only briefly
+BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "5000"))
+
+# Same conversion as the PostRead validators this replaces: anything but
+# 'true' is false, scores that don't parse become NULL
+REAL_EXPRESSION = "lower({row}real) = 'true'"
+SCORE_EXPRESSION = (
+    "CASE WHEN {row}credibility_score ~ '^\\s*[-+]?([0-9]+\\.?[0-9]*|\\.[0-9]+)([eE][-+]?[0-9]+)?\\s*$' "
+    "THEN {row}credibility_score::double precision END"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Converting in place (ALTER COLUMN ... TYPE) rewrites the whole table under
+    # an exclusive lock. Instead new columns are filled next to the old ones,
+    # a trigger keeps rows written meanwhile in step, and the columns are
+    # swapped at the end, which only touches the catalog.
+    op.add_column('posts', sa.Column('real_new', sa.Boolean(), nullable=True))
+    op.add_column('posts', sa.Column('credibility_score_new', sa.Float(), nullable=True))
+    op.execute(
+        "CREATE FUNCTION posts_verdict_sync() RETURNS trigger AS $$ BEGIN "
+        f"NEW.real_new := {REAL_EXPRESSION.format(row='NEW.')}; "
+        f"NEW.credibility_score_new := {SCORE_EXPRESSION.format(row='NEW.')}; "
+        "RETURN NEW; END $$ LANGUAGE plpgsql"
+    )
+    op.execute(
+        "CREATE TRIGGER posts_verdict_sync BEFORE INSERT OR UPDATE OF real, credibility_score "
+        "ON posts FOR EACH ROW EXECUTE FUNCTION posts_verdict_sync()"
+    )
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        last_id = None
+        while True:
+            ids = bind.execute(
+                sa.text(
+                    "SELECT id FROM posts WHERE (CAST(:last_id AS uuid) IS NULL OR id > :last_id) "
+                    "ORDER BY id LIMIT :batch"
+                ),
+                {"last_id": last_id, "batch": BATCH_SIZE},
+            ).scalars().all()
+            if not ids:
+                break
+            bind.execute(
+                sa.text(
+                    f"UPDATE posts SET real_new = {REAL_EXPRESSION.format(row='')}, "
+                    f"credibility_score_new = {SCORE_EXPRESSION.format(row='')} "
+                    "WHERE id = ANY(CAST(:ids AS uuid[]))"
+                ),
+                {"ids": [str(i) for i in ids]},
+            )
+            last_id = ids[-1]
+
+    # Gives up instead of queuing every other query behind a long transaction
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("DROP TRIGGER posts_verdict_sync ON posts")
+    op.execute("DROP FUNCTION posts_verdict_sync()")
+    op.drop_column('posts', 'real')
+    op.drop_column('posts', 'credibility_score')
+    op.alter_column('posts', 'real_new', new_column_name='real')
+    op.alter_column('posts', 'credibility_score_new', new_column_name='credibility_score')
+
+    with op.get_context().autocommit_block():
+        # "Credible only" feed, a fraction of the posts so the index stays small
+        op.create_index(
+            'ix_posts_credible_created_at_id',
+            'posts',
+            ['created_at', 'id'],
+            unique=False,
+            postgresql_where=sa.text('real'),
+            postgresql_concurrently=True,
+        )
+        # Feed sorted by score, posts still waiting for a verdict are not ranked
+        op.create_index(
+            'ix_posts_credibility_score_id',
+            'posts',
+            ['credibility_score', 'id'],
+            unique=False,
+            postgresql_where=sa.text('credibility_score IS NOT NULL'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_posts_credibility_score_id', table_name='posts', postgresql_concurrently=True)
+        op.drop_index('ix_posts_credible_created_at_id', table_name='posts', postgresql_concurrently=True)
+    op.alter_column(
+        'posts', 'credibility_score',
+        type_=sa.String(),
+        postgresql_using='credibility_score::text',
+    )
+    op.alter_column(
+        'posts', 'real',
+        type_=sa.String(),
+        postgresql_using="CASE WHEN real THEN 'true' WHEN NOT real THEN 'false' END",
+    )
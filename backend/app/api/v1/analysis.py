@@ -1,5 +1,5 @@
 from fastapi import APIRouter,Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.analysis import AnalysisBase
 
@@ -7,7 +7,7 @@ from uuid import UUID
 from app.crud import posts
 
 # from app.api.v1.auth import get_current_user
-from app.db.session import get_db
+from app.db.session import get_async_db
 
 from app.crud import analysis as analysisCrud
 
@@ -16,22 +16,22 @@ from app.crud import analysis
 router = APIRouter(prefix="/analysis",tags=["analysis"])
 
 @router.post("/")
-def create_analysis(analysis:AnalysisBase,
+async def create_analysis(analysis:AnalysisBase,
                 # current_user: User = Depends(get_current_user),
-                db:Session = Depends(get_db)):
-    return analysisCrud.create_analysis(analysis=analysis,db=db)
+                db:AsyncSession = Depends(get_async_db)):
+    return await analysisCrud.create_analysis_async(analysis=analysis,db=db)
 
 @router.get("/{a_id}")
-def get_post(
+async def get_post(
     a_id:UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return posts.get_posts(a_id=a_id,db=db)
+    return await analysis.get_analysis_async(a_id=a_id,db=db)
 
 
 @router.delete("/{a_id}")
-def delete_post(
+async def delete_post(
     a_id:UUID,
-    db:Session=Depends(get_db)
+    db:AsyncSession=Depends(get_async_db)
 ):
-    return analysis.delete_analysis(a_id=a_id,db=db)
\ No newline at end of file
+    return await analysis.delete_analysis_async(a_id=a_id,db=db)
\ No newline at end of file
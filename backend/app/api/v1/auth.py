@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import auth_cache
 from app.crud import auth as crud_auth
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.users import User
 from app.schemas.token import Token
+from app.schemas.users import UserRead
 
 router = APIRouter(prefix="/auth")
 
@@ -16,11 +19,11 @@ unauthorized_error = "you do not have neccessary permissions"
 
 # login endpoint for getting token for login
 @router.post("/token", response_model=Token, tags=["auth"])
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = crud_auth.authenticate_user(
+    user = await crud_auth.authenticate_user_async(
         db, form_data.username, form_data.password
     )
     if not user:
@@ -33,9 +36,15 @@ def login_for_access_token(
     return {"access_token": access_token, "token_type": "bearer"}
 
 # user exchanges token for his creds
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> User:
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> UserRead:
+    """
+    The authenticated user, as a snapshot (id, email, username). Tokens seen
+    in the last AUTH_CACHE_TTL_SECONDS are answered from the auth cache,
+    without decoding the token again or querying users (the session is
+    never used then, so no connection is checked out).
+    """
     from jose import JWTError, jwt
 
     from app.core.security import ALGORITHM, SECRET_KEY
@@ -46,6 +55,11 @@ def get_current_user(
         headers={"WWW-headers": "Bearer"},
     )
 
+    key = auth_cache.token_key(token)
+    principal = auth_cache.get(key)
+    if principal is not None:
+        return principal
+
     try:
         if SECRET_KEY is not None and ALGORITHM is not None:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -53,9 +67,12 @@ def get_current_user(
 
             if user_email is None:
                 raise credentials_error
-            user = db.query(User).filter(User.email == str(user_email)).first()
+            read_generation = auth_cache.generation()
+            user = (await db.execute(select(User).where(User.email == str(user_email)))).scalars().first()
             if user is not None:
-                return user
+                principal = UserRead.model_validate(user)
+                auth_cache.put(key, principal, user.id, payload.get("exp"), read_generation)
+                return principal
             raise credentials_error
         raise Exception("unable to get env vars")
 
@@ -1,86 +1,149 @@
-from fastapi import APIRouter,Depends, Query, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter,Depends, Query, Form, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schemas.posts import PostBase, PostRead
+from app.schemas.posts import PostBase, PostPage, PostRead, ReactionCounts, ReactionCreate, VerificationStatus
 
 from uuid import UUID
-from app.models.users import User
-from app.crud import posts
+from app.schemas.users import UserRead
+from app.crud import posts, reactions
+from app.core import response_cache
+from app.core.pagination import PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT
 
 from app.api.v1.auth import get_current_user
-from app.db.session import get_db
+from app.db.session import get_async_db
 
 from app.core.image import extractTextFromImage
-from typing import List, Optional
+from typing import List, Literal, Optional
 from fastapi import FastAPI, File, UploadFile, HTTPException
 import time
+from starlette.concurrency import run_in_threadpool
 
 router = APIRouter(prefix="/posts",tags=["posts"])
 
 @router.post("/")
-def create_post(post:PostBase,
-                current_user: User = Depends(get_current_user),
-                db:Session = Depends(get_db)):
+async def create_post(post:PostBase,
+                bypass_cache: bool = Query(False, description="Always ask the LLM instead of reusing a cached verdict"),
+                current_user: UserRead = Depends(get_current_user),
+                db:AsyncSession = Depends(get_async_db)):
     # extractTextFromImage()
-    created_post = posts.create_post(post=post,db=db)
-    # Rename image file to use post ID if URL points to a file in /dest
-    if created_post.url and created_post.url.startswith("/dest/"):
-        posts.rename_image_to_post_id(created_post.url, created_post.id, db=db)
-    return created_post
+    return await posts.create_post_async(post=post,db=db,bypass_cache=bypass_cache)
+
+@router.get("/search", response_model=PostPage)
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=500, description="Words to look for in titles and contents"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    current_user: UserRead = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Posts containing any of the words, best match first (declared before /{p_id} so it is not taken for an id)"""
+    return await posts.search_posts_async(db=db, query=q, cursor=cursor, limit=limit)
 
 @router.get("/{p_id}")
-def get_post(
+async def get_post(
+    p_id:UUID,
+    request: Request,
+    current_user: UserRead = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await response_cache.respond(
+        request,
+        [response_cache.post_scope(p_id)],
+        lambda: posts.get_post_async(p_id=p_id,db=db),
+    )
+
+@router.get("/{p_id}/verification", response_model=VerificationStatus)
+async def get_post_verification(
+    p_id:UUID,
+    current_user: UserRead = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Report how far the verification of a post has got"""
+    return await posts.get_verification_status_async(p_id=p_id,db=db)
+
+@router.put("/{p_id}/reaction", response_model=ReactionCounts)
+async def react_to_post(
+    p_id:UUID,
+    reaction:ReactionCreate,
+    current_user: UserRead = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Like or dislike a post, once per user"""
+    return await reactions.react_async(post_id=p_id, user_id=current_user.id, reaction=reaction.reaction, db=db)
+
+@router.delete("/{p_id}/reaction", response_model=ReactionCounts)
+async def remove_reaction(
     p_id:UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: UserRead = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return posts.get_post(p_id=p_id,db=db)
+    """Take back the current user's like or dislike"""
+    return await reactions.remove_reaction_async(post_id=p_id, user_id=current_user.id, db=db)
 
-@router.get("/", response_model=List[PostRead])
-def get_all_posts(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+@router.get("/", response_model=PostPage)
+async def get_all_posts(
+    request: Request,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    credible: bool = Query(False, description="Only posts verified as real"),
+    sort: Literal["recent", "score", "hot"] = Query(
+        "recent",
+        description="recent: newest first, score: most credible first (verified posts only), "
+        "hot: votes, credibility and age combined (posts of the last RANK_MAX_AGE_DAYS)",
+    ),
+    current_user: UserRead = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return posts.get_posts(db=db)
+    """Newest (or most credible, or hottest) posts first, one page at a time"""
+    return await response_cache.respond(
+        request,
+        [response_cache.FEED_SCOPE],
+        lambda: posts.get_posts_async(db=db, cursor=cursor, limit=limit, credible_only=credible, sort=sort),
+    )
 
 @router.get("/user/me", response_model=List[PostRead])
-def get_my_posts(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def get_my_posts(
+    request: Request,
+    current_user: UserRead = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get all posts created by the current user"""
-    return posts.get_posts_by_user(user_id=current_user.id, db=db)
+    async def load():
+        user_posts = await posts.get_posts_by_user_async(user_id=current_user.id, db=db)
+        return [PostRead.model_validate(post) for post in user_posts]
+
+    return await response_cache.respond(request, [response_cache.user_scope(current_user.id)], load)
 
 @router.put("/{p_id}")
-def update_post(
+async def update_post(
     p_id:UUID,
     post:PostBase,
-    current_user: User = Depends(get_current_user),
-    db:Session=Depends(get_db)
+    current_user: UserRead = Depends(get_current_user),
+    db:AsyncSession=Depends(get_async_db)
 ):
-    return posts.update_post(post_id=p_id,post=post,db=db)
+    return await posts.update_post_async(post_id=p_id,post=post,db=db)
 
 @router.delete("/{p_id}")
-def delete_post(
+async def delete_post(
     p_id:UUID,
-    current_user: User = Depends(get_current_user),
-    db:Session=Depends(get_db)
+    current_user: UserRead = Depends(get_current_user),
+    db:AsyncSession=Depends(get_async_db)
 ):
-    return posts.delete_post(post_id=p_id,db=db)
+    return await posts.delete_post_async(post_id=p_id,db=db)
 
 @router.post("/upload_image")
 async def upload_image(
     file: UploadFile = File(...),
-    post_id: Optional[UUID] = Query(None, description="Optional post ID to name the file")
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return await posts.upload_image(file=file, post_id=post_id)
+    return await posts.upload_image(file=file, db=db)
 
 @router.post("/upload_image_post")
 async def upload_image_and_create_post(
     file: UploadFile = File(...),
     title: str = Form(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserRead = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Upload an image, extract text from it using OCR, and create a post.
@@ -0,0 +1,114 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+from app.core import metrics
+
+load_dotenv()
+
+# Authenticated principals by token, so a request with a token seen in the
+# last TTL seconds doesn't decode it again or look the user up. A user
+# deleted or changed through update_user/delete_user is dropped right away
+# in this process, in other processes within the TTL.
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+AUTH_CACHE_DISABLED = os.getenv("AUTH_CACHE_DISABLED", "false").lower() in ("1", "true")
+
+_lock = threading.Lock()
+# token hash -> (principal, user id, expires_at)
+_entries = OrderedDict()
+# user id -> token hashes cached for that user
+_tokens_by_user = {}
+# Incremented by every invalidation, a lookup that started before one
+# must not cache what it read
+_generation = 0
+_hits = 0
+_misses = 0
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def generation() -> int:
+    return _generation
+
+
+def _record(hit: bool):
+    global _hits, _misses
+    if hit:
+        _hits += 1
+    else:
+        _misses += 1
+    metrics.inc("auth_cache.hits" if hit else "auth_cache.misses")
+    metrics.set_gauge("auth_cache.hit_rate", _hits / (_hits + _misses))
+
+
+def _drop(key: str):
+    _, user_id, _ = _entries.pop(key)
+    keys = _tokens_by_user.get(user_id)
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del _tokens_by_user[user_id]
+
+
+def get(key: str):
+    """Cached principal for a token hash, None on a miss"""
+    if AUTH_CACHE_DISABLED:
+        return None
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[2] <= time.time():
+            _drop(key)
+            entry = None
+        if entry is not None:
+            _entries.move_to_end(key)
+    _record(entry is not None)
+    return entry[0] if entry is not None else None
+
+
+def put(key: str, principal, user_id, token_expires_at: float = None, read_generation: int = None):
+    """
+    Cache a principal until the TTL or the token's exp claim, whichever is
+    first. Skipped if a user was invalidated since `read_generation`, the
+    principal may have been read before the change.
+    """
+    if AUTH_CACHE_DISABLED:
+        return
+    expires_at = time.time() + AUTH_CACHE_TTL_SECONDS
+    if token_expires_at is not None:
+        expires_at = min(expires_at, token_expires_at)
+    with _lock:
+        if read_generation is not None and read_generation != _generation:
+            return
+        if key in _entries:
+            _drop(key)
+        _entries[key] = (principal, user_id, expires_at)
+        _tokens_by_user.setdefault(user_id, set()).add(key)
+        while len(_entries) > AUTH_CACHE_MAX_ENTRIES:
+            _drop(next(iter(_entries)))
+    metrics.set_gauge("auth_cache.entries", len(_entries))
+
+
+def invalidate_user(user_id):
+    """Forget every cached token of a user, call after the change is committed"""
+    global _generation
+    with _lock:
+        _generation += 1
+        for key in list(_tokens_by_user.get(user_id, ())):
+            _drop(key)
+    metrics.inc("auth_cache.invalidations")
+    metrics.set_gauge("auth_cache.entries", len(_entries))
+
+
+def clear():
+    global _generation
+    with _lock:
+        _generation += 1
+        _entries.clear()
+        _tokens_by_user.clear()
@@ -0,0 +1,248 @@
+import asyncio
+import os
+import re
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+from fastapi import UploadFile
+from sqlalchemy import case, delete, event, inspect, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core import metrics, renditions, storage
+from app.core.uploads import StoredUpload, save_upload
+from app.db.session import SessionLocal
+from app.models.blobs import Blob
+from app.models.posts import Post
+
+load_dotenv()
+
+# Blobs are stored under the key <sha[:2]>/<sha[2:4]>/<sha><ext> in the storage
+# backend. Uploads in progress always go to a local temp dir, which for the
+# local backend sits on the same filesystem so placing a blob is a rename.
+TMP_DIR = Path(os.getenv("UPLOAD_TMP_DIR", str(storage.STORAGE_LOCAL_ROOT / ".tmp")))
+# Unreferenced blobs (and stray temp files) are kept this long, so an image
+# uploaded through /upload_image can still be attached to a post
+BLOB_GC_GRACE_SECONDS = float(os.getenv("BLOB_GC_GRACE_SECONDS", "3600"))
+BLOB_GC_INTERVAL_SECONDS = float(os.getenv("BLOB_GC_INTERVAL_SECONDS", "600"))
+# Blobs deleted per transaction, and transactions per GC run
+BLOB_GC_BATCH_SIZE = int(os.getenv("BLOB_GC_BATCH_SIZE", "500"))
+BLOB_GC_MAX_BATCHES = int(os.getenv("BLOB_GC_MAX_BATCHES", "20"))
+
+_blob_url = re.compile(r"^/dest/[0-9a-f]{2}/[0-9a-f]{2}/(?P<sha>[0-9a-f]{64})\.[a-z]+$")
+
+
+class BlobMissingError(Exception):
+    """A post points at a blob that does not exist (never uploaded or already collected)"""
+
+
+def blob_key(sha256: str, extension: str) -> str:
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+
+def blob_url(sha256: str, extension: str) -> str:
+    return f"/dest/{blob_key(sha256, extension)}"
+
+
+def sha256_from_url(url: str):
+    """Return the blob hash a post url points at, or None for external or legacy urls"""
+    match = _blob_url.match(url or "")
+    return match.group("sha") if match else None
+
+
+def key_from_url(url: str) -> str:
+    """Storage key behind a blob url"""
+    return blob_key(sha256_from_url(url), Path(url).suffix)
+
+
+def _record_statement(sha256: str, extension: str, size: int):
+    """Upsert of the blob row, returning the extension the blob is stored under"""
+    now = datetime.utcnow()
+    stmt = insert(Blob).values(
+        sha256=sha256,
+        extension=extension,
+        size=size,
+        ref_count=0,
+        unreferenced_since=now,
+        created_at=now,
+    )
+    # Uploading an unreferenced blob again restarts its grace period.
+    # Waits for the GC if it is deleting this very blob, then recreates it.
+    return stmt.on_conflict_do_update(
+        index_elements=[Blob.sha256],
+        set_={"unreferenced_since": case((Blob.ref_count == 0, now), else_=None)},
+    ).returning(Blob.extension)
+
+
+def _put(temp_path: Path, sha256: str, extension: str):
+    """Hand the temp file to the storage backend, unless the blob is already stored"""
+    backend = storage.get_backend()
+    key = blob_key(sha256, extension)
+    if backend.exists(key):
+        temp_path.unlink(missing_ok=True)
+        metrics.inc("blobs.deduplicated")
+    else:
+        with metrics.timer(f"storage.{backend.name}.put_seconds"):
+            backend.put_file(key, temp_path)
+        metrics.inc("blobs.stored")
+
+
+async def receive_upload(file: UploadFile) -> StoredUpload:
+    """Stream an uploaded image to a local temp file (hashed and sniffed on the way)"""
+    return await save_upload(file, TMP_DIR)
+
+
+async def place_upload(stored: StoredUpload, db: AsyncSession) -> str:
+    """
+    Record a received upload and move it into content-addressed storage, return its url.
+    Idempotent: the same bytes always end up under the same key and url.
+    The temp file is gone afterwards, whether this succeeds or not.
+    """
+    try:
+        try:
+            extension = (await db.execute(_record_statement(stored.sha256, stored.extension, stored.size))).scalar_one()
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        await run_in_threadpool(_put, stored.path, stored.sha256, extension)
+    except BaseException:
+        stored.path.unlink(missing_ok=True)
+        raise
+    return blob_url(stored.sha256, extension)
+
+
+async def store_upload(file: UploadFile, db: AsyncSession) -> str:
+    """Stream an uploaded image into content-addressed storage and return its url"""
+    return await place_upload(await receive_upload(file), db)
+
+
+# Reference counting, kept in the same transaction as the post change. As ORM
+# events they also cover posts deleted through the User cascade.
+
+def _add_reference(connection, sha256: str):
+    result = connection.execute(
+        update(Blob)
+        .where(Blob.sha256 == sha256)
+        .values(ref_count=Blob.ref_count + 1, unreferenced_since=None)
+    )
+    if result.rowcount == 0:
+        raise BlobMissingError(sha256)
+
+
+def _drop_reference(connection, sha256: str):
+    connection.execute(
+        update(Blob)
+        .where(Blob.sha256 == sha256)
+        .values(
+            ref_count=Blob.ref_count - 1,
+            unreferenced_since=case((Blob.ref_count == 1, datetime.utcnow()), else_=None),
+        )
+    )
+
+
+@event.listens_for(Post, "after_insert")
+def _post_inserted(mapper, connection, post):
+    sha256 = sha256_from_url(post.url)
+    if sha256:
+        _add_reference(connection, sha256)
+
+
+@event.listens_for(Post, "after_update")
+def _post_updated(mapper, connection, post):
+    history = inspect(post).attrs.url.history
+    if not history.has_changes():
+        return
+    for url in history.deleted:
+        sha256 = sha256_from_url(url)
+        if sha256:
+            _drop_reference(connection, sha256)
+    for url in history.added:
+        sha256 = sha256_from_url(url)
+        if sha256:
+            _add_reference(connection, sha256)
+
+
+@event.listens_for(Post, "after_delete")
+def _post_deleted(mapper, connection, post):
+    sha256 = sha256_from_url(post.url)
+    if sha256:
+        _drop_reference(connection, sha256)
+
+
+def collect_garbage(db: Session, grace_seconds: float = BLOB_GC_GRACE_SECONDS, batch_size: int = BLOB_GC_BATCH_SIZE) -> int:
+    """
+    Delete one batch of blobs that have been unreferenced for longer than the
+    grace period, oldest first. Only the partial index over ref_count = 0 is
+    read, never a listing of the storage backend. Returns the number of blobs deleted.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    try:
+        rows = db.execute(
+            select(Blob.sha256, Blob.extension)
+            .where(Blob.ref_count == 0, Blob.unreferenced_since < cutoff)
+            .order_by(Blob.unreferenced_since)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            db.rollback()
+            return 0
+
+        # Objects go first while the rows are locked: an upload of the same
+        # content waits on the lock and then finds neither row nor object
+        backend = storage.get_backend()
+        for row in rows:
+            renditions.delete_all(row.sha256)
+            backend.delete(blob_key(row.sha256, row.extension))
+        db.execute(delete(Blob).where(Blob.sha256.in_([row.sha256 for row in rows])))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    metrics.inc("blobs.collected", len(rows))
+    return len(rows)
+
+
+def sweep_temp_files(grace_seconds: float = BLOB_GC_GRACE_SECONDS) -> int:
+    """Remove uploads abandoned mid-way (crash, killed worker), only TMP_DIR is listed"""
+    if not TMP_DIR.exists():
+        return 0
+    cutoff = time.time() - grace_seconds
+    removed = 0
+    with os.scandir(TMP_DIR) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                Path(entry.path).unlink(missing_ok=True)
+                removed += 1
+    return removed
+
+
+def collect():
+    """One GC run with its own session: at most BLOB_GC_MAX_BATCHES batches, then stray temp files"""
+    db = SessionLocal()
+    try:
+        collected = 0
+        for _ in range(BLOB_GC_MAX_BATCHES):
+            deleted = collect_garbage(db)
+            collected += deleted
+            if deleted < BLOB_GC_BATCH_SIZE:
+                break
+        swept = sweep_temp_files()
+        if collected or swept:
+            print(f"Blob GC removed {collected} blobs and {swept} temp files")
+    except Exception as e:
+        print(f"Error collecting blobs: {e}")
+    finally:
+        db.close()
+
+
+async def collect_periodically():
+    while True:
+        await run_in_threadpool(collect)
+        await asyncio.sleep(BLOB_GC_INTERVAL_SECONDS)
@@ -1,16 +1,126 @@
+import os
+import threading
+import time
+
 from PIL import Image
 import pytesseract
 from pathlib import Path
+from dotenv import load_dotenv
+
+from app.core.preprocess import preprocess
+
+load_dotenv()
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# "auto" uses tesserocr when it is installed and falls back to pytesseract
+OCR_ENGINE = os.getenv("OCR_ENGINE", "auto").lower()
+# Tesseract language(s), e.g. "eng" or "eng+hin"
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+# Tesseract page segmentation mode (3 = fully automatic page segmentation)
+OCR_PSM = int(os.getenv("OCR_PSM", "3"))
+
+
+class OCRTimeoutError(Exception):
+    """Raised when recognition runs past its deadline"""
 
-def extractTextFromImage(image_path: str) -> str:
+
+class OCREngine:
     """
-    Extract text from an image using OCR.
-    
-    Args:
-        image_path: Path to the image file
-        
+    Turns a decoded image into text.
+    One engine lives per process and is reused for every image.
+    """
+
+    name = "base"
+
+    def __init__(self, lang: str = OCR_LANG, psm: int = OCR_PSM):
+        self.lang = lang
+        self.psm = psm
+
+    def image_to_text(self, image: Image.Image, timeout: float = 0) -> str:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PytesseractEngine(OCREngine):
+    """Runs the tesseract binary once per image (writes temp files, reloads the models every time)"""
+
+    name = "pytesseract"
+
+    def image_to_text(self, image: Image.Image, timeout: float = 0) -> str:
+        try:
+            return pytesseract.image_to_string(image, lang=self.lang, config=f"--psm {self.psm}", timeout=timeout)
+        except RuntimeError as e:
+            # pytesseract kills tesseract and raises RuntimeError on timeout
+            if "timeout" in str(e).lower():
+                raise OCRTimeoutError(str(e))
+            raise
+
+
+class TesserocrEngine(OCREngine):
+    """
+    Keeps a libtesseract instance initialized in memory and hands it the
+    image buffer directly, so neither the process start, the temp files nor
+    the language model loading is paid per image.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang: str = OCR_LANG, psm: int = OCR_PSM):
+        super().__init__(lang, psm)
+        self._api = tesserocr.PyTessBaseAPI(lang=lang, psm=psm)
+        # The API object is not thread-safe
+        self._lock = threading.Lock()
+
+    def image_to_text(self, image: Image.Image, timeout: float = 0) -> str:
+        with self._lock:
+            self._api.SetImage(image)
+            try:
+                # Recognize() returns False when the deadline was hit
+                if not self._api.Recognize(timeout=int(timeout * 1000)):
+                    raise OCRTimeoutError("Tesseract recognition timeout")
+                return self._api.GetUTF8Text()
+            finally:
+                self._api.Clear()
+
+    def close(self):
+        with self._lock:
+            self._api.End()
+
+
+def create_engine(name: str = OCR_ENGINE, lang: str = OCR_LANG, psm: int = OCR_PSM) -> OCREngine:
+    if name == "tesserocr" or (name == "auto" and tesserocr is not None):
+        if tesserocr is None:
+            raise RuntimeError("OCR_ENGINE=tesserocr but the tesserocr package is not installed")
+        return TesserocrEngine(lang, psm)
+    return PytesseractEngine(lang, psm)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> OCREngine:
+    """Return this process's OCR engine, creating (and loading the models of) it on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine()
+    return _engine
+
+
+def ocr_image(image_path: str, timeout: float = 0, steps: list = None) -> tuple:
+    """
+    Preprocess and OCR the image at `image_path`.
+
     Returns:
-        Extracted text as a string
+        (extracted text, {step name: seconds} for preprocessing and "ocr")
     """
     img_path = Path(image_path)
     if not img_path.exists():
@@ -20,7 +130,26 @@ def extractTextFromImage(image_path: str) -> str:
     if img is None:
         raise ValueError("Failed to open image file.")
 
+    img, timings = preprocess(img, steps)
+
     # Extract text using OCR
-    text = pytesseract.image_to_string(img)
-    
-    return text.strip() if text else ""
\ No newline at end of file
+    start = time.perf_counter()
+    text = get_engine().image_to_text(img, timeout=timeout)
+    timings["ocr"] = time.perf_counter() - start
+
+    return (text.strip() if text else ""), timings
+
+
+def extractTextFromImage(image_path: str, timeout: float = 0) -> str:
+    """
+    Extract text from an image using OCR.
+
+    Args:
+        image_path: Path to the image file
+        timeout: Seconds after which recognition is aborted (0 means no limit)
+
+    Returns:
+        Extracted text as a string
+    """
+    text, _ = ocr_image(image_path, timeout=timeout)
+    return text
@@ -0,0 +1,198 @@
+import asyncio
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.verdict_cache import normalize_text
+from app.core.verification import verification_text
+from app.db.session import SessionLocal
+from app.models.posts import Post
+from app.models.verification_jobs import VerificationJob
+
+load_dotenv()
+
+# The scorer only answers once it has seen at least this many LLM verdicts
+LOCAL_SCORER_MIN_SAMPLES = int(os.getenv("LOCAL_SCORER_MIN_SAMPLES", "200"))
+LOCAL_SCORER_MAX_SAMPLES = int(os.getenv("LOCAL_SCORER_MAX_SAMPLES", "200000"))
+LOCAL_SCORER_RETRAIN_SECONDS = float(os.getenv("LOCAL_SCORER_RETRAIN_SECONDS", "3600"))
+
+# Size of the hashed feature space (unigrams and bigrams)
+N_FEATURES = 1 << 18
+
+_token = re.compile(r"[0-9a-z]+")
+
+
+def _tokens(text: str) -> list:
+    words = _token.findall(normalize_text(text))
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _hash(token: str) -> int:
+    return zlib.crc32(token.encode("utf-8")) & (N_FEATURES - 1)
+
+
+class _SparseRows:
+    """Minimal CSR matrix: row i owns indices/values[indptr[i]:indptr[i + 1]]"""
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, values: np.ndarray):
+        self.indptr = indptr
+        self.indices = indices
+        self.values = values
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    def row_ids(self) -> np.ndarray:
+        return np.repeat(np.arange(self.n_rows), np.diff(self.indptr))
+
+    def dot(self, weights: np.ndarray) -> np.ndarray:
+        """X @ weights"""
+        products = weights[self.indices] * self.values
+        return np.bincount(self.row_ids(), weights=products, minlength=self.n_rows)
+
+    def transpose_dot(self, vector: np.ndarray) -> np.ndarray:
+        """X.T @ vector"""
+        return np.bincount(self.indices, weights=self.values * vector[self.row_ids()], minlength=N_FEATURES)
+
+
+def _term_counts(texts: list) -> _SparseRows:
+    indptr, indices, values = [0], [], []
+    for text in texts:
+        features, counts = np.unique(
+            np.fromiter((_hash(t) for t in _tokens(text)), dtype=np.int64), return_counts=True
+        )
+        indices.append(features)
+        values.append(counts.astype(np.float64))
+        indptr.append(indptr[-1] + len(features))
+    return _SparseRows(
+        np.array(indptr, dtype=np.int64),
+        np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+        np.concatenate(values) if values else np.zeros(0, dtype=np.float64),
+    )
+
+
+class LocalScorer:
+    """
+    Cheap credibility model: logistic regression over hashed TF-IDF unigrams
+    and bigrams, trained on verdicts the LLM already produced. Everything is
+    vectorized with NumPy, no network and no extra dependencies.
+
+    score() returns the probability that the text is credible, in [0, 1].
+    """
+
+    def __init__(self):
+        self.weights = None
+        self.bias = 0.0
+        self.idf = None
+        self.n_samples = 0
+
+    @property
+    def trained(self) -> bool:
+        return self.weights is not None and self.n_samples >= LOCAL_SCORER_MIN_SAMPLES
+
+    def _tfidf(self, texts: list) -> _SparseRows:
+        rows = _term_counts(texts)
+        rows.values = (1 + np.log(rows.values)) * self.idf[rows.indices]
+        # L2-normalize each row
+        norms = np.sqrt(np.bincount(rows.row_ids(), weights=rows.values ** 2, minlength=rows.n_rows))
+        rows.values = rows.values / np.maximum(norms, 1e-12)[rows.row_ids()]
+        return rows
+
+    def fit(self, texts: list, targets: np.ndarray, epochs: int = 150, learning_rate: float = 0.3, l2: float = 1e-5):
+        """
+        Fit on texts and targets in [0, 1] (credibility_score / 100).
+        Full-batch Adam, the per-feature step sizes suit the very sparse hashed features.
+        """
+        targets = np.asarray(targets, dtype=np.float64)
+        counts = _term_counts(texts)
+        document_frequency = np.bincount(counts.indices, minlength=N_FEATURES)
+        self.idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1
+        rows = self._tfidf(texts)
+
+        # weights[-1] is the bias
+        weights = np.zeros(N_FEATURES + 1)
+        first_moment = np.zeros_like(weights)
+        second_moment = np.zeros_like(weights)
+        beta1, beta2 = 0.9, 0.999
+        for step in range(1, epochs + 1):
+            predictions = 1 / (1 + np.exp(-(rows.dot(weights[:-1]) + weights[-1])))
+            error = predictions - targets
+            gradient = np.append(rows.transpose_dot(error) / len(texts), error.mean())
+            gradient[:-1] += l2 * weights[:-1]
+
+            first_moment = beta1 * first_moment + (1 - beta1) * gradient
+            second_moment = beta2 * second_moment + (1 - beta2) * gradient ** 2
+            corrected_first = first_moment / (1 - beta1 ** step)
+            corrected_second = second_moment / (1 - beta2 ** step)
+            weights -= learning_rate * corrected_first / (np.sqrt(corrected_second) + 1e-8)
+
+        self.weights = weights[:-1]
+        self.bias = float(weights[-1])
+        self.n_samples = len(texts)
+        return self
+
+    def score(self, texts: list) -> np.ndarray:
+        if self.weights is None:
+            raise RuntimeError("local scorer is not trained")
+        rows = self._tfidf(texts)
+        return 1 / (1 + np.exp(-(rows.dot(self.weights) + self.bias)))
+
+
+_scorer = LocalScorer()
+_scorer_lock = threading.Lock()
+
+
+def get_scorer() -> LocalScorer:
+    return _scorer
+
+
+def train_from_db(db: Session) -> LocalScorer:
+    """
+    Train a new scorer on the most recent LLM verdicts and swap it in.
+    Verdicts from caches, near-duplicates or the local tier itself are left out
+    so the model never learns from its own output.
+    """
+    global _scorer
+    rows = (
+        db.query(Post.title, Post.content, Post.url, Post.credibility_score)
+        .join(VerificationJob, VerificationJob.post_id == Post.id)
+        .filter(VerificationJob.status == "done", VerificationJob.verified_by == "llm")
+        .order_by(VerificationJob.updated_at.desc())
+        .limit(LOCAL_SCORER_MAX_SAMPLES)
+        .all()
+    )
+    scorer = LocalScorer()
+    if len(rows) >= LOCAL_SCORER_MIN_SAMPLES:
+        texts = [verification_text(row) for row in rows]
+        targets = np.clip(np.array([row.credibility_score for row in rows], dtype=float) / 100, 0.0, 1.0)
+        scorer.fit(texts, targets)
+
+    with _scorer_lock:
+        _scorer = scorer
+    return scorer
+
+
+def retrain():
+    """Retrain with its own session, meant to run in the background"""
+    db = SessionLocal()
+    try:
+        scorer = train_from_db(db)
+        print(f"Local scorer trained on {scorer.n_samples} verdicts")
+    except Exception as e:
+        print(f"Error training local scorer: {e}")
+    finally:
+        db.close()
+
+
+async def retrain_periodically():
+    """Train on startup, then every LOCAL_SCORER_RETRAIN_SECONDS"""
+    while True:
+        await run_in_threadpool(retrain)
+        await asyncio.sleep(LOCAL_SCORER_RETRAIN_SECONDS)
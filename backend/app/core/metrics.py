@@ -0,0 +1,105 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Simple in-process metrics registry.
+# Counters only ever go up, gauges hold the last value that was set and
+# histograms count observations (usually latencies in seconds) per bucket.
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_gauges = {}
+_histograms = {}
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def to_dict(self) -> dict:
+        cumulative, buckets = 0, {}
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+
+def inc(name: str, value: int = 1):
+    """Increment a counter by `value`"""
+    with _lock:
+        _counters[name] += value
+
+
+def set_gauge(name: str, value: float):
+    """Set a gauge to `value`"""
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name: str, value: float, buckets=DEFAULT_BUCKETS):
+    """Record `value` in a histogram, buckets are fixed by the first observation"""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = _Histogram(buckets)
+        histogram.observe(value)
+
+
+@contextmanager
+def timer(name: str):
+    """Observe the wall time of the wrapped block, in seconds"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def get_counter(name: str) -> int:
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def snapshot() -> dict:
+    """
+    Return a copy of every metric currently recorded.
+
+    Returns:
+        {
+          "counters": {name: int},
+          "gauges": {name: float},
+          "histograms": {name: {"count", "sum", "max", "buckets": {upper bound: cumulative count}}}
+        }
+    """
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "histograms": {name: h.to_dict() for name, h in _histograms.items()},
+        }
+
+
+def reset():
+    """Clear every metric (mainly useful for scripts and benchmarks)"""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
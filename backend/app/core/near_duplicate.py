@@ -0,0 +1,318 @@
+import os
+import re
+import threading
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.verdict_cache import normalize_text
+from app.core.verification import verification_text
+from app.db.session import SessionLocal
+from app.models.posts import Post
+
+load_dotenv()
+
+# Minimum estimated Jaccard similarity of the character shingles for a verdict to be reused
+NEAR_DUP_SIMILARITY = float(os.getenv("NEAR_DUP_SIMILARITY", "0.7"))
+NEAR_DUP_DISABLED = os.getenv("NEAR_DUP_DISABLED", "false").lower() in ("1", "true")
+# Character shingle length, short shingles keep single OCR errors from touching many features
+SHINGLE_SIZE = 4
+# LSH layout: BANDS bands of ROWS MinHash values each. Two texts with Jaccard
+# similarity J share at least one band with probability 1 - (1 - J**ROWS)**BANDS,
+# about 0.99 at J = 0.7 and 0.12 at J = 0.3 (candidates below the threshold are
+# then rejected on their estimated similarity).
+BANDS = 16
+ROWS = 4
+NUM_PERM = BANDS * ROWS
+
+_non_alnum = re.compile(r"[^0-9a-z ]+")
+_spaces = re.compile(r" +")
+# Fixed seed: signatures must stay comparable across processes and restarts
+_rng = np.random.default_rng(20251109)
+# Multiply-shift hash family, one (odd a, b) pair per permutation
+_perm_a = _rng.integers(1, 1 << 63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_perm_b = _rng.integers(0, 1 << 63, size=NUM_PERM, dtype=np.uint64)
+_band_mix = _rng.integers(1, 1 << 63, size=ROWS, dtype=np.uint64) | np.uint64(1)
+_shingle_weights = np.array([1 << (8 * i) for i in reversed(range(SHINGLE_SIZE))], dtype=np.uint32)
+
+
+def _shingles(text: str) -> np.ndarray:
+    """
+    Distinct character shingles of the normalized text. After normalization the
+    text is plain ASCII, so a 4-character shingle packs exactly into a uint32.
+    """
+    text = _spaces.sub(" ", _non_alnum.sub(" ", normalize_text(text))).strip()
+    data = np.frombuffer(text.ljust(SHINGLE_SIZE).encode("ascii"), dtype=np.uint8).astype(np.uint32)
+    windows = np.lib.stride_tricks.sliding_window_view(data, SHINGLE_SIZE)
+    return np.unique(windows @ _shingle_weights)
+
+
+def minhash(text: str) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint32 values) of the character shingles of `text`"""
+    shingles = _shingles(text).astype(np.uint64)
+    # uint64 arithmetic wraps, the high 32 bits are the hash value
+    permuted = (np.outer(shingles, _perm_a) + _perm_b) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """Collapse each band of ROWS values into one uint32 key, works on one or many signatures"""
+    rows = signatures.reshape(signatures.shape[:-1] + (BANDS, ROWS)).astype(np.uint64)
+    return ((rows * _band_mix).sum(axis=-1) >> np.uint64(32)).astype(np.uint32)
+
+
+def compact(signatures: np.ndarray) -> np.ndarray:
+    """
+    Keep the lowest 8 bits of every MinHash value (b-bit minwise hashing).
+    64 bytes per post is enough to estimate similarity between LSH candidates.
+    """
+    return (signatures & 0xFF).astype(np.uint8)
+
+
+def estimate_similarity(compact_a: np.ndarray, compact_b: np.ndarray) -> np.ndarray:
+    # Unrelated values still collide on 8 bits 1/256 of the time, correct for it
+    matches = (compact_a == compact_b).mean(axis=-1)
+    return np.clip((matches - 1 / 256) / (1 - 1 / 256), 0.0, 1.0)
+
+
+class LSHIndex:
+    """
+    MinHash LSH index answering "most similar entry above `threshold`".
+
+    Each band keeps a sorted NumPy array of keys (binary searched) plus a small
+    dict of recent inserts that is merged into the array once it grows past
+    `merge_threshold`, so inserts stay cheap and lookups stay O(BANDS log n).
+    Candidates are confirmed with their compact signatures, kept in one
+    contiguous array so memory stays flat at millions of entries.
+
+    Thread-safe.
+    """
+
+    def __init__(self, threshold: float, merge_threshold: int = 50_000):
+        self.threshold = threshold
+        self.merge_threshold = merge_threshold
+
+        self._compact = np.zeros((1024, NUM_PERM), dtype=np.uint8)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._payloads = []
+        self._positions = {}
+        self._size = 0
+
+        self._sorted_keys = [np.zeros(0, dtype=np.uint32) for _ in range(BANDS)]
+        self._sorted_positions = [np.zeros(0, dtype=np.int64) for _ in range(BANDS)]
+        self._recent = [dict() for _ in range(BANDS)]
+        self._recent_count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._positions)
+
+    def _reserve(self, count: int):
+        capacity = len(self._alive)
+        if self._size + count <= capacity:
+            return
+        while self._size + count > capacity:
+            capacity *= 2
+        compact_sigs = np.zeros((capacity, NUM_PERM), dtype=np.uint8)
+        compact_sigs[:self._size] = self._compact[:self._size]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._compact, self._alive = compact_sigs, alive
+
+    def _append(self, keys: list, signatures: np.ndarray, payloads: list) -> int:
+        self._reserve(len(keys))
+        start = self._size
+        end = start + len(keys)
+        self._compact[start:end] = compact(signatures)
+        self._alive[start:end] = True
+        for offset, (key, payload) in enumerate(zip(keys, payloads)):
+            old = self._positions.get(key)
+            if old is not None:
+                self._alive[old] = False
+            self._positions[key] = start + offset
+            self._payloads.append((key, payload))
+        self._size = end
+        return start
+
+    def _merge(self):
+        """Fold the recent inserts into the sorted band arrays"""
+        for band in range(BANDS):
+            recent = self._recent[band]
+            if not recent:
+                continue
+            keys = np.array([k for k, positions in recent.items() for _ in positions], dtype=np.uint32)
+            positions = np.array([p for positions in recent.values() for p in positions], dtype=np.int64)
+            self._insert_sorted(band, keys, positions)
+            recent.clear()
+        self._recent_count = 0
+
+    def _insert_sorted(self, band: int, keys: np.ndarray, positions: np.ndarray):
+        all_keys = np.concatenate([self._sorted_keys[band], keys])
+        all_positions = np.concatenate([self._sorted_positions[band], positions])
+        order = np.argsort(all_keys, kind="stable")
+        self._sorted_keys[band] = all_keys[order]
+        self._sorted_positions[band] = all_positions[order]
+
+    def add(self, key, signature: np.ndarray, payload=None):
+        """Insert or replace the entry stored under `key`"""
+        with self._lock:
+            pos = self._append([key], signature[np.newaxis, :], [payload])
+            for band, band_key in enumerate(band_keys(signature).tolist()):
+                self._recent[band].setdefault(band_key, []).append(pos)
+            self._recent_count += 1
+            if self._recent_count >= self.merge_threshold:
+                self._merge()
+
+    def add_many(self, keys: list, signatures: np.ndarray, payloads: list = None):
+        """Bulk insert, used when (re)building the index"""
+        payloads = payloads if payloads is not None else [None] * len(keys)
+        if not keys:
+            return
+        with self._lock:
+            start = self._append(keys, signatures, payloads)
+            positions = np.arange(start, start + len(keys), dtype=np.int64)
+            all_band_keys = band_keys(signatures)
+            for band in range(BANDS):
+                self._insert_sorted(band, all_band_keys[:, band], positions)
+
+    def remove(self, key):
+        with self._lock:
+            pos = self._positions.pop(key, None)
+            if pos is not None:
+                self._alive[pos] = False
+
+    def nearest(self, signature: np.ndarray):
+        """
+        Return (key, payload, similarity) of the most similar live entry at or
+        above the threshold, or None.
+        """
+        with self._lock:
+            candidates = []
+            for band, band_key in enumerate(band_keys(signature)):
+                # band_key stays a np.uint32 so searchsorted does not cast the whole array
+                sorted_keys = self._sorted_keys[band]
+                lo = sorted_keys.searchsorted(band_key, side="left")
+                hi = sorted_keys.searchsorted(band_key, side="right")
+                if hi > lo:
+                    candidates.append(self._sorted_positions[band][lo:hi])
+                recent = self._recent[band].get(int(band_key))
+                if recent:
+                    candidates.append(np.array(recent, dtype=np.int64))
+            if not candidates:
+                return None
+
+            positions = np.unique(np.concatenate(candidates))
+            positions = positions[self._alive[positions]]
+            if len(positions) == 0:
+                return None
+
+            similarities = estimate_similarity(self._compact[positions], compact(signature))
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            key, payload = self._payloads[positions[best]]
+            return key, payload, float(similarities[best])
+
+
+_index = LSHIndex(NEAR_DUP_SIMILARITY)
+# While a rebuild runs, changes are also recorded here and replayed on the new index
+_changes_during_rebuild = None
+_rebuild_lock = threading.Lock()
+
+
+def add_post(post_id, news_text: str, verdict: dict):
+    """Index a post whose verdict is known so later near-duplicates can reuse it"""
+    if NEAR_DUP_DISABLED or not verdict.get("verified", True):
+        return
+    signature = minhash(news_text)
+    payload = (bool(verdict["real"]), float(verdict["credibility_score"]))
+    with _rebuild_lock:
+        _index.add(post_id, signature, payload)
+        if _changes_during_rebuild is not None:
+            _changes_during_rebuild.append((post_id, signature, payload))
+
+
+def remove_post(post_id):
+    with _rebuild_lock:
+        _index.remove(post_id)
+        if _changes_during_rebuild is not None:
+            _changes_during_rebuild.append((post_id, None, None))
+
+
+def find_verdict(news_text: str):
+    """
+    Look for an already verified post that is a near-duplicate of `news_text`.
+
+    Returns:
+        A verdict dict (same structure as check_news_authenticity, plus
+        "near_duplicate_of" and "similarity"), or None
+    """
+    if NEAR_DUP_DISABLED:
+        return None
+
+    match = _index.nearest(minhash(news_text))
+    if match is None:
+        metrics.inc("near_dup.misses")
+        return None
+
+    post_id, (real, credibility_score), similarity = match
+    metrics.inc("near_dup.hits")
+    return {
+        "real": real,
+        "credibility_score": credibility_score,
+        "verified": True,
+        "near_duplicate_of": post_id,
+        "similarity": similarity,
+    }
+
+
+def rebuild_from_db(db: Session) -> int:
+    """Rebuild the index from every verified post, returns the number indexed"""
+    global _index, _changes_during_rebuild
+    with _rebuild_lock:
+        _changes_during_rebuild = []
+
+    try:
+        index = LSHIndex(NEAR_DUP_SIMILARITY)
+        query = (
+            db.query(Post.id, Post.title, Post.content, Post.url, Post.real, Post.credibility_score)
+            .filter(Post.real.isnot(None), Post.credibility_score.isnot(None))
+            .execution_options(yield_per=10_000)
+        )
+
+        keys, signatures, payloads = [], [], []
+        for row in query:
+            keys.append(row.id)
+            signatures.append(minhash(verification_text(row)))
+            payloads.append((row.real, row.credibility_score))
+        # One bulk insert so each band array is sorted once
+        if keys:
+            index.add_many(keys, np.stack(signatures), payloads)
+
+        with _rebuild_lock:
+            for post_id, signature, payload in _changes_during_rebuild:
+                if signature is None:
+                    index.remove(post_id)
+                else:
+                    index.add(post_id, signature, payload)
+            _index = index
+    finally:
+        with _rebuild_lock:
+            _changes_during_rebuild = None
+
+    metrics.set_gauge("near_dup.indexed_posts", len(index))
+    return len(index)
+
+
+def rebuild():
+    """Rebuild the index with its own session, meant to run in the background on startup"""
+    db = SessionLocal()
+    try:
+        count = rebuild_from_db(db)
+        print(f"Near-duplicate index rebuilt with {count} posts")
+    except Exception as e:
+        print(f"Error rebuilding near-duplicate index: {e}")
+    finally:
+        db.close()
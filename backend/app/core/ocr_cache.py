@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+from dotenv import load_dotenv
+
+from app.core import metrics
+from app.core.preprocess import exif_transpose
+
+load_dotenv()
+
+OCR_CACHE_DISABLED = os.getenv("OCR_CACHE_DISABLED", "false").lower() in ("1", "true")
+OCR_CACHE_MAX_ENTRIES = int(os.getenv("OCR_CACHE_MAX_ENTRIES", "50000"))
+OCR_CACHE_TTL_SECONDS = float(os.getenv("OCR_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Max differing bits (out of HASH_BITS) for two images to count as the same screenshot.
+# Recompressed/resized copies of a screenshot stay around 12 bits apart,
+# different screenshots with the same layout are 60+ bits apart.
+OCR_CACHE_MAX_DISTANCE = int(os.getenv("OCR_CACHE_MAX_DISTANCE", "24"))
+
+# pHash over the 16x16 lowest DCT frequencies of a 64x64 thumbnail. The
+# classic 8x8 (64 bit) pHash cannot tell apart two news screenshots that
+# share an app layout, they end up a handful of bits apart.
+HASH_SIZE = 16
+HASH_BITS = HASH_SIZE * HASH_SIZE
+_THUMBNAIL_SIZE = 64
+_WORDS = HASH_BITS // 64
+
+
+def perceptual_hash(image_path: str) -> np.ndarray:
+    """pHash of the image as HASH_BITS / 64 uint64 words"""
+    image = Image.open(image_path)
+    # JPEGs are decoded straight at a reduced scale, much cheaper than a full decode
+    image.draft("L", (_THUMBNAIL_SIZE * 2, _THUMBNAIL_SIZE * 2))
+    image = exif_transpose(image).convert("L").resize((_THUMBNAIL_SIZE, _THUMBNAIL_SIZE), Image.Resampling.BOX)
+
+    frequencies = cv2.dct(np.asarray(image, dtype=np.float32))[:HASH_SIZE, :HASH_SIZE].flatten()
+    bits = frequencies > np.median(frequencies)
+    return np.packbits(bits).view(">u8").astype(np.uint64)
+
+
+class PerceptualCache:
+    """
+    Bounded map of perceptual hash -> OCR text, answering for any stored hash
+    within `max_distance` bits.
+
+    Entries live in a fixed-size ring (the oldest is overwritten when full)
+    and expire after `ttl` seconds. Lookups are a brute-force XOR/popcount
+    over the whole ring, about 2 ms at 50k entries.
+
+    Thread-safe.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, max_distance: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self._hashes = np.zeros((max_entries, _WORDS), dtype=np.uint64)
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._texts = [None] * max_entries
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return int((self._expires > time.time()).sum())
+
+    def get(self, image_hash: np.ndarray):
+        """Return (text, distance) of the closest live entry within max_distance, or None"""
+        with self._lock:
+            distances = np.bitwise_count(self._hashes ^ image_hash).sum(axis=1, dtype=np.int64)
+            distances[self._expires <= time.time()] = HASH_BITS + 1
+            best = int(np.argmin(distances))
+            if distances[best] > self.max_distance:
+                return None
+            return self._texts[best], int(distances[best])
+
+    def put(self, image_hash: np.ndarray, text: str):
+        with self._lock:
+            slot = self._next % self.max_entries
+            self._hashes[slot] = image_hash
+            self._expires[slot] = time.time() + self.ttl
+            self._texts[slot] = text
+            self._next += 1
+
+    def clear(self):
+        with self._lock:
+            self._expires[:] = 0
+            self._texts = [None] * self.max_entries
+            self._next = 0
+
+
+_cache = PerceptualCache(OCR_CACHE_MAX_ENTRIES, OCR_CACHE_TTL_SECONDS, OCR_CACHE_MAX_DISTANCE)
+
+
+def _record(hit: bool):
+    metrics.inc("ocr_cache.hits" if hit else "ocr_cache.misses")
+    hits = metrics.get_counter("ocr_cache.hits")
+    metrics.set_gauge("ocr_cache.hit_ratio", hits / (hits + metrics.get_counter("ocr_cache.misses")))
+
+
+def image_hash(image_path: str):
+    """Perceptual hash of the image, or None when the cache is off or the file can't be hashed"""
+    if OCR_CACHE_DISABLED:
+        return None
+    try:
+        return perceptual_hash(image_path)
+    except Exception as e:
+        print(f"Error hashing image: {e}")
+        return None
+
+
+def lookup(hash_value):
+    """Return cached OCR text for a perceptually identical image, or None"""
+    if hash_value is None:
+        return None
+    match = _cache.get(hash_value)
+    _record(match is not None)
+    return match[0] if match is not None else None
+
+
+def store(hash_value, text: str):
+    if hash_value is None:
+        return
+    _cache.put(hash_value, text)
+    metrics.set_gauge("ocr_cache.entries", len(_cache))
+
+
+def stats() -> dict:
+    return {
+        "entries": len(_cache),
+        "hits": metrics.get_counter("ocr_cache.hits"),
+        "misses": metrics.get_counter("ocr_cache.misses"),
+    }
@@ -0,0 +1,117 @@
+import asyncio
+import multiprocessing
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from dotenv import load_dotenv
+
+from app.core import metrics
+from app.core.image import OCRTimeoutError, get_engine, ocr_image
+
+load_dotenv()
+
+# Worker processes running tesseract, OCR is CPU bound so one per core by default
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 2)))
+# Jobs allowed to wait for a free worker, further uploads are turned away with a 503
+OCR_QUEUE_SIZE = int(os.getenv("OCR_QUEUE_SIZE", str(OCR_WORKERS * 2)))
+# Per-image deadline, recognition itself is aborted when it runs past it
+OCR_TIMEOUT_SECONDS = float(os.getenv("OCR_TIMEOUT_SECONDS", "60"))
+# Retry-After sent with the 503 when the queue is full
+OCR_RETRY_AFTER_SECONDS = int(os.getenv("OCR_RETRY_AFTER_SECONDS", "5"))
+
+
+class OCRQueueFullError(Exception):
+    """Raised when OCR_WORKERS + OCR_QUEUE_SIZE jobs are already admitted"""
+
+
+_executor = None
+_admitted = 0
+
+
+def _run_ocr(image_path: str, timeout: float):
+    """Runs in a worker process, returns (time the job started, extracted text, step timings)"""
+    started = time.time()
+    try:
+        text, timings = ocr_image(image_path, timeout=timeout)
+    except Exception as e:
+        # An exception that can't be unpickled in the parent (pytesseract's
+        # TesseractNotFoundError for one) breaks the whole pool, send a plain one
+        try:
+            pickle.loads(pickle.dumps(e))
+        except Exception:
+            raise RuntimeError(f"{type(e).__name__}: {e}") from None
+        raise
+    return started, text, timings
+
+
+def start(workers: int = OCR_WORKERS):
+    """
+    Create the process pool (spawned, so no event loop or DB state is forked).
+    Each worker loads its OCR engine once, when it starts.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=get_engine,
+        )
+
+
+def stop():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _set_gauges():
+    metrics.set_gauge("ocr.admitted", _admitted)
+    metrics.set_gauge("ocr.queue_depth", max(0, _admitted - OCR_WORKERS))
+
+
+def _release(_future=None):
+    global _admitted
+    _admitted -= 1
+    _set_gauges()
+
+
+async def extract_text(image_path: str) -> str:
+    """
+    Run OCR on `image_path` in the process pool without blocking the event loop.
+
+    Raises OCRQueueFullError when too many jobs are already admitted and
+    OCRTimeoutError when the job runs past OCR_TIMEOUT_SECONDS.
+    """
+    global _admitted
+    if _executor is None:
+        start()
+    if _admitted >= OCR_WORKERS + OCR_QUEUE_SIZE:
+        metrics.inc("ocr.rejected")
+        raise OCRQueueFullError("OCR queue is full")
+
+    _admitted += 1
+    _set_gauges()
+    loop = asyncio.get_running_loop()
+    submitted = time.time()
+    future = loop.run_in_executor(_executor, _run_ocr, image_path, OCR_TIMEOUT_SECONDS)
+    # The slot is freed when the worker is really done, not when we stop waiting
+    future.add_done_callback(_release)
+
+    try:
+        # Queue wait counts against the deadline too, plus a little grace for the worker's own timeout
+        started, text, timings = await asyncio.wait_for(asyncio.shield(future), timeout=OCR_TIMEOUT_SECONDS * 2 + 1)
+    except (asyncio.TimeoutError, OCRTimeoutError):
+        metrics.inc("ocr.timeouts")
+        raise OCRTimeoutError("OCR took too long")
+
+    finished = time.time()
+    metrics.observe("ocr.queue_wait_seconds", max(0.0, started - submitted))
+    metrics.observe("ocr.seconds", finished - started)
+    # Measured in the worker process, reported here so they show up on /metrics
+    for step, seconds in timings.items():
+        metrics.observe(f"ocr.step.{step}.seconds", seconds)
+    metrics.inc("ocr.done")
+    return text
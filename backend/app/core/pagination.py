@@ -0,0 +1,30 @@
+import base64
+import json
+import os
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+
+load_dotenv()
+
+PAGE_DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT", "20"))
+# Largest page a client may ask for
+PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", "100"))
+
+
+def encode_cursor(position: dict) -> str:
+    """Opaque cursor for the position of the last item of a page"""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, keys: tuple) -> dict:
+    """Position encoded in `cursor`, 400 if it was not produced by encode_cursor with these keys"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+        if not isinstance(position, dict) or set(position) != set(keys):
+            raise ValueError("unexpected cursor fields")
+        return position
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
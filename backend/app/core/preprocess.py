@@ -0,0 +1,113 @@
+import os
+import time
+
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Steps run before OCR, in this order. Drop a name to turn the step off,
+# an empty value turns preprocessing off entirely.
+OCR_PREPROCESS_STEPS = [
+    step.strip()
+    for step in os.getenv("OCR_PREPROCESS_STEPS", "exif,downscale,grayscale,binarize,crop").split(",")
+    if step.strip()
+]
+# Images are scaled down (never up) to this resolution. Screenshots rarely
+# carry a DPI, OCR_SOURCE_DPI is assumed for them (typical phone screen).
+OCR_TARGET_DPI = float(os.getenv("OCR_TARGET_DPI", "300"))
+OCR_SOURCE_DPI = float(os.getenv("OCR_SOURCE_DPI", "440"))
+# Hard cap on the longer side after downscaling, in pixels
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "2000"))
+# Adaptive threshold neighbourhood (odd, in pixels) and offset
+OCR_BINARIZE_BLOCK = int(os.getenv("OCR_BINARIZE_BLOCK", "31"))
+OCR_BINARIZE_OFFSET = int(os.getenv("OCR_BINARIZE_OFFSET", "15"))
+# Margin kept around the content when cropping uniform borders
+OCR_CROP_PADDING = int(os.getenv("OCR_CROP_PADDING", "10"))
+
+EXIF_ORIENTATION = 0x0112
+
+
+def exif_transpose(image: Image.Image) -> Image.Image:
+    """Rotate/flip according to the EXIF orientation tag (photos taken sideways)"""
+    # exif_transpose copies the image even when there is nothing to do
+    if image.getexif().get(EXIF_ORIENTATION, 1) == 1:
+        return image
+    return ImageOps.exif_transpose(image)
+
+
+def downscale(image: Image.Image) -> Image.Image:
+    dpi = float(image.info.get("dpi", (0, 0))[0] or 0)
+    # 72/96 DPI are placeholders written by most software, not a real resolution
+    if dpi < 100:
+        dpi = OCR_SOURCE_DPI
+    scale = min(1.0, OCR_TARGET_DPI / dpi, OCR_MAX_SIDE / max(image.size))
+    if scale >= 1.0:
+        return image
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    # Box (area average) filtering is much cheaper than Lanczos on 4K screenshots and keeps glyph edges intact
+    return image.resize(size, Image.Resampling.BOX)
+
+
+def grayscale(image: Image.Image) -> Image.Image:
+    return image if image.mode == "L" else image.convert("L")
+
+
+def binarize(image: Image.Image) -> Image.Image:
+    """
+    Adaptive (local mean) threshold: dark text becomes black, everything
+    else, including uniformly colored bars and tinted backgrounds, white.
+    """
+    pixels = np.asarray(grayscale(image))
+    binary = cv2.adaptiveThreshold(
+        pixels, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, OCR_BINARIZE_BLOCK, OCR_BINARIZE_OFFSET
+    )
+    return Image.fromarray(binary)
+
+
+def crop_borders(image: Image.Image) -> Image.Image:
+    """Crop rows/columns that are one uniform color (the background) on every side"""
+    pixels = np.asarray(grayscale(image))
+    background = np.median(np.concatenate([pixels[0], pixels[-1], pixels[:, 0], pixels[:, -1]]))
+    content = np.abs(pixels.astype(np.int16) - int(background)) > 32
+    rows = np.flatnonzero(content.any(axis=1))
+    cols = np.flatnonzero(content.any(axis=0))
+    if len(rows) == 0 or len(cols) == 0:
+        return image
+    top = max(0, rows[0] - OCR_CROP_PADDING)
+    bottom = min(image.height, rows[-1] + 1 + OCR_CROP_PADDING)
+    left = max(0, cols[0] - OCR_CROP_PADDING)
+    right = min(image.width, cols[-1] + 1 + OCR_CROP_PADDING)
+    return image.crop((left, top, right, bottom))
+
+
+STEPS = {
+    "exif": exif_transpose,
+    "downscale": downscale,
+    "grayscale": grayscale,
+    "binarize": binarize,
+    "crop": crop_borders,
+}
+
+
+def preprocess(image: Image.Image, steps: list = None) -> tuple:
+    """
+    Run the enabled steps on `image`.
+
+    Returns:
+        (processed image, {step name: seconds spent in it})
+    """
+    steps = OCR_PREPROCESS_STEPS if steps is None else steps
+    unknown = set(steps) - set(STEPS)
+    if unknown:
+        raise ValueError(f"Unknown preprocessing steps: {', '.join(sorted(unknown))}")
+
+    timings = {}
+    # Always in pipeline order, whatever order the steps were listed in
+    for name in [name for name in STEPS if name in steps]:
+        start = time.perf_counter()
+        image = STEPS[name](image)
+        timings[name] = time.perf_counter() - start
+    return image, timings
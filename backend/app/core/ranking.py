@@ -0,0 +1,238 @@
+import gc
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from sortedcontainers import SortedList
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db.session import SessionLocal
+from app.models.posts import Post
+
+load_dotenv()
+
+# A post needs 10x the net votes to rank as high as one posted this much later
+RANK_DECAY_SECONDS = float(os.getenv("RANK_DECAY_SECONDS", "45000"))
+# What a fully credible (100) or fully non-credible (0) verdict is worth, in
+# the same unit: 1.0 ranks like 10x the net votes, unverified posts get 0
+RANK_CREDIBILITY_WEIGHT = float(os.getenv("RANK_CREDIBILITY_WEIGHT", "1.0"))
+# Older posts drop out of the hot feed (they are still in the recent feed)
+RANK_MAX_AGE_DAYS = float(os.getenv("RANK_MAX_AGE_DAYS", "30"))
+
+
+def _timestamp(created_at: datetime) -> float:
+    # created_at is naive UTC
+    return created_at.replace(tzinfo=timezone.utc).timestamp()
+
+
+def hot_score(created_ts: float, likes: int, dislikes: int, credibility_score: float = None) -> float:
+    """
+    Time-decayed score of a post. Decay comes from the creation time term
+    growing for newer posts, so a score never has to be recomputed as time
+    passes, only when the votes or the verdict change.
+    """
+    votes = (likes or 0) - (dislikes or 0)
+    order = math.log10(max(abs(votes), 1))
+    sign = (votes > 0) - (votes < 0)
+    credibility = 0.0 if credibility_score is None else (credibility_score - 50) / 50
+    return sign * order + RANK_CREDIBILITY_WEIGHT * credibility + created_ts / RANK_DECAY_SECONDS
+
+
+class HotRanking:
+    """
+    Posts ordered by hot score, kept sorted as votes and verdicts change.
+
+    Updates are O(log n): the post's entry is moved in a SortedList keyed by
+    (-score, id). A page is O(log n + K): a binary search to the cursor, then
+    K steps. Posts past the max age are pruned as new ones come in.
+
+    Thread-safe.
+    """
+
+    def __init__(self, max_age_seconds: float = RANK_MAX_AGE_DAYS * 86400):
+        self.max_age_seconds = max_age_seconds
+        self._order = SortedList()
+        # post id -> [score, created_ts, likes, dislikes, credibility_score, real]
+        self._entries = {}
+        # (created_ts, post id), oldest first, for pruning
+        self._by_age = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self, rows: list):
+        """Bulk insert (post id, created_ts, likes, dislikes, credibility_score, real) rows, oldest first"""
+        # Millions of new containers would set off several full garbage
+        # collections while loading, none of them can free anything
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with self._lock:
+                for post_id, created_ts, likes, dislikes, credibility_score, real in rows:
+                    score = hot_score(created_ts, likes, dislikes, credibility_score)
+                    self._entries[post_id] = [score, created_ts, likes or 0, dislikes or 0, credibility_score, real]
+                    self._by_age.append((created_ts, post_id))
+                # Sorting once is much faster than one insert per row
+                self._order = SortedList((-entry[0], post_id) for post_id, entry in self._entries.items())
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _move(self, post_id: UUID, entry: list):
+        self._order.remove((-entry[0], post_id))
+        entry[0] = hot_score(entry[1], entry[2], entry[3], entry[4])
+        self._order.add((-entry[0], post_id))
+
+    def add(self, post_id: UUID, created_ts: float, likes: int, dislikes: int, credibility_score: float = None, real: bool = None):
+        with self._lock:
+            old = self._entries.get(post_id)
+            if old is not None:
+                self._order.remove((-old[0], post_id))
+            score = hot_score(created_ts, likes, dislikes, credibility_score)
+            self._entries[post_id] = [score, created_ts, likes or 0, dislikes or 0, credibility_score, real]
+            self._order.add((-score, post_id))
+            if old is None:
+                self._by_age.append((created_ts, post_id))
+            self._prune(time.time() - self.max_age_seconds)
+
+    def add_votes(self, post_id: UUID, likes: int, dislikes: int):
+        """Apply a change of the counters, posts that aren't ranked are ignored"""
+        with self._lock:
+            entry = self._entries.get(post_id)
+            if entry is not None:
+                entry[2] += likes
+                entry[3] += dislikes
+                self._move(post_id, entry)
+
+    def set_verdict(self, post_id: UUID, real: bool, credibility_score: float):
+        with self._lock:
+            entry = self._entries.get(post_id)
+            if entry is not None:
+                entry[4], entry[5] = credibility_score, real
+                self._move(post_id, entry)
+
+    def remove(self, post_id: UUID):
+        with self._lock:
+            entry = self._entries.pop(post_id, None)
+            if entry is not None:
+                self._order.remove((-entry[0], post_id))
+
+    def _prune(self, cutoff: float):
+        while self._by_age and self._by_age[0][0] < cutoff:
+            _, post_id = self._by_age.popleft()
+            entry = self._entries.pop(post_id, None)
+            if entry is not None:
+                self._order.remove((-entry[0], post_id))
+
+    def page(self, after: tuple = None, limit: int = 20, credible_only: bool = False) -> tuple:
+        """
+        Ids of the next `limit` posts after the (score, id) position `after`,
+        highest score first, and the position of the last one (None on the last page).
+        A post whose score changes between two pages can be seen twice or
+        skipped, as with any live ranking.
+        """
+        with self._lock:
+            if after is None:
+                keys = self._order.islice(0)
+            else:
+                keys = self._order.irange(minimum=(-after[0], after[1]), inclusive=(False, True))
+            ids, last = [], None
+            for key in keys:
+                if len(ids) == limit:
+                    return ids, last
+                if credible_only and self._entries[key[1]][5] is not True:
+                    continue
+                ids.append(key[1])
+                last = (-key[0], key[1])
+            return ids, None
+
+
+_ranking = HotRanking()
+
+
+def add_post(db_post: Post):
+    """Rank a new post (or re-rank one whose inputs were all set at once)"""
+    _ranking.add(
+        db_post.id,
+        _timestamp(db_post.created_at),
+        db_post.likes,
+        db_post.dislikes,
+        db_post.credibility_score,
+        db_post.real,
+    )
+    metrics.set_gauge("ranking.ranked_posts", len(_ranking))
+
+
+def add_votes(changes: list):
+    """Apply flushed counter changes, a list of (post id, likes, dislikes)"""
+    for post_id, likes, dislikes in changes:
+        _ranking.add_votes(post_id, likes, dislikes)
+
+
+def set_verdict(post_id: UUID, real: bool, credibility_score: float):
+    _ranking.set_verdict(post_id, real, credibility_score)
+
+
+def remove_post(post_id: UUID):
+    _ranking.remove(post_id)
+    metrics.set_gauge("ranking.ranked_posts", len(_ranking))
+
+
+def page(cursor: str = None, limit: int = 20, credible_only: bool = False) -> tuple:
+    """Post ids of a hot feed page and the cursor of the next one"""
+    after = None
+    if cursor is not None:
+        position = decode_cursor(cursor, ("score", "id"))
+        try:
+            after = (float(position["score"]), UUID(position["id"]))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    with metrics.timer("ranking.page_seconds"):
+        ids, last = _ranking.page(after, limit, credible_only)
+    next_cursor = encode_cursor({"score": last[0], "id": str(last[1])}) if last else None
+    return ids, next_cursor
+
+
+def rebuild_from_db(db: Session) -> int:
+    """Rank every post younger than RANK_MAX_AGE_DAYS, returns the number ranked"""
+    global _ranking
+    ranking = HotRanking()
+    cutoff = datetime.utcnow() - timedelta(seconds=ranking.max_age_seconds)
+    query = (
+        db.query(Post.id, Post.created_at, Post.likes, Post.dislikes, Post.credibility_score, Post.real)
+        .filter(Post.created_at >= cutoff)
+        .order_by(Post.created_at)
+        .execution_options(yield_per=10_000)
+    )
+    ranking.load([
+        (row.id, _timestamp(row.created_at), row.likes, row.dislikes, row.credibility_score, row.real)
+        for row in query
+    ])
+    _ranking = ranking
+    # Keep later full collections from walking every ranked post again
+    # (about a second per collection at 1M posts)
+    gc.collect()
+    gc.freeze()
+    metrics.set_gauge("ranking.ranked_posts", len(ranking))
+    return len(ranking)
+
+
+def rebuild():
+    """Build the ranking with its own session, run once on startup before any updates come in"""
+    db = SessionLocal()
+    try:
+        count = rebuild_from_db(db)
+        print(f"Hot ranking built with {count} posts")
+    except Exception as e:
+        print(f"Error building hot ranking: {e}")
+    finally:
+        db.close()
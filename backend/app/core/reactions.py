@@ -0,0 +1,266 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+from pathlib import Path
+from uuid import UUID
+
+from dotenv import load_dotenv
+from sqlalchemy import Integer, column, func, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
+from starlette.concurrency import run_in_threadpool
+
+from app.core import metrics, ranking, response_cache
+from app.db.session import SessionLocal
+from app.models.posts import Post
+from app.models.reactions import ReactionLogCheckpoint
+
+load_dotenv()
+
+# Like/dislike counters are written behind: every reaction is appended to a
+# local log and added to an in-memory buffer, coalesced per post, and the
+# buffer is written to posts.likes/dislikes in one batched UPDATE every
+# interval (or sooner once REACTIONS_FLUSH_MAX_PENDING reactions are waiting).
+# A viral post costs one row update per flush instead of one per click.
+REACTIONS_FLUSH_INTERVAL_SECONDS = float(os.getenv("REACTIONS_FLUSH_INTERVAL_SECONDS", "1"))
+REACTIONS_FLUSH_MAX_PENDING = int(os.getenv("REACTIONS_FLUSH_MAX_PENDING", "1000"))
+# Each process needs its own log directory and name (the checkpoint row is keyed by the name)
+REACTIONS_LOG_DIR = Path(os.getenv("REACTIONS_LOG_DIR", "reactions_log"))
+REACTIONS_LOG_NAME = os.getenv("REACTIONS_LOG_NAME", socket.gethostname())
+# Without fsync a reaction survives a crash of the process but not of the machine
+REACTIONS_LOG_FSYNC = os.getenv("REACTIONS_LOG_FSYNC", "false").lower() in ("1", "true")
+
+_lock = threading.Lock()
+# post id -> [likes delta, dislikes delta] not yet in the posts table
+_buffer = {}
+_pending = 0
+# Sequence number of the last record appended to the log
+_seq = 0
+_segment = None
+
+_loop = None
+_wakeup = None
+_task = None
+
+
+def _segment_path(first_seq: int) -> Path:
+    return REACTIONS_LOG_DIR / f"{first_seq:020d}.log"
+
+
+def _segments() -> list:
+    """Log segments, oldest first (names sort by the first sequence number they hold)"""
+    return sorted(REACTIONS_LOG_DIR.glob("*.log"))
+
+
+def _open_segment():
+    """Start a new segment, records up to _seq are in the older ones"""
+    global _segment
+    if _segment is not None:
+        _segment.close()
+    REACTIONS_LOG_DIR.mkdir(parents=True, exist_ok=True)
+    _segment = open(_segment_path(_seq + 1), "a", encoding="utf-8")
+
+
+def record(post_id: UUID, likes: int, dislikes: int):
+    """
+    Add a change of a post's counters. Returns once it is in the log, the
+    posts table is updated by the next flush.
+    """
+    global _seq
+    with _lock:
+        if _segment is None:
+            raise RuntimeError("reactions.start() has not run")
+        _seq += 1
+        _segment.write(json.dumps({"seq": _seq, "post_id": str(post_id), "likes": likes, "dislikes": dislikes}) + "\n")
+        _segment.flush()
+        if REACTIONS_LOG_FSYNC:
+            os.fsync(_segment.fileno())
+        _add(post_id, likes, dislikes)
+        full = _pending >= REACTIONS_FLUSH_MAX_PENDING
+    metrics.inc("reactions.recorded")
+    if full:
+        _notify()
+
+
+def _add(post_id: UUID, likes: int, dislikes: int):
+    global _pending
+    counts = _buffer.setdefault(post_id, [0, 0])
+    counts[0] += likes
+    counts[1] += dislikes
+    _pending += 1
+
+
+def pending(post_id: UUID) -> tuple:
+    """(likes, dislikes) recorded for the post but not flushed yet"""
+    with _lock:
+        likes, dislikes = _buffer.get(post_id, (0, 0))
+    return likes, dislikes
+
+
+def flush() -> int:
+    """
+    Write the buffered counts to the posts table in one UPDATE and move the
+    log checkpoint in the same transaction. Returns the number of posts updated.
+    """
+    global _buffer, _pending
+    with _lock:
+        batch, count, seq = _buffer, _pending, _seq
+        _buffer, _pending = {}, 0
+        # Records from here on go to a new segment, the older ones can be
+        # deleted once this flush is committed
+        if batch:
+            _open_segment()
+    if not batch:
+        return 0
+
+    # Sorted so concurrent flushes (other processes) lock rows in the same order
+    rows = [(post_id, likes, dislikes) for post_id, (likes, dislikes) in sorted(batch.items()) if likes or dislikes]
+    updated = []
+    db = SessionLocal()
+    try:
+        with metrics.timer("reactions.flush_seconds"):
+            if rows:
+                deltas = values(
+                    column("id", PG_UUID(as_uuid=True)),
+                    column("likes", Integer),
+                    column("dislikes", Integer),
+                    name="deltas",
+                ).data(rows)
+                updated = db.execute(
+                    update(Post)
+                    .where(Post.id == deltas.c.id)
+                    .values(
+                        likes=func.coalesce(Post.likes, 0) + deltas.c.likes,
+                        dislikes=func.coalesce(Post.dislikes, 0) + deltas.c.dislikes,
+                    )
+                    .returning(Post.id, Post.user_id)
+                    .execution_options(synchronize_session=False)
+                ).all()
+            db.execute(
+                insert(ReactionLogCheckpoint)
+                .values(log_name=REACTIONS_LOG_NAME, seq=seq)
+                .on_conflict_do_update(index_elements=[ReactionLogCheckpoint.log_name], set_={"seq": seq})
+            )
+            db.commit()
+    except Exception:
+        db.rollback()
+        # Put the counts back, the records stay in the log until a flush succeeds
+        with _lock:
+            for post_id, (likes, dislikes) in batch.items():
+                _add(post_id, likes, dislikes)
+            _pending += count - len(batch)
+        raise
+    finally:
+        db.close()
+
+    _delete_segments(seq)
+    ranking.add_votes(rows)
+    if updated:
+        # Counters are part of every post response
+        response_cache.invalidate(
+            response_cache.FEED_SCOPE,
+            *{response_cache.post_scope(row.id) for row in updated},
+            *{response_cache.user_scope(row.user_id) for row in updated},
+        )
+    metrics.inc("reactions.flushes")
+    metrics.inc("reactions.flushed_posts", len(rows))
+    # Reactions that were merged into another one for the same post
+    metrics.inc("reactions.coalesced", count - len(batch))
+    return len(rows)
+
+
+def _delete_segments(seq: int):
+    """Delete segments holding only records up to `seq`"""
+    segments = _segments()
+    for segment, following in zip(segments, segments[1:]):
+        # A segment ends right before the next one starts
+        if int(following.stem) - 1 <= seq:
+            segment.unlink(missing_ok=True)
+
+
+def recover():
+    """
+    Load the records the last run logged but did not flush (it crashed or
+    was killed) back into the buffer, then open a fresh segment.
+    """
+    global _seq
+    db = SessionLocal()
+    try:
+        checkpoint = db.get(ReactionLogCheckpoint, REACTIONS_LOG_NAME)
+        flushed = checkpoint.seq if checkpoint else 0
+    finally:
+        db.close()
+
+    replayed = 0
+    with _lock:
+        _seq = flushed
+        for segment in _segments():
+            with open(segment, encoding="utf-8") as log:
+                for line in log:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn write at the end of a segment, the request never got its answer
+                        print(f"Skipping damaged reaction log record in {segment}")
+                        continue
+                    _seq = max(_seq, entry["seq"])
+                    if entry["seq"] > flushed:
+                        _add(UUID(entry["post_id"]), entry["likes"], entry["dislikes"])
+                        replayed += 1
+        _open_segment()
+    _delete_segments(flushed)
+    if replayed:
+        print(f"Replayed {replayed} reactions from the log")
+        metrics.inc("reactions.replayed", replayed)
+
+
+def _notify():
+    if _loop is None or _wakeup is None:
+        return
+    _loop.call_soon_threadsafe(_wakeup.set)
+
+
+async def _flush_periodically():
+    while True:
+        try:
+            await asyncio.wait_for(_wakeup.wait(), REACTIONS_FLUSH_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+        try:
+            await run_in_threadpool(flush)
+        except Exception as e:
+            print(f"Reaction flush failed, retrying: {e}")
+        metrics.set_gauge("reactions.pending", _pending)
+
+
+async def start():
+    global _loop, _wakeup, _task
+    await run_in_threadpool(recover)
+    _loop = asyncio.get_running_loop()
+    _wakeup = asyncio.Event()
+    _task = asyncio.create_task(_flush_periodically())
+    # Replayed records are written right away
+    _notify()
+
+
+async def stop():
+    """Stop the flusher and write what is still buffered"""
+    global _loop, _wakeup, _task, _segment
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+    _loop, _wakeup, _task = None, None, None
+    try:
+        await run_in_threadpool(flush)
+    except Exception as e:
+        # The log still has them, the next start replays them
+        print(f"Final reaction flush failed: {e}")
+    with _lock:
+        if _segment is not None:
+            _segment.close()
+            _segment = None
@@ -0,0 +1,151 @@
+import os
+import re
+import threading
+from pathlib import Path
+from uuid import uuid4
+
+from PIL import Image, features
+from dotenv import load_dotenv
+
+from app.core import metrics, storage
+from app.core.preprocess import exif_transpose
+from app.db.session import SessionLocal
+from app.models.blobs import Blob
+
+load_dotenv()
+
+# Bounding boxes of the derived images. "thumb" fills a feed card on a 1x
+# screen (the card shows images at most 384px high), "card" covers 2x screens.
+RENDITIONS = {
+    "thumb": (384, 384),
+    "card": (768, 768),
+}
+RENDITION_WEBP_QUALITY = int(os.getenv("RENDITION_WEBP_QUALITY", "80"))
+RENDITION_AVIF_QUALITY = int(os.getenv("RENDITION_AVIF_QUALITY", "55"))
+# AVIF is only offered when Pillow was built with libavif
+RENDITION_AVIF = os.getenv("RENDITION_AVIF", "true").lower() in ("1", "true") and features.check("avif")
+FORMATS = ("webp", "avif") if RENDITION_AVIF else ("webp",)
+# Scratch files for renditions on their way to the storage backend
+RENDITION_TMP_DIR = Path(os.getenv("UPLOAD_TMP_DIR", str(storage.STORAGE_LOCAL_ROOT / ".tmp")))
+
+_original_url = re.compile(r"^/dest/(?P<shard>[0-9a-f]{2}/[0-9a-f]{2})/(?P<sha>[0-9a-f]{64})\.[a-z]+$")
+_rendition_key = re.compile(
+    r"^(?P<shard>[0-9a-f]{2}/[0-9a-f]{2})/(?P<sha>[0-9a-f]{64})\.(?P<name>[a-z]+)\.(?P<format>[a-z]+)$"
+)
+
+# Renditions being generated in this process, so a burst of requests for a
+# fresh post renders each one once
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def rendition_key(sha256: str, name: str, format: str) -> str:
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}.{name}.{format}"
+
+
+def rendition_keys(sha256: str) -> list:
+    """Every key a rendition of the blob can live under"""
+    return [rendition_key(sha256, name, format) for name in RENDITIONS for format in FORMATS]
+
+
+def rendition_urls(url: str):
+    """
+    {name: {format: url}} of the renditions of an uploaded image,
+    or None for external and legacy urls
+    """
+    match = _original_url.match(url or "")
+    if not match:
+        return None
+    return {
+        name: {format: f"/dest/{rendition_key(match.group('sha'), name, format)}" for format in FORMATS}
+        for name in RENDITIONS
+    }
+
+
+def parse_key(key: str):
+    """(sha256, name, format) if `key` names a known rendition, else None"""
+    match = _rendition_key.match(key)
+    if not match or match.group("name") not in RENDITIONS or match.group("format") not in FORMATS:
+        return None
+    return match.group("sha"), match.group("name"), match.group("format")
+
+
+def render(source: Path, target: Path, name: str, format: str):
+    """Write the `name` rendition of the image at `source` to `target`"""
+    box = RENDITIONS[name]
+    with Image.open(source) as image:
+        # JPEGs are decoded straight at the closest scale above the box
+        image.draft("RGB", box)
+        image = exif_transpose(image)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        image.thumbnail(box, Image.Resampling.LANCZOS)
+        if format == "avif":
+            image.save(target, "AVIF", quality=RENDITION_AVIF_QUALITY, speed=8)
+        else:
+            image.save(target, "WEBP", quality=RENDITION_WEBP_QUALITY, method=4)
+
+
+def _generate(key: str, sha256: str, name: str, format: str) -> bool:
+    db = SessionLocal()
+    try:
+        blob = db.get(Blob, sha256)
+        extension = blob.extension if blob else None
+    finally:
+        db.close()
+    if extension is None:
+        return False
+
+    backend = storage.get_backend()
+    RENDITION_TMP_DIR.mkdir(parents=True, exist_ok=True)
+    source = RENDITION_TMP_DIR / f".rendition-{uuid4().hex}{extension}"
+    target = RENDITION_TMP_DIR / f".rendition-{uuid4().hex}.{format}"
+    try:
+        original_key = f"{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+        if isinstance(backend, storage.LocalStorage):
+            source = backend.path(original_key)
+        else:
+            storage.copy_to_file(original_key, source)
+        with metrics.timer(f"renditions.{format}.seconds"):
+            render(source, target, name, format)
+        backend.put_file(key, target)
+    except FileNotFoundError:
+        return False
+    finally:
+        if source.parent == RENDITION_TMP_DIR:
+            source.unlink(missing_ok=True)
+        target.unlink(missing_ok=True)
+    metrics.inc("renditions.generated")
+    return True
+
+
+def ensure(key: str) -> bool:
+    """
+    Make sure the rendition under `key` is stored, generating it from the
+    original on first request. Returns False when the key is not a rendition
+    or the original blob does not exist.
+    """
+    parsed = parse_key(key)
+    if parsed is None:
+        return False
+    if storage.get_backend().exists(key):
+        metrics.inc("renditions.hits")
+        return True
+
+    with _in_flight_lock:
+        lock = _in_flight.setdefault(key, threading.Lock())
+    with lock:
+        try:
+            # Another request may have generated it while this one waited
+            if storage.get_backend().exists(key):
+                return True
+            return _generate(key, *parsed)
+        finally:
+            with _in_flight_lock:
+                _in_flight.pop(key, None)
+
+
+def delete_all(sha256: str):
+    """Remove every stored rendition of a blob"""
+    backend = storage.get_backend()
+    for key in rendition_keys(sha256):
+        backend.delete(key)
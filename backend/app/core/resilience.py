@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+
+from app.core import metrics
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+    def __init__(self, name: str, retry_at: float):
+        super().__init__(f"circuit {name} is open")
+        self.name = name
+        # Wall-clock time (time.time()) after which a probe will be let through
+        self.retry_at = retry_at
+
+
+class LimiterFullError(Exception):
+    """Raised when no concurrency slot frees up within the allowed wait"""
+
+
+class CircuitBreaker:
+    """
+    Classic three-state circuit breaker.
+
+    closed: calls go through, `failure_threshold` consecutive failures open it.
+    open: calls fail fast with CircuitOpenError for `recovery_seconds`.
+    half_open: up to `half_open_max_calls` probes go through, a success closes
+    the circuit again and a failure re-opens it. Probes that never report back
+    (cancelled) are forgotten after another `recovery_seconds`.
+
+    Every transition is counted as circuit.<name>.transitions.<state> and the
+    current state is exported as the circuit.<name>.state gauge
+    (0 closed, 1 half open, 2 open).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    _STATE_GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_seconds: float = 30.0, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        metrics.set_gauge(f"circuit.{name}.state", 0)
+
+    def _transition(self, state: str):
+        self.state = state
+        metrics.inc(f"circuit.{self.name}.transitions.{state}")
+        metrics.set_gauge(f"circuit.{self.name}.state", self._STATE_GAUGE[state])
+
+    def allow(self):
+        """Raise CircuitOpenError unless a call may go through right now"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.time() - self._opened_at < self.recovery_seconds:
+                    metrics.inc(f"circuit.{self.name}.rejected")
+                    raise CircuitOpenError(self.name, self._opened_at + self.recovery_seconds)
+                self._transition(self.HALF_OPEN)
+                self._half_opened_at = time.time()
+                self._probes = 0
+
+            if self.state == self.HALF_OPEN:
+                if self._probes >= self.half_open_max_calls and time.time() - self._half_opened_at >= self.recovery_seconds:
+                    self._half_opened_at = time.time()
+                    self._probes = 0
+                if self._probes >= self.half_open_max_calls:
+                    metrics.inc(f"circuit.{self.name}.rejected")
+                    raise CircuitOpenError(self.name, time.time() + self.recovery_seconds)
+                self._probes += 1
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self.state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = time.time()
+                self._transition(self.OPEN)
+
+
+class ConcurrencyLimiter:
+    """
+    Bounded number of concurrent calls. Callers wait at most `max_wait`
+    seconds for a slot, then get LimiterFullError. In-flight and waiting
+    counts are exported as limiter.<name>.in_flight / limiter.<name>.waiting.
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_wait: float = 10.0):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self._semaphore = None
+        self._in_flight = 0
+        self._waiting = 0
+
+    def _update_gauges(self):
+        metrics.set_gauge(f"limiter.{self.name}.in_flight", self._in_flight)
+        metrics.set_gauge(f"limiter.{self.name}.waiting", self._waiting)
+
+    async def __aenter__(self):
+        # Created lazily so the semaphore belongs to the loop that uses it
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        self._waiting += 1
+        self._update_gauges()
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            metrics.inc(f"limiter.{self.name}.rejected")
+            raise LimiterFullError(f"limiter {self.name} is full")
+        finally:
+            self._waiting -= 1
+            metrics.observe(f"limiter.{self.name}.wait_seconds", time.perf_counter() - start)
+
+        self._in_flight += 1
+        self._update_gauges()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._in_flight -= 1
+        self._semaphore.release()
+        self._update_gauges()
+        return False
+
+
+async def call_with_deadline(coro, timeout: float, name: str):
+    """Await `coro` for at most `timeout` seconds, counting timeouts as <name>.timeouts"""
+    try:
+        return await asyncio.wait_for(coro, timeout=timeout)
+    except asyncio.TimeoutError:
+        metrics.inc(f"{name}.timeouts")
+        raise
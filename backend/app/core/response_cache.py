@@ -0,0 +1,278 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+from fastapi import Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+
+from app.core import metrics
+
+load_dotenv()
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Serialized JSON of post reads, keyed by the request and the versions of
+# what the response depends on ("scopes"): a post, the feed, a user's posts.
+# A write bumps the versions after its commit, so a response cached from
+# data read before the write is stored under a key nobody asks for anymore.
+#
+# memory (default, per process), redis (shared by every process) or off.
+# With memory, writes made by another process are only seen after the TTL.
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 2**20)))
+# Versions kept by the memory backend (one per post written to since startup)
+RESPONSE_CACHE_MAX_VERSIONS = int(os.getenv("RESPONSE_CACHE_MAX_VERSIONS", "100000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Authenticated responses: browsers keep them but revalidate with If-None-Match
+CACHE_CONTROL = "private, no-cache"
+
+
+def post_scope(post_id) -> str:
+    return f"post:{post_id}"
+
+
+def user_scope(user_id) -> str:
+    """A user's own posts (/posts/user/me)"""
+    return f"user:{user_id}"
+
+
+# Every feed page, sorted or filtered
+FEED_SCOPE = "feed"
+
+
+class MemoryCache:
+    """
+    LRU of responses bounded by size, plus the scope versions.
+
+    Versions are values of one clock, never reused. A scope evicted from
+    the version table reads as the highest version evicted so far: either
+    its own last version (its cached responses are still valid) or a newer
+    one (they are missed), never an older one.
+    """
+
+    blocking = False
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES, max_versions: int = RESPONSE_CACHE_MAX_VERSIONS):
+        self.max_bytes = max_bytes
+        self.max_versions = max_versions
+        # key -> (body, etag, expires_at)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._versions = OrderedDict()
+        self._clock = 0
+        self._evicted_version = 0
+        self._lock = threading.Lock()
+
+    def versions(self, scopes: list) -> list:
+        with self._lock:
+            return [self._versions.get(scope, self._evicted_version) for scope in scopes]
+
+    def bump(self, scopes: list):
+        with self._lock:
+            for scope in scopes:
+                self._clock += 1
+                self._versions[scope] = self._clock
+                self._versions.move_to_end(scope)
+            while len(self._versions) > self.max_versions:
+                _, version = self._versions.popitem(last=False)
+                self._evicted_version = max(self._evicted_version, version)
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            body, etag, expires_at = entry
+            if expires_at <= time.time():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return body, etag
+
+    def set(self, key: str, body: bytes, etag: str):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (body, etag, time.time() + RESPONSE_CACHE_TTL_SECONDS)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str):
+        body, _, _ = self._entries.pop(key)
+        self._bytes -= len(body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisCache:
+    """
+    Responses and versions in Redis, shared by every API process. Versions
+    come from one INCR'd clock, a version key outlives the responses cached
+    under it so an expired scope can't come back with an old version. With
+    maxmemory set, use volatile-ttl so responses are evicted before versions.
+    """
+
+    blocking = True
+
+    def __init__(self, url: str = REDIS_URL):
+        if redis is None:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis but redis is not installed")
+        self.client = redis.Redis.from_url(url)
+
+    def versions(self, scopes: list) -> list:
+        values = self.client.mget([f"rc:version:{scope}" for scope in scopes])
+        return [int(value) if value is not None else 0 for value in values]
+
+    def bump(self, scopes: list):
+        pipeline = self.client.pipeline()
+        for _ in scopes:
+            pipeline.incr("rc:clock")
+        clocks = pipeline.execute()
+        pipeline = self.client.pipeline(transaction=False)
+        for scope, clock in zip(scopes, clocks):
+            pipeline.set(f"rc:version:{scope}", clock, ex=2 * RESPONSE_CACHE_TTL_SECONDS)
+        pipeline.execute()
+
+    def get(self, key: str):
+        value = self.client.get(f"rc:response:{key}")
+        if value is None:
+            return None
+        etag, body = value.split(b"\n", 1)
+        return body, etag.decode()
+
+    def set(self, key: str, body: bytes, etag: str):
+        self.client.set(f"rc:response:{key}", etag.encode() + b"\n" + body, ex=RESPONSE_CACHE_TTL_SECONDS)
+
+
+def create_backend(name: str = RESPONSE_CACHE_BACKEND):
+    if name == "off":
+        return None
+    if name == "redis":
+        return RedisCache()
+    return MemoryCache()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+_backend_created = False
+
+
+def get_backend():
+    global _backend, _backend_created
+    if not _backend_created:
+        with _backend_lock:
+            if not _backend_created:
+                _backend = create_backend()
+                _backend_created = True
+    return _backend
+
+
+def set_backend(backend):
+    """Swap the cache backend (tests, scripts), None turns caching off"""
+    global _backend, _backend_created
+    _backend, _backend_created = backend, True
+
+
+async def _call(backend, method, *args):
+    # Redis round trips are kept off the event loop
+    if backend.blocking:
+        return await run_in_threadpool(method, *args)
+    return method(*args)
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _matches(etag: str, if_none_match: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in tags or "*" in tags
+
+
+def _respond(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _matches(etag, request.headers.get("if-none-match")):
+        metrics.inc("response_cache.not_modified")
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def respond(request: Request, scopes: list, load) -> Response:
+    """
+    JSON response for a read that depends on `scopes`, served from the cache
+    when the same request was answered since the last write to any of them.
+    `load` is the async function producing the response content on a miss.
+    A cache that can't be reached is a miss.
+    """
+    backend = get_backend()
+    key = None
+    if backend is not None:
+        try:
+            versions = await _call(backend, backend.versions, scopes)
+            raw = request.url.path + "?" + str(request.query_params) + "|" + ",".join(
+                f"{scope}={version}" for scope, version in zip(scopes, versions)
+            )
+            key = hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+            cached = await _call(backend, backend.get, key)
+        except Exception as e:
+            print(f"Response cache read failed: {e}")
+            metrics.inc("response_cache.errors")
+            cached = None
+        if cached is not None:
+            metrics.inc("response_cache.hits")
+            return _respond(request, *cached)
+        metrics.inc("response_cache.misses")
+
+    # Rendered the way FastAPI renders a returned value
+    body = JSONResponse(jsonable_encoder(await load())).body
+    etag = _etag(body)
+    if key is not None:
+        try:
+            await _call(backend, backend.set, key, body, etag)
+        except Exception as e:
+            print(f"Response cache write failed: {e}")
+            metrics.inc("response_cache.errors")
+    return _respond(request, body, etag)
+
+
+def invalidate(*scopes: str):
+    """Bump the versions of `scopes`, call after the write is committed"""
+    backend = get_backend()
+    if backend is None or not scopes:
+        return
+    try:
+        backend.bump(list(scopes))
+        metrics.inc("response_cache.invalidations", len(scopes))
+    except Exception as e:
+        # Responses of these scopes can be served stale until they expire
+        print(f"Response cache invalidation failed: {e}")
+        metrics.inc("response_cache.errors")
+
+
+async def invalidate_async(*scopes: str):
+    backend = get_backend()
+    if backend is not None and backend.blocking:
+        await run_in_threadpool(invalidate, *scopes)
+    else:
+        invalidate(*scopes)
@@ -0,0 +1,460 @@
+import asyncio
+import math
+import os
+import pickle
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import UUID
+
+import numpy as np
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core import metrics
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db.session import SessionLocal
+from app.models.posts import Post
+
+load_dotenv()
+
+# BM25 term frequency saturation and document length normalization
+SEARCH_BM25_K1 = float(os.getenv("SEARCH_BM25_K1", "1.2"))
+SEARCH_BM25_B = float(os.getenv("SEARCH_BM25_B", "0.75"))
+# A word of the title counts as this many words of the content
+SEARCH_TITLE_WEIGHT = int(os.getenv("SEARCH_TITLE_WEIGHT", "2"))
+# The index is written here periodically and on shutdown, and loaded on
+# startup so only the posts changed since the snapshot are indexed again
+SEARCH_SNAPSHOT_PATH = Path(os.getenv("SEARCH_SNAPSHOT_PATH", "search_index.snapshot"))
+SEARCH_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("SEARCH_SNAPSHOT_INTERVAL_SECONDS", "600"))
+# Postings are rewritten without deleted posts once they make up this share of the index
+SEARCH_COMPACT_RATIO = float(os.getenv("SEARCH_COMPACT_RATIO", "0.25"))
+
+# Bump when tokenize() or the snapshot layout changes, older snapshots are then ignored
+SNAPSHOT_VERSION = 1
+# Posts created or edited this long before a snapshot was taken are indexed
+# again on load, covering transactions that were still open at that time
+SNAPSHOT_OVERLAP = timedelta(minutes=5)
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i if in into is it its "
+    "me my no not of on or our she so that the their them there they this to was we "
+    "were what when which who will with you your".split()
+)
+
+# Hyphenated line breaks, common in OCR'd columns: "informa-\ntion"
+_line_break_hyphen = re.compile(r"(\w)-[ \t]*\r?\n\s*(\w)")
+_word = re.compile(r"[0-9a-z]+")
+# Accents left as separate characters by NFKD
+_combining_mark = re.compile(r"[\u0300-\u036f]")
+# Digits OCR reads for letters, only fixed inside words ("c0vid", "he1lo"), not in numbers
+_ocr_digit = re.compile(r"(?<=[a-z])[0158]+(?=[a-z])")
+_ocr_digit_letters = str.maketrans("0158", "olsb")
+# word -> index term, most of a corpus is a few hundred thousand distinct words
+_terms = {}
+TERM_CACHE_SIZE = 500_000
+
+
+def _fold(text: str) -> str:
+    """Lowercase ASCII-ish text: compatibility forms (ligatures, fullwidth) folded, accents dropped"""
+    if text.isascii():
+        return text.lower()
+    return _combining_mark.sub("", unicodedata.normalize("NFKD", text)).casefold()
+
+
+def stem(word: str) -> str:
+    """
+    Light suffix stripping (plurals, -ing, -ed, -ly, a final e), enough for
+    "vaccines"/"vaccine" or "hoping"/"hope" to meet. Unlike a full
+    Porter stemmer it rarely merges unrelated words, which matters more on
+    noisy OCR text.
+    """
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith("sses"):
+        word = word[:-2]
+    # Not on 4 letter words, "news" is not the plural of "new"
+    elif word.endswith("s") and len(word) > 4 and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)]
+            # "running" -> "run", "stopped" -> "stop"
+            if word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            break
+    else:
+        if word.endswith("ly") and len(word) > 5:
+            word = word[:-2]
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def _term(word: str) -> str:
+    """Index term of a word, "" if it is not indexed"""
+    if not word.isalpha() and not word.isdigit():
+        word = _ocr_digit.sub(lambda m: m.group().translate(_ocr_digit_letters), word)
+    term = "" if len(word) < 2 or word in STOPWORDS else stem(word)
+    if len(_terms) < TERM_CACHE_SIZE:
+        _terms[word] = term
+    return term
+
+
+def tokenize(text: str) -> list:
+    """Index terms of `text`, in order, stopwords and single characters left out"""
+    if not text:
+        return []
+    if "-" in text and "\n" in text:
+        text = _line_break_hyphen.sub(r"\1\2", text)
+    words = _word.findall(_fold(text))
+    # Most words are already in the cache, looked up without a Python call each
+    terms = list(map(_terms.get, words))
+    if None in terms:
+        terms = [_term(word) if term is None else term for term, word in zip(terms, words)]
+    return [term for term in terms if term]
+
+
+class InvertedIndex:
+    """
+    BM25 index over post titles and contents.
+
+    Each post gets an internal document number (in insertion order). A term's
+    postings are two parallel arrays: the document numbers holding it,
+    ascending, and its frequency in each. Deleting a post only marks its
+    number dead (postings are append-only), re-indexing an edited post is a
+    delete and an add; compact() drops the dead numbers.
+
+    Thread-safe.
+    """
+
+    def __init__(self):
+        # term -> (array("I") of document numbers, array("H") of frequencies)
+        self._postings = {}
+        # document number -> post id, None once deleted
+        self._post_ids = []
+        self._lengths = array("I")
+        self._alive = bytearray()
+        # post id -> document number
+        self._documents = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._documents)
+
+    @property
+    def dead_ratio(self) -> float:
+        return 1 - len(self._documents) / len(self._post_ids) if self._post_ids else 0.0
+
+    def post_ids(self) -> set:
+        with self._lock:
+            return set(self._documents)
+
+    def _remove(self, post_id: UUID):
+        document = self._documents.pop(post_id, None)
+        if document is not None:
+            self._post_ids[document] = None
+            self._alive[document] = 0
+            self._total_length -= self._lengths[document]
+
+    def add(self, post_id: UUID, title: str, content: str):
+        """Index a post, replacing what was indexed for it before"""
+        terms = tokenize(title) * SEARCH_TITLE_WEIGHT + tokenize(content)
+        counts = Counter(terms)
+        with self._lock:
+            self._remove(post_id)
+            document = len(self._post_ids)
+            self._post_ids.append(post_id)
+            self._lengths.append(len(terms))
+            self._alive.append(1)
+            self._documents[post_id] = document
+            self._total_length += len(terms)
+            postings = self._postings
+            for term, count in counts.items():
+                entry = postings.get(term)
+                if entry is None:
+                    entry = postings[term] = (array("I"), array("H"))
+                entry[0].append(document)
+                entry[1].append(count if count < 0xFFFF else 0xFFFF)
+
+    def remove(self, post_id: UUID):
+        with self._lock:
+            self._remove(post_id)
+
+    def search(self, query: str, after: tuple = None, limit: int = 20) -> tuple:
+        """
+        Ids of the `limit` best matching posts after the (score, id) position
+        `after`, best first (ties by id), and the position of the last one
+        (None on the last page). A post matches if it has any of the query
+        terms. Scores depend on the whole index, a page read after posts
+        were added or deleted can repeat or skip a few results.
+        """
+        # Sorted so the same query always sums its term scores in the same
+        # order, cursors compare scores for equality
+        terms = sorted(set(tokenize(query)))
+        with self._lock:
+            live = len(self._documents)
+            if not terms or not live:
+                return [], None
+            average_length = self._total_length / live
+            # Views of the arrays are dropped right after use, an array with
+            # a live view can't grow
+            lengths = np.frombuffer(self._lengths, dtype=np.uint32)
+            alive = np.frombuffer(self._alive, dtype=np.bool_)
+            matched, scored = [], []
+            for term in terms:
+                entry = self._postings.get(term)
+                if entry is None:
+                    continue
+                documents = np.frombuffer(entry[0], dtype=np.uint32)
+                frequencies = np.frombuffer(entry[1], dtype=np.uint16)
+                keep = alive[documents]
+                documents, frequencies = documents[keep], frequencies[keep].astype(np.float64)
+                if not len(documents):
+                    continue
+                idf = math.log(1 + (live - len(documents) + 0.5) / (len(documents) + 0.5))
+                norm = SEARCH_BM25_K1 * (1 - SEARCH_BM25_B + SEARCH_BM25_B * lengths[documents] / average_length)
+                matched.append(documents)
+                scored.append(idf * frequencies * (SEARCH_BM25_K1 + 1) / (frequencies + norm))
+            del lengths, alive, entry
+            if not matched:
+                return [], None
+            if len(matched) == 1:
+                documents, scores = matched[0], scored[0]
+            else:
+                documents, inverse = np.unique(np.concatenate(matched), return_inverse=True)
+                scores = np.bincount(inverse, weights=np.concatenate(scored))
+
+            if after is not None:
+                after_score, after_id = after
+                below = scores < after_score
+                # Same score as the cursor: only the posts ordered after it by id
+                for i in np.flatnonzero(scores == after_score):
+                    below[i] = self._post_ids[documents[i]] > after_id
+                documents, scores = documents[below], scores[below]
+
+            if len(scores) > limit:
+                # Everything scoring at least the limit-th best, ties included
+                threshold = -np.partition(-scores, limit - 1)[limit - 1]
+                top = np.flatnonzero(scores >= threshold)
+            else:
+                top = np.arange(len(scores))
+            results = sorted(((-float(scores[i]), self._post_ids[documents[i]]) for i in top))
+            more = len(scores) > limit
+
+        page = results[:limit]
+        ids = [post_id for _, post_id in page]
+        last = (-page[-1][0], page[-1][1]) if more else None
+        return ids, last
+
+    def compact(self):
+        """Renumber the live documents and rewrite the postings without the dead ones"""
+        with self._lock:
+            alive = np.frombuffer(self._alive, dtype=np.bool_).copy()
+            renumber = np.cumsum(alive, dtype=np.uint32) - 1
+            for term, (documents, frequencies) in list(self._postings.items()):
+                keep = alive[np.frombuffer(documents, dtype=np.uint32)]
+                if not keep.any():
+                    del self._postings[term]
+                    continue
+                documents = renumber[np.frombuffer(documents, dtype=np.uint32)[keep]]
+                frequencies = np.frombuffer(frequencies, dtype=np.uint16)[keep]
+                self._postings[term] = (array("I", documents.tobytes()), array("H", frequencies.tobytes()))
+            self._post_ids = [post_id for post_id in self._post_ids if post_id is not None]
+            self._lengths = array("I", np.frombuffer(self._lengths, dtype=np.uint32)[alive].tobytes())
+            self._alive = bytearray(b"\x01" * len(self._post_ids))
+            self._documents = {post_id: document for document, post_id in enumerate(self._post_ids)}
+
+    def dumps(self) -> bytes:
+        """Serialized index, see loads()"""
+        with self._lock:
+            state = {
+                "version": SNAPSHOT_VERSION,
+                "taken_at": datetime.utcnow(),
+                "title_weight": SEARCH_TITLE_WEIGHT,
+                "postings": self._postings,
+                # 16 bytes per post instead of a pickled UUID object, zeros for deleted ones
+                "post_ids": b"".join(post_id.bytes if post_id else bytes(16) for post_id in self._post_ids),
+                "lengths": self._lengths,
+                "alive": self._alive,
+            }
+            return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def loads(cls, data: bytes) -> tuple:
+        """Index from dumps() and the time its state was taken"""
+        state = pickle.loads(data)
+        if state.get("version") != SNAPSHOT_VERSION or state.get("title_weight") != SEARCH_TITLE_WEIGHT:
+            raise ValueError("snapshot was written by another version or configuration")
+        index = cls()
+        index._postings = state["postings"]
+        raw = state["post_ids"]
+        index._alive = state["alive"]
+        index._post_ids = [
+            UUID(bytes=raw[i * 16:(i + 1) * 16]) if index._alive[i] else None for i in range(len(index._alive))
+        ]
+        index._lengths = state["lengths"]
+        index._documents = {post_id: i for i, post_id in enumerate(index._post_ids) if post_id is not None}
+        index._total_length = int(np.frombuffer(index._lengths, dtype=np.uint32)[
+            np.frombuffer(index._alive, dtype=np.bool_)
+        ].sum(dtype=np.int64))
+        return index, state["taken_at"]
+
+
+_index = InvertedIndex()
+# While a rebuild runs, changes are also recorded here and replayed on the new index
+_changes_during_rebuild = None
+_rebuild_lock = threading.Lock()
+# Set once the index holds every post, a snapshot of a partial index would
+# make the next startup skip the missing posts
+_complete = False
+
+
+def add_post(post_id: UUID, title: str, content: str):
+    """Index a new post, or an edited one again"""
+    with _rebuild_lock:
+        _index.add(post_id, title, content)
+        if _changes_during_rebuild is not None:
+            _changes_during_rebuild.append((post_id, title, content))
+    metrics.set_gauge("search.indexed_posts", len(_index))
+
+
+def remove_post(post_id: UUID):
+    with _rebuild_lock:
+        _index.remove(post_id)
+        if _changes_during_rebuild is not None:
+            _changes_during_rebuild.append((post_id, None, None))
+    metrics.set_gauge("search.indexed_posts", len(_index))
+
+
+def search(query: str, cursor: str = None, limit: int = 20) -> tuple:
+    """Post ids of a page of search results and the cursor of the next one"""
+    after = None
+    if cursor is not None:
+        position = decode_cursor(cursor, ("score", "id"))
+        try:
+            after = (float(position["score"]), UUID(position["id"]))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    with metrics.timer("search.query_seconds"):
+        ids, last = _index.search(query, after, limit)
+    metrics.inc("search.queries")
+    next_cursor = encode_cursor({"score": last[0], "id": str(last[1])}) if last else None
+    return ids, next_cursor
+
+
+def save_snapshot(path: Path = SEARCH_SNAPSHOT_PATH):
+    """
+    Write the index to `path` atomically, compacting it first if many posts
+    were deleted. Updates and searches wait while it is serialized (about 3s
+    at 1M posts, a warm start then loads it in about 6s instead of a full
+    rebuild of several minutes).
+    """
+    if not _complete:
+        print("Search index not built yet, snapshot skipped")
+        return
+    index = _index
+    if index.dead_ratio > SEARCH_COMPACT_RATIO:
+        index.compact()
+    start = time.perf_counter()
+    data = index.dumps()
+    temp = path.with_name(path.name + ".tmp")
+    with open(temp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+    metrics.observe("search.snapshot_seconds", time.perf_counter() - start)
+    metrics.set_gauge("search.snapshot_bytes", len(data))
+
+
+def _load_snapshot(path: Path):
+    try:
+        with open(path, "rb") as f:
+            return InvertedIndex.loads(f.read())
+    except FileNotFoundError:
+        return None, None
+    except Exception as e:
+        print(f"Ignoring unusable search snapshot {path}: {e}")
+        return None, None
+
+
+def _changed_since(db: Session, since: datetime):
+    """Posts created or edited since `since` (a range scan of ix_posts_created_at_id and ix_posts_edited_at)"""
+    return (
+        db.query(Post.id, Post.title, Post.content)
+        .filter(or_(Post.created_at >= since, Post.edited_at >= since))
+        .execution_options(yield_per=10_000)
+    )
+
+
+def rebuild_from_db(db: Session, path: Path = SEARCH_SNAPSHOT_PATH) -> int:
+    """
+    Load the index from the snapshot and catch up with the posts deleted,
+    created or edited since, or index every post if there is no snapshot.
+    Returns the number of posts indexed.
+    """
+    global _index, _changes_during_rebuild, _complete
+    with _rebuild_lock:
+        _changes_during_rebuild = []
+
+    try:
+        index, taken_at = _load_snapshot(path)
+        if index is None:
+            index = InvertedIndex()
+            query = db.query(Post.id, Post.title, Post.content).execution_options(yield_per=10_000)
+        else:
+            live = {post_id for (post_id,) in db.query(Post.id).execution_options(yield_per=50_000)}
+            for post_id in index.post_ids() - live:
+                index.remove(post_id)
+            query = _changed_since(db, taken_at - SNAPSHOT_OVERLAP)
+        for row in query:
+            index.add(row.id, row.title, row.content)
+
+        with _rebuild_lock:
+            for post_id, title, content in _changes_during_rebuild:
+                if title is None:
+                    index.remove(post_id)
+                else:
+                    index.add(post_id, title, content)
+            _index = index
+            _complete = True
+    finally:
+        with _rebuild_lock:
+            _changes_during_rebuild = None
+
+    metrics.set_gauge("search.indexed_posts", len(index))
+    return len(index)
+
+
+def rebuild():
+    """Build the index with its own session, meant to run in the background on startup"""
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        count = rebuild_from_db(db)
+        print(f"Search index built with {count} posts in {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        print(f"Error building search index: {e}")
+    finally:
+        db.close()
+
+
+async def snapshot_periodically():
+    while True:
+        await asyncio.sleep(SEARCH_SNAPSHOT_INTERVAL_SECONDS)
+        try:
+            await run_in_threadpool(save_snapshot)
+        except Exception as e:
+            print(f"Search snapshot failed: {e}")
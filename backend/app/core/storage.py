@@ -0,0 +1,290 @@
+import mimetypes
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from fastapi.responses import FileResponse, RedirectResponse, Response
+
+load_dotenv()
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.exceptions import ClientError
+except ImportError:
+    boto3 = None
+
+# local (default), s3 or memory (tests and scripts)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+STORAGE_LOCAL_ROOT = Path(os.getenv("STORAGE_LOCAL_ROOT", "dest"))
+# When set (e.g. "/_dest/"), local reads are answered with an X-Accel-Redirect
+# header under this internal location and the reverse proxy sends the file
+STORAGE_LOCAL_ACCEL_REDIRECT = os.getenv("STORAGE_LOCAL_ACCEL_REDIRECT")
+# S3 or any S3-compatible store (MinIO, Supabase Storage, R2...)
+S3_BUCKET = os.getenv("S3_BUCKET")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+S3_REGION = os.getenv("S3_REGION")
+S3_ACCESS_KEY_ID = os.getenv("S3_ACCESS_KEY_ID")
+S3_SECRET_ACCESS_KEY = os.getenv("S3_SECRET_ACCESS_KEY")
+S3_PRESIGN_SECONDS = int(os.getenv("S3_PRESIGN_SECONDS", "3600"))
+# Public/CDN base url of the bucket, reads are redirected there instead of to a presigned url
+STORAGE_PUBLIC_BASE_URL = os.getenv("STORAGE_PUBLIC_BASE_URL")
+# Files above this size are uploaded to S3 in parts of this size
+S3_MULTIPART_CHUNK_BYTES = int(os.getenv("S3_MULTIPART_CHUNK_BYTES", str(8 * 1024 * 1024)))
+
+# Keys are content addressed, so the same key always holds the same bytes
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# <sha[:2]>/<sha[2:4]>/<sha>.<ext>, or <sha>.<rendition>.<format> for derived images
+_content_addressed_key = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.[a-z0-9]+)+$")
+
+
+def content_type(key: str) -> str:
+    return mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+
+def strong_etag(key: str):
+    """
+    ETag of a content-addressed key, derived from the key alone so it needs
+    no read of the object. None for legacy keys, whose bytes aren't pinned.
+    """
+    if not _content_addressed_key.match(key):
+        return None
+    return f'"{key.rsplit("/", 1)[-1]}"'
+
+
+def cache_headers(key: str) -> dict:
+    etag = strong_etag(key)
+    if etag is None:
+        return {}
+    return {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+
+
+def not_modified(key: str, if_none_match: str = None):
+    """304 response when the client already holds this key, else None"""
+    etag = strong_etag(key)
+    if etag is None or not if_none_match:
+        return None
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    if etag in tags or "*" in tags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(key))
+    return None
+
+
+class StorageBackend:
+    """
+    Where uploaded images live. Keys are relative paths such as
+    "ab/cd/<sha256>.jpg", served to clients under /dest/<key>.
+    """
+
+    name = "base"
+
+    def put_file(self, key: str, path: Path):
+        """Store the file at `path` under `key` (the local file is consumed)"""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def read_bytes(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    def response(self, key: str) -> Response:
+        """HTTP response for GET /dest/<key>, ideally one that keeps the bytes out of the Python workers"""
+        raise NotImplementedError
+
+
+class LocalStorage(StorageBackend):
+    name = "local"
+
+    def __init__(self, root: Path = STORAGE_LOCAL_ROOT, accel_redirect: str = STORAGE_LOCAL_ACCEL_REDIRECT):
+        self.root = root
+        self.accel_redirect = accel_redirect
+
+    def path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+        return path
+
+    def put_file(self, key: str, path: Path):
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Same filesystem as the upload temp dir, so this is an atomic rename
+        os.replace(path, target)
+
+    def exists(self, key: str) -> bool:
+        return self.path(key).is_file()
+
+    def delete(self, key: str):
+        path = self.path(key)
+        path.unlink(missing_ok=True)
+        # Remove the shard directories the file leaves empty
+        for directory in (path.parent, path.parent.parent):
+            if directory == self.root.resolve():
+                break
+            try:
+                directory.rmdir()
+            except OSError:
+                break
+
+    def read_bytes(self, key: str) -> bytes:
+        return self.path(key).read_bytes()
+
+    def response(self, key: str) -> Response:
+        path = self.path(key)
+        if not path.is_file():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+        if self.accel_redirect:
+            # The proxy serves the file (Range included) from its internal location
+            return Response(
+                headers={
+                    "X-Accel-Redirect": f"{self.accel_redirect.rstrip('/')}/{key}",
+                    "Content-Type": content_type(key),
+                    **cache_headers(key),
+                }
+            )
+        # FileResponse answers Range and If-Range requests itself
+        return FileResponse(path, media_type=content_type(key), headers=cache_headers(key))
+
+
+class S3Storage(StorageBackend):
+    name = "s3"
+
+    def __init__(self, bucket: str = S3_BUCKET, public_base_url: str = STORAGE_PUBLIC_BASE_URL):
+        if boto3 is None:
+            raise RuntimeError("STORAGE_BACKEND=s3 but boto3 is not installed")
+        if not bucket:
+            raise RuntimeError("STORAGE_BACKEND=s3 needs S3_BUCKET")
+        self.bucket = bucket
+        self.public_base_url = public_base_url
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=S3_ENDPOINT_URL,
+            region_name=S3_REGION,
+            aws_access_key_id=S3_ACCESS_KEY_ID,
+            aws_secret_access_key=S3_SECRET_ACCESS_KEY,
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_CHUNK_BYTES,
+            multipart_chunksize=S3_MULTIPART_CHUNK_BYTES,
+        )
+
+    def put_file(self, key: str, path: Path):
+        # upload_file streams from disk and switches to a multipart upload for large files.
+        # The bucket answers Range requests on the redirected reads.
+        self.client.upload_file(
+            str(path),
+            self.bucket,
+            key,
+            ExtraArgs={"ContentType": content_type(key), "CacheControl": IMMUTABLE_CACHE_CONTROL},
+            Config=self.transfer_config,
+        )
+        path.unlink(missing_ok=True)
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def read_bytes(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    def response(self, key: str) -> Response:
+        if self.public_base_url:
+            url = f"{self.public_base_url.rstrip('/')}/{key}"
+        else:
+            url = self.client.generate_presigned_url(
+                "get_object",
+                Params={"Bucket": self.bucket, "Key": key},
+                ExpiresIn=S3_PRESIGN_SECONDS,
+            )
+        return RedirectResponse(url, status_code=status.HTTP_302_FOUND)
+
+
+class MemoryStorage(StorageBackend):
+    """In-process fake for tests and scripts, nothing touches disk after put_file"""
+
+    name = "memory"
+
+    def __init__(self):
+        self.objects = {}
+        self._lock = threading.Lock()
+
+    def put_file(self, key: str, path: Path):
+        data = path.read_bytes()
+        path.unlink(missing_ok=True)
+        with self._lock:
+            self.objects[key] = data
+
+    def exists(self, key: str) -> bool:
+        with self._lock:
+            return key in self.objects
+
+    def delete(self, key: str):
+        with self._lock:
+            self.objects.pop(key, None)
+
+    def read_bytes(self, key: str) -> bytes:
+        with self._lock:
+            data = self.objects.get(key)
+        if data is None:
+            raise FileNotFoundError(key)
+        return data
+
+    def response(self, key: str) -> Response:
+        try:
+            data = self.read_bytes(key)
+        except FileNotFoundError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+        return Response(data, media_type=content_type(key), headers=cache_headers(key))
+
+
+def create_backend(name: str = STORAGE_BACKEND) -> StorageBackend:
+    if name == "s3":
+        return S3Storage()
+    if name == "memory":
+        return MemoryStorage()
+    return LocalStorage()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> StorageBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+
+def set_backend(backend: StorageBackend):
+    """Swap the storage backend (tests, scripts)"""
+    global _backend
+    _backend = backend
+
+
+def copy_to_file(key: str, path: Path):
+    """Materialize a stored object as a local file (OCR and image processing need one)"""
+    backend = get_backend()
+    if isinstance(backend, LocalStorage):
+        shutil.copyfile(backend.path(key), path)
+    else:
+        path.write_bytes(backend.read_bytes(key))
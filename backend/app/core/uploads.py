@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import uuid4
+
+import anyio
+from dotenv import load_dotenv
+from fastapi import HTTPException, UploadFile, status
+
+load_dotenv()
+
+# Largest accepted image, in bytes
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(64 * 1024)))
+# Room for the multipart envelope and the other form fields around the file
+_MULTIPART_OVERHEAD = 64 * 1024
+
+
+def sniff_image_type(head: bytes):
+    """Return the file extension matching the image's magic bytes, or None"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return ".gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head[:4] in (b"II*\x00", b"MM\x00*"):
+        return ".tiff"
+    if head.startswith(b"BM"):
+        return ".bmp"
+    return None
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    sha256: str
+    size: int
+    extension: str
+
+
+async def save_upload(file: UploadFile, dest_dir: Path, name: str = None) -> StoredUpload:
+    """
+    Stream an uploaded image to `dest_dir` in UPLOAD_CHUNK_BYTES chunks.
+
+    The first chunk is sniffed (415 if it is not an image), the size is
+    checked as it grows (413 past UPLOAD_MAX_BYTES) and the SHA-256 is
+    computed on the way. Data goes to a hidden temp file that is renamed into
+    place only once complete, so readers never see a partial image.
+    The file is named `name` (a fresh UUID by default) plus the sniffed extension.
+    """
+    await anyio.Path(dest_dir).mkdir(parents=True, exist_ok=True)
+    temp_path = dest_dir / f".upload-{uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+    extension = None
+
+    try:
+        async with await anyio.open_file(temp_path, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                if extension is None:
+                    extension = sniff_image_type(chunk)
+                    if extension is None:
+                        raise HTTPException(
+                            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                            detail="File is not a supported image",
+                        )
+                size += len(chunk)
+                if size > UPLOAD_MAX_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Image is larger than {UPLOAD_MAX_BYTES} bytes",
+                    )
+                digest.update(chunk)
+                await out.write(chunk)
+
+        if size == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty file")
+
+        final_path = dest_dir / f"{name or uuid4()}{extension}"
+        await anyio.to_thread.run_sync(os.replace, temp_path, final_path)
+    except BaseException:
+        await anyio.Path(temp_path).unlink(missing_ok=True)
+        raise
+
+    return StoredUpload(path=final_path, sha256=digest.hexdigest(), size=size, extension=extension)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Cuts multipart uploads off while they are still being received.
+
+    Requests announcing a larger Content-Length are answered with 413 before
+    any of the body is read; chunked requests are counted as they stream in
+    and get the same 413 as soon as they go past the limit, instead of the
+    whole body being parsed and spooled first.
+    """
+
+    def __init__(self, app, max_bytes: int = UPLOAD_MAX_BYTES + _MULTIPART_OVERHEAD):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": f"Upload is larger than {UPLOAD_MAX_BYTES} bytes"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            return await self.app(scope, receive, send)
+
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            return await self._reject(send)
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    # Makes the form parser fail, the error response is replaced by a 413 below
+                    raise RuntimeError("upload too large")
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if exceeded:
+                if message["type"] == "http.response.start" and not response_started:
+                    response_started = True
+                    await self._reject(send)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except RuntimeError:
+            if not exceeded:
+                raise
+            if not response_started:
+                await self._reject(send)
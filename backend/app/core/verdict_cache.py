@@ -0,0 +1,264 @@
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core import metrics
+from app.core.verification import check_news_authenticity, check_news_authenticity_async
+from app.models.verdict_cache import VerdictCache
+
+load_dotenv()
+
+VERDICT_CACHE_TTL_SECONDS = int(os.getenv("VERDICT_CACHE_TTL_SECONDS", "86400"))
+VERDICT_CACHE_MAX_ENTRIES = int(os.getenv("VERDICT_CACHE_MAX_ENTRIES", "10000"))
+VERDICT_CACHE_DISABLED = os.getenv("VERDICT_CACHE_DISABLED", "false").lower() in ("1", "true")
+
+_whitespace = re.compile(r"\s+")
+
+
+def normalize_text(news_text: str) -> str:
+    """Normalize text so trivially different copies of a post share a key"""
+    text = unicodedata.normalize("NFKC", news_text or "")
+    return _whitespace.sub(" ", text).strip().lower()
+
+
+def text_hash(news_text: str) -> str:
+    return hashlib.sha256(normalize_text(news_text).encode("utf-8")).hexdigest()
+
+
+class _LRUCache:
+    """Small thread-safe LRU with a per-entry expiry time"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            verdict, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return verdict
+
+    def set(self, key: str, verdict: dict, expires_at: float):
+        with self._lock:
+            self._entries[key] = (verdict, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_memory = _LRUCache(VERDICT_CACHE_MAX_ENTRIES)
+
+
+def _load_from_db(key: str, db: Session):
+    row = db.query(VerdictCache).filter(VerdictCache.text_hash == key).first()
+    if row is None:
+        return None
+    if row.expires_at <= datetime.utcnow():
+        db.delete(row)
+        db.commit()
+        return None
+
+    # Reuse the remaining lifetime of the row for the memory tier
+    remaining = (row.expires_at - datetime.utcnow()).total_seconds()
+    verdict = {
+        "real": row.real,
+        "credibility_score": row.credibility_score,
+        "verified": True,
+    }
+    _memory.set(key, verdict, time.time() + remaining)
+    return verdict
+
+
+def _store_in_db(key: str, verdict: dict, db: Session):
+    now = datetime.utcnow()
+    values = {
+        "text_hash": key,
+        "real": bool(verdict["real"]),
+        "credibility_score": float(verdict["credibility_score"]),
+        "created_at": now,
+        "expires_at": now + timedelta(seconds=VERDICT_CACHE_TTL_SECONDS),
+    }
+    stmt = insert(VerdictCache).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[VerdictCache.text_hash],
+        set_={k: v for k, v in values.items() if k != "text_hash"},
+    )
+    db.execute(stmt)
+    db.commit()
+
+
+def lookup(news_text: str, db: Session):
+    """
+    Look a verdict up in the memory tier, then in the persistent tier.
+
+    Returns:
+        The cached verdict dict, or None on a miss
+    """
+    key = text_hash(news_text)
+
+    verdict = _memory.get(key)
+    if verdict is not None:
+        metrics.inc("verdict_cache.hits.memory")
+        return verdict
+
+    try:
+        verdict = _load_from_db(key, db)
+    except Exception as e:
+        db.rollback()
+        print(f"Error reading verdict cache: {e}")
+        verdict = None
+
+    if verdict is not None:
+        metrics.inc("verdict_cache.hits.db")
+        return verdict
+
+    metrics.inc("verdict_cache.misses")
+    return None
+
+
+async def lookup_async(news_text: str, db: AsyncSession):
+    """lookup() for async handlers, the persistent tier is read through the AsyncSession"""
+    key = text_hash(news_text)
+
+    verdict = _memory.get(key)
+    if verdict is not None:
+        metrics.inc("verdict_cache.hits.memory")
+        return verdict
+
+    try:
+        verdict = await db.run_sync(lambda session: _load_from_db(key, session))
+    except Exception as e:
+        await db.rollback()
+        print(f"Error reading verdict cache: {e}")
+        verdict = None
+
+    if verdict is not None:
+        metrics.inc("verdict_cache.hits.db")
+        return verdict
+
+    metrics.inc("verdict_cache.misses")
+    return None
+
+
+def store(news_text: str, verdict: dict, db: Session):
+    """Save a verdict in both tiers. Fallback (unverified) verdicts are never cached."""
+    if not verdict.get("verified", False):
+        return
+
+    key = text_hash(news_text)
+    cached = {
+        "real": bool(verdict["real"]),
+        "credibility_score": float(verdict["credibility_score"]),
+        "verified": True,
+    }
+    _memory.set(key, cached, time.time() + VERDICT_CACHE_TTL_SECONDS)
+    try:
+        _store_in_db(key, verdict, db)
+    except Exception as e:
+        db.rollback()
+        print(f"Error writing verdict cache: {e}")
+
+
+def get_verdict(news_text: str, db: Session, bypass: bool = False) -> dict:
+    """
+    Return the verdict for `news_text`, only calling the LLM on a cache miss.
+
+    Args:
+        news_text: The news text to verify
+        db: Database session used for the persistent tier
+        bypass: Skip the cache lookup and always ask the LLM (the fresh
+            verdict is still written back to the cache)
+
+    Returns:
+        Same structure as check_news_authenticity
+    """
+    if VERDICT_CACHE_DISABLED:
+        return check_news_authenticity(news_text)
+
+    if bypass:
+        metrics.inc("verdict_cache.bypass")
+    else:
+        verdict = lookup(news_text, db)
+        if verdict is not None:
+            return verdict
+
+    verdict = check_news_authenticity(news_text)
+    store(news_text, verdict, db)
+    return verdict
+
+
+async def get_verdict_async(news_text: str, db: Session, bypass: bool = False, verify=None) -> dict:
+    """
+    Async version of get_verdict.
+
+    The memory tier is checked inline, the persistent tier runs in the
+    threadpool and the LLM call is awaited on the shared async client.
+    `verify` overrides the coroutine used on a miss (defaults to
+    check_news_authenticity_async).
+    """
+    verify = verify or check_news_authenticity_async
+    if VERDICT_CACHE_DISABLED:
+        return await verify(news_text)
+
+    if bypass:
+        metrics.inc("verdict_cache.bypass")
+    else:
+        verdict = _memory.get(text_hash(news_text))
+        if verdict is not None:
+            metrics.inc("verdict_cache.hits.memory")
+            return verdict
+        verdict = await run_in_threadpool(lookup, news_text, db)
+        if verdict is not None:
+            return verdict
+
+    verdict = await verify(news_text)
+    await run_in_threadpool(store, news_text, verdict, db)
+    return verdict
+
+
+def purge_expired(db: Session) -> int:
+    """Delete expired rows from the persistent tier, returns the number removed"""
+    deleted = (
+        db.query(VerdictCache)
+        .filter(VerdictCache.expires_at <= datetime.utcnow())
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
+
+
+def stats() -> dict:
+    hits = metrics.get_counter("verdict_cache.hits.memory") + metrics.get_counter("verdict_cache.hits.db")
+    misses = metrics.get_counter("verdict_cache.misses")
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / total if total else 0.0,
+        "memory_entries": len(_memory),
+    }
@@ -1,50 +1,89 @@
 import os
 import json
+import threading
+
+import httpx
 from dotenv import load_dotenv
 
 load_dotenv()
 
 try:
     from google import genai
+    from google.genai import types
 except ImportError:
     genai = None
 
 GEMINI_KEY = os.getenv("GEMINI_KEY")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+# Bounds for the connection pool shared by every verification call in this process
+GEMINI_MAX_CONNECTIONS = int(os.getenv("GEMINI_MAX_CONNECTIONS", "20"))
+GEMINI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GEMINI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+GEMINI_KEEPALIVE_EXPIRY = float(os.getenv("GEMINI_KEEPALIVE_EXPIRY", "60"))
+# HTTP timeout of a single Gemini request, so even the sync path cannot hang forever
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))
 # print(GEMINI_KEY)
 
-def check_news_authenticity(news_text: str):
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
     """
-    Checks if the given news text is real and returns a structured JSON response.
-    
-    Args:
-        news_text: The news text to verify
-    
-    Returns:
-        {
-          "real": bool,
-          "credibility_score": float (0.0 to 1.0)
-        }
+    Return the process-wide Gemini client, creating it on first use.
+
+    The client keeps its sync and async httpx pools alive between calls so
+    TLS sessions and connections are reused instead of rebuilt per post.
     """
-    if not GEMINI_KEY:
-        # Fallback if API key is not configured
-        # print("No API key found")
-        return {
-            "real": True,
-            "credibility_score": 0.5
-        }
-    
-    if not genai:
-        # Fallback if google-genai package is not installed
-        # print("No google-genai package found")
-        return {
-            "real": True,
-            "credibility_score": 0.5
-        }
-    
-    try:
-        client = genai.Client(api_key=GEMINI_KEY)
-        
-        prompt = f"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                limits = httpx.Limits(
+                    max_connections=GEMINI_MAX_CONNECTIONS,
+                    max_keepalive_connections=GEMINI_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=GEMINI_KEEPALIVE_EXPIRY,
+                )
+                _client = genai.Client(
+                    api_key=GEMINI_KEY,
+                    http_options=types.HttpOptions(
+                        timeout=int(GEMINI_TIMEOUT_SECONDS * 1000),
+                        client_args={"limits": limits},
+                        async_client_args={"limits": limits},
+                    ),
+                )
+    return _client
+
+
+async def close_client():
+    """Close the shared client's connection pools (called on app shutdown)"""
+    global _client
+    if _client is None:
+        return
+    client, _client = _client, None
+    await client.aio.aclose()
+    client.close()
+
+
+def verification_text(post) -> str:
+    """Pick the text of a post that gets verified (content, then URL, then title)"""
+    return post.content if post.content else (post.url if post.url else post.title)
+
+
+def _fallback(credibility_score: float) -> dict:
+    return {
+        "real": True,
+        "credibility_score": credibility_score,
+        "verified": False
+    }
+
+
+def _can_call_llm() -> bool:
+    # Fallback if API key is not configured or google-genai package is not installed
+    return bool(GEMINI_KEY) and genai is not None
+
+
+def _build_prompt(news_text: str) -> str:
+    return f"""
         Analyze the following news and respond strictly in valid JSON format.
         News: \"\"\"{news_text}\"\"\"
         Respond ONLY in the following JSON structure:
@@ -53,37 +92,158 @@ def check_news_authenticity(news_text: str):
           "credibility_score": float between 0.0 and 1.0
         }}
         """
-        
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt
-        )
-        
-        # print(response)
-        
-        # Try to parse JSON safely
+
+
+def _parse_response(response_text: str) -> dict:
+    # Try to parse JSON safely
+    try:
+        result = json.loads(response_text[7:-4])
+        # Ensure the result has the expected structure
+        if "real" not in result or "credibility_score" not in result:
+            raise ValueError("Invalid response structure")
+        # Convert credibility_score to float and ensure it's between 0 and 1
+        result["credibility_score"] = max(0.0, min(1.0, float(result.get("credibility_score", 0.5)))*100)
+        result["real"] = bool(result.get("real", True))
+        result["verified"] = True
+        return result
+    except (json.JSONDecodeError, ValueError, TypeError) as e:
+        # Fallback in case model outputs extra text or invalid JSON
+        # print(f"Error parsing Gemini response: {e}")
+        return _fallback(0.69)
+
+
+def _build_batch_prompt(news_texts: list) -> str:
+    items = "\n".join(
+        f'{{"id": {i}, "news": {json.dumps(text)}}}' for i, text in enumerate(news_texts)
+    )
+    return f"""
+        Analyze each of the following news items independently and respond strictly in valid JSON format.
+        Items (one JSON object per line):
+        {items}
+        Respond ONLY with a JSON array containing one object per item, in this structure:
+        [
+          {{
+            "id": the item id,
+            "real": true or false,
+            "credibility_score": float between 0.0 and 1.0
+          }}
+        ]
+        """
+
+
+def _strip_code_fence(response_text: str) -> str:
+    text = response_text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text
+
+
+def _parse_batch_response(response_text: str, size: int) -> list:
+    """
+    Parse a JSON array of verdicts into a list aligned with the request.
+    Items that are missing or malformed are None so the caller can retry them alone.
+    """
+    results = [None] * size
+    try:
+        items = json.loads(_strip_code_fence(response_text))
+    except (json.JSONDecodeError, TypeError):
+        return results
+    if not isinstance(items, list):
+        return results
+
+    for item in items:
         try:
-            result = json.loads(response.text[7:-4])
-            # Ensure the result has the expected structure
-            if "real" not in result or "credibility_score" not in result:
-                raise ValueError("Invalid response structure")
-            # Convert credibility_score to float and ensure it's between 0 and 1
-            result["credibility_score"] = max(0.0, min(1.0, float(result.get("credibility_score", 0.5)))*100)
-            result["real"] = bool(result.get("real", True))
-            return result
-        except (json.JSONDecodeError, ValueError) as e:
-            # Fallback in case model outputs extra text or invalid JSON
-            # print(f"Error parsing Gemini response: {e}")
-            # print(f"Raw response: {response.text}")
-            return {
-                "real": True,
-                "credibility_score": 0.69
+            i = int(item["id"])
+            if not 0 <= i < size or "real" not in item or "credibility_score" not in item:
+                continue
+            results[i] = {
+                "real": bool(item["real"]),
+                "credibility_score": max(0.0, min(1.0, float(item["credibility_score"])))*100,
+                "verified": True,
             }
+        except (KeyError, ValueError, TypeError):
+            continue
+    return results
+
+
+def check_news_authenticity(news_text: str):
+    """
+    Checks if the given news text is real and returns a structured JSON response.
+
+    Args:
+        news_text: The news text to verify
+
+    Returns:
+        {
+          "real": bool,
+          "credibility_score": float (0.0 to 1.0),
+          "verified": bool (False when a fallback verdict was returned)
+        }
+    """
+    if not _can_call_llm():
+        return _fallback(0.5)
+
+    try:
+        response = get_client().models.generate_content(
+            model=GEMINI_MODEL,
+            contents=_build_prompt(news_text)
+        )
+        return _parse_response(response.text)
     except Exception as e:
         # print(f"Error calling Gemini API: {e}")
         # Fallback on error
-        return {
-            "real": True,
-            "credibility_score": 0.5
-        }
+        return _fallback(0.5)
+
+
+async def generate_verdict_async(news_text: str):
+    """
+    Like check_news_authenticity_async, but raises when the request itself
+    fails instead of returning a fallback, so callers (circuit breaker,
+    retries) can tell an outage from an answer.
+    """
+    if not _can_call_llm():
+        return _fallback(0.5)
+
+    response = await get_client().aio.models.generate_content(
+        model=GEMINI_MODEL,
+        contents=_build_prompt(news_text)
+    )
+    return _parse_response(response.text)
+
+
+async def check_news_authenticity_async(news_text: str):
+    """
+    Async version of check_news_authenticity.
+
+    Uses the shared client's async connection pool so the caller's event
+    loop is free while the LLM is thinking. Returns the same structure.
+    """
+    try:
+        return await generate_verdict_async(news_text)
+    except Exception as e:
+        # print(f"Error calling Gemini API: {e}")
+        return _fallback(0.5)
+
+
+async def check_news_authenticity_batch_async(news_texts: list) -> list:
+    """
+    Verify several news texts with a single LLM request.
+
+    Args:
+        news_texts: The news texts to verify
+
+    Returns:
+        A list aligned with news_texts holding a verdict dict (same structure as
+        check_news_authenticity) or None for items the model did not answer properly.
+        Raises if the request itself fails so callers can fall back to single calls.
+    """
+    if not _can_call_llm():
+        return [_fallback(0.5) for _ in news_texts]
 
+    response = await get_client().aio.models.generate_content(
+        model=GEMINI_MODEL,
+        contents=_build_batch_prompt(news_texts)
+    )
+    return _parse_batch_response(response.text, len(news_texts))
@@ -0,0 +1,112 @@
+import asyncio
+import os
+
+from dotenv import load_dotenv
+
+from app.core import metrics
+from app.core.resilience import CircuitOpenError
+
+load_dotenv()
+
+# A batch is sent as soon as it holds this many items ...
+VERIFICATION_BATCH_SIZE = int(os.getenv("VERIFICATION_BATCH_SIZE", "16"))
+# ... or when the oldest item has waited this long
+VERIFICATION_BATCH_WAIT_MS = float(os.getenv("VERIFICATION_BATCH_WAIT_MS", "50"))
+
+
+class VerificationBatcher:
+    """
+    Micro-batching stage in front of the verifier.
+
+    Callers await submit() with a single text. Texts are collected for up to
+    `max_items` items or `max_wait_ms` milliseconds and sent to `verify_batch`
+    as one request. Each caller gets its own verdict back; items the batch did
+    not answer (None) are retried alone through `verify_one` so one bad item
+    never fails the others.
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        verify_batch,
+        verify_one,
+        max_items: int = VERIFICATION_BATCH_SIZE,
+        max_wait_ms: float = VERIFICATION_BATCH_WAIT_MS,
+    ):
+        self.verify_batch = verify_batch
+        self.verify_one = verify_one
+        self.max_items = max_items
+        self.max_wait_ms = max_wait_ms
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+    async def submit(self, news_text: str) -> dict:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((news_text, future))
+
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            self._spawn(self._run_batch(batch))
+
+    def _spawn(self, coro):
+        # Keep a reference so the task is not garbage collected mid-flight
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: list):
+        if len(batch) == 1:
+            text, future = batch[0]
+            await self._run_single(text, future)
+            return
+
+        metrics.inc("verification.batch.requests")
+        metrics.inc("verification.batch.items", len(batch))
+
+        try:
+            results = await self.verify_batch([text for text, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError("batch returned the wrong number of verdicts")
+        except CircuitOpenError as e:
+            # Retrying alone would fail fast the same way
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except Exception as e:
+            metrics.inc("verification.batch.errors")
+            results = [None] * len(batch)
+
+        for (text, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if result is None:
+                metrics.inc("verification.batch.fallbacks")
+                self._spawn(self._run_single(text, future))
+            else:
+                future.set_result(result)
+
+    async def _run_single(self, text: str, future):
+        try:
+            result = await self.verify_one(text)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
@@ -0,0 +1,267 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy import and_, or_, select, update
+from starlette.concurrency import run_in_threadpool
+
+from app.core import metrics, near_duplicate, ranking, response_cache, verdict_cache
+from app.core.resilience import CircuitOpenError, LimiterFullError
+from app.core.verification import verification_text
+from app.core.verifiers import get_verifier
+from app.db.session import SessionLocal
+from app.models.posts import Post
+from app.models.verification_jobs import VerificationJob
+
+load_dotenv()
+
+# Each worker has at most one verdict in flight, so this also caps how full a
+# micro-batch (VERIFICATION_BATCH_SIZE) can get
+VERIFICATION_WORKERS = int(os.getenv("VERIFICATION_WORKERS", "16"))
+VERIFICATION_MAX_ATTEMPTS = int(os.getenv("VERIFICATION_MAX_ATTEMPTS", "5"))
+VERIFICATION_RETRY_BASE_SECONDS = float(os.getenv("VERIFICATION_RETRY_BASE_SECONDS", "2"))
+VERIFICATION_LEASE_SECONDS = float(os.getenv("VERIFICATION_LEASE_SECONDS", "120"))
+# Idle workers re-check the jobs table this often, picking up retries,
+# expired leases and jobs queued by other processes
+VERIFICATION_POLL_SECONDS = float(os.getenv("VERIFICATION_POLL_SECONDS", "5"))
+
+_loop = None
+_wakeups = None
+_tasks = []
+
+
+def notify():
+    """
+    Wake one idle worker because a new job was committed.
+    Safe to call from the threadpool, it is a no-op when the workers are not running.
+    """
+    if _loop is None or _wakeups is None:
+        return
+    _loop.call_soon_threadsafe(_wakeups.put_nowait, None)
+
+
+def _claim_job():
+    """
+    Atomically move one claimable job to `running` and return it.
+
+    A job is claimable when it is pending or unverified and its backoff has
+    elapsed, or when it is running but its lease expired (the worker holding it died).
+    SKIP LOCKED lets several processes poll the same table safely.
+    """
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        job_id = (
+            select(VerificationJob.id)
+            .where(
+                or_(
+                    and_(
+                        VerificationJob.status.in_(("pending", "unverified")),
+                        VerificationJob.next_attempt_at <= now,
+                    ),
+                    and_(VerificationJob.status == "running", VerificationJob.locked_until < now),
+                )
+            )
+            .order_by(VerificationJob.next_attempt_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(VerificationJob)
+            .where(VerificationJob.id == job_id)
+            .values(
+                status="running",
+                attempts=VerificationJob.attempts + 1,
+                locked_until=now + timedelta(seconds=VERIFICATION_LEASE_SECONDS),
+                updated_at=now,
+            )
+            .returning(
+                VerificationJob.id,
+                VerificationJob.post_id,
+                VerificationJob.attempts,
+                VerificationJob.bypass_cache,
+            )
+        )
+        job = db.execute(stmt).first()
+        db.commit()
+        return job
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _complete_job(job, text: str, verdict: dict):
+    db = SessionLocal()
+    try:
+        # Verdicts straight from the verifier carry their tier, cache hits do not
+        updated = db.execute(
+            update(Post)
+            .where(Post.id == job.post_id)
+            .values(real=bool(verdict.get("real", True)), credibility_score=float(verdict.get("credibility_score", 0.5)))
+            .returning(Post.user_id)
+        ).first()
+        db.query(VerificationJob).filter(VerificationJob.id == job.id).update(
+            {
+                VerificationJob.status: "done",
+                VerificationJob.verified_by: verdict.get("tier", "cache"),
+                VerificationJob.last_error: None,
+                VerificationJob.locked_until: None,
+            }
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    near_duplicate.add_post(job.post_id, text, verdict)
+    ranking.set_verdict(job.post_id, bool(verdict.get("real", True)), float(verdict.get("credibility_score", 0.5)))
+    if updated is not None:
+        response_cache.invalidate(
+            response_cache.post_scope(job.post_id), response_cache.FEED_SCOPE, response_cache.user_scope(updated.user_id)
+        )
+
+
+def _fail_job(job, error: str):
+    """Schedule a retry with exponential backoff, or give up after VERIFICATION_MAX_ATTEMPTS"""
+    db = SessionLocal()
+    try:
+        values = {
+            VerificationJob.last_error: error[:500],
+            VerificationJob.locked_until: None,
+        }
+        if job.attempts >= VERIFICATION_MAX_ATTEMPTS:
+            values[VerificationJob.status] = "failed"
+            metrics.inc("verification.jobs.failed")
+        else:
+            backoff = VERIFICATION_RETRY_BASE_SECONDS * (2 ** (job.attempts - 1))
+            values[VerificationJob.status] = "pending"
+            values[VerificationJob.next_attempt_at] = datetime.utcnow() + timedelta(seconds=backoff)
+            metrics.inc("verification.jobs.retried")
+        db.query(VerificationJob).filter(VerificationJob.id == job.id).update(values)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _defer_job(job, status: str, retry_at: datetime, error: str):
+    """
+    Put a job back without using up an attempt, for calls that failed fast
+    because the LLM was unavailable (circuit open) or saturated (no free slot).
+    """
+    db = SessionLocal()
+    try:
+        db.query(VerificationJob).filter(VerificationJob.id == job.id).update(
+            {
+                VerificationJob.status: status,
+                VerificationJob.attempts: VerificationJob.attempts - 1,
+                VerificationJob.last_error: error[:500],
+                VerificationJob.next_attempt_at: retry_at,
+                VerificationJob.locked_until: None,
+            }
+        )
+        db.commit()
+    finally:
+        db.close()
+    metrics.inc(f"verification.jobs.deferred.{status}")
+
+
+def _load_text(post_id):
+    db = SessionLocal()
+    try:
+        post = db.query(Post).filter(Post.id == post_id).first()
+        return verification_text(post) if post is not None else None
+    finally:
+        db.close()
+
+
+async def _verify(news_text: str) -> dict:
+    verdict = await get_verifier().verify(news_text)
+    return {"tier": "llm", **verdict}
+
+
+async def process_job(job):
+    """Verify the post behind a claimed job and store the verdict on it"""
+    text = await run_in_threadpool(_load_text, job.post_id)
+    if text is None:
+        # Post was deleted in the meantime, the job row went with it
+        return
+
+    db = SessionLocal()
+    try:
+        verdict = await verdict_cache.get_verdict_async(
+            text,
+            db=db,
+            bypass=job.bypass_cache,
+            verify=_verify,
+        )
+    finally:
+        await run_in_threadpool(db.close)
+
+    if not verdict.get("verified", False):
+        raise RuntimeError("verifier returned an unverified fallback verdict")
+
+    await run_in_threadpool(_complete_job, job, text, verdict)
+    metrics.inc("verification.jobs.done")
+
+
+async def run_once() -> bool:
+    """Claim and process a single job. Returns False when there was nothing to do."""
+    job = await run_in_threadpool(_claim_job)
+    if job is None:
+        return False
+
+    try:
+        await process_job(job)
+    except CircuitOpenError as e:
+        # Degraded mode: the post stays unverified until the breaker lets calls through again
+        retry_at = datetime.utcfromtimestamp(e.retry_at)
+        await run_in_threadpool(_defer_job, job, "unverified", retry_at, str(e))
+    except LimiterFullError as e:
+        retry_at = datetime.utcnow() + timedelta(seconds=VERIFICATION_RETRY_BASE_SECONDS)
+        await run_in_threadpool(_defer_job, job, "pending", retry_at, str(e))
+    except Exception as e:
+        await run_in_threadpool(_fail_job, job, str(e))
+    return True
+
+
+async def _worker():
+    while True:
+        try:
+            if await run_once():
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error in verification worker: {e}")
+
+        try:
+            await asyncio.wait_for(_wakeups.get(), timeout=VERIFICATION_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def start(workers: int = VERIFICATION_WORKERS):
+    """
+    Start the worker pool on the running event loop.
+    Jobs left pending or running by a previous process are picked up by the first poll.
+    """
+    global _loop, _wakeups
+    _loop = asyncio.get_running_loop()
+    _wakeups = asyncio.Queue()
+    for _ in range(workers):
+        _tasks.append(asyncio.create_task(_worker()))
+
+
+async def stop():
+    global _loop, _wakeups
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+    _loop = None
+    _wakeups = None
@@ -0,0 +1,248 @@
+import asyncio
+import hashlib
+import os
+
+from dotenv import load_dotenv
+
+from app.core import metrics
+from app.core.local_scorer import get_scorer
+from app.core.resilience import CircuitBreaker, ConcurrencyLimiter, call_with_deadline
+from app.core.verification import check_news_authenticity_batch_async, generate_verdict_async
+from app.core.verification_batcher import VERIFICATION_BATCH_SIZE, VerificationBatcher
+
+load_dotenv()
+
+# "gemini" (default) or "fake" for local runs and tests without network access
+VERIFIER_BACKEND = os.getenv("VERIFIER_BACKEND", "gemini").lower()
+# Put the local scorer in front of the LLM. Scores strictly inside the
+# uncertainty band (probability of being credible) are escalated to the LLM.
+VERIFIER_LOCAL_TIER = os.getenv("VERIFIER_LOCAL_TIER", "true").lower() in ("1", "true")
+TIER_UNCERTAINTY_LOW = float(os.getenv("TIER_UNCERTAINTY_LOW", "0.2"))
+TIER_UNCERTAINTY_HIGH = float(os.getenv("TIER_UNCERTAINTY_HIGH", "0.8"))
+# Guards around every LLM request: a deadline per request, a cap on requests
+# in flight (and on how long to wait for a slot), and a circuit breaker that
+# opens after consecutive failures and probes again after the recovery time
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_LIMITER_MAX_WAIT_SECONDS = float(os.getenv("LLM_LIMITER_MAX_WAIT_SECONDS", "10"))
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+LLM_BREAKER_RECOVERY_SECONDS = float(os.getenv("LLM_BREAKER_RECOVERY_SECONDS", "30"))
+
+
+class Verifier:
+    """
+    Interface for anything that can produce a verdict for a piece of news.
+
+    verify() returns the same structure as check_news_authenticity:
+    {"real": bool, "credibility_score": float, "verified": bool}
+    """
+
+    name = "base"
+
+    async def verify(self, news_text: str) -> dict:
+        raise NotImplementedError
+
+    async def verify_batch(self, news_texts: list) -> list:
+        """
+        Verify several texts at once. Returns a list aligned with news_texts, an
+        item may be None when it could not be verified as part of the batch.
+        """
+        return list(await asyncio.gather(*(self.verify(text) for text in news_texts)))
+
+
+class GeminiVerifier(Verifier):
+    name = "gemini"
+
+    async def verify(self, news_text: str) -> dict:
+        return await generate_verdict_async(news_text)
+
+    async def verify_batch(self, news_texts: list) -> list:
+        return await check_news_authenticity_batch_async(news_texts)
+
+
+class GuardedVerifier(Verifier):
+    """
+    Wraps every request to `inner` in a concurrency slot, a deadline and a
+    circuit breaker. Timeouts and errors count as breaker failures; while the
+    circuit is open calls raise CircuitOpenError right away instead of
+    piling up behind a slow or failing LLM.
+    """
+
+    def __init__(
+        self,
+        inner: Verifier,
+        timeout: float = LLM_TIMEOUT_SECONDS,
+        breaker: CircuitBreaker = None,
+        limiter: ConcurrencyLimiter = None,
+    ):
+        self.inner = inner
+        self.name = inner.name
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker(
+            "llm",
+            failure_threshold=LLM_BREAKER_FAILURE_THRESHOLD,
+            recovery_seconds=LLM_BREAKER_RECOVERY_SECONDS,
+        )
+        self.limiter = limiter or ConcurrencyLimiter(
+            "llm",
+            max_concurrent=LLM_MAX_CONCURRENCY,
+            max_wait=LLM_LIMITER_MAX_WAIT_SECONDS,
+        )
+
+    async def _call(self, method, argument):
+        # The slot is taken first so a half-open probe is never stuck waiting for one
+        async with self.limiter:
+            self.breaker.allow()
+            try:
+                result = await call_with_deadline(method(argument), self.timeout, "verification.llm")
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def verify(self, news_text: str) -> dict:
+        return await self._call(self.inner.verify, news_text)
+
+    async def verify_batch(self, news_texts: list) -> list:
+        return await self._call(self.inner.verify_batch, news_texts)
+
+
+class BatchingVerifier(Verifier):
+    """Routes single verify() calls through a VerificationBatcher around `inner`"""
+
+    def __init__(self, inner: Verifier, max_items: int = VERIFICATION_BATCH_SIZE):
+        self.inner = inner
+        self.name = inner.name
+        self.max_items = max_items
+        self._batcher = None
+
+    async def verify(self, news_text: str) -> dict:
+        # Created lazily so the batcher lives on the loop that uses it
+        if self._batcher is None:
+            self._batcher = VerificationBatcher(
+                verify_batch=self.inner.verify_batch,
+                verify_one=self.inner.verify,
+                max_items=self.max_items,
+            )
+        return await self._batcher.submit(news_text)
+
+    async def verify_batch(self, news_texts: list) -> list:
+        return await self.inner.verify_batch(news_texts)
+
+
+class TieredVerifier(Verifier):
+    """
+    Two-tier verifier: the local scorer answers confident items, only items
+    whose score falls inside [low, high] (or every item while the scorer is
+    untrained) are escalated to `llm`. Verdicts carry the tier that produced them.
+    """
+
+    name = "tiered"
+
+    def __init__(self, llm: Verifier, low: float = TIER_UNCERTAINTY_LOW, high: float = TIER_UNCERTAINTY_HIGH):
+        self.llm = llm
+        self.low = low
+        self.high = high
+
+    def _local_verdicts(self, news_texts: list) -> list:
+        """Local verdicts for confident items, None for items that must be escalated"""
+        scorer = get_scorer()
+        if not scorer.trained:
+            return [None] * len(news_texts)
+
+        with metrics.timer("verification.tier.local.seconds"):
+            scores = scorer.score(news_texts)
+
+        verdicts = []
+        for score in scores.tolist():
+            if self.low < score < self.high:
+                verdicts.append(None)
+            else:
+                verdicts.append({
+                    "real": score >= 0.5,
+                    "credibility_score": round(score * 100, 2),
+                    "verified": True,
+                    "tier": "local",
+                })
+        return verdicts
+
+    def _record(self, verdicts: list):
+        decided = sum(1 for verdict in verdicts if verdict is not None)
+        metrics.inc("verification.tier.local.decided", decided)
+        metrics.inc("verification.tier.escalated", len(verdicts) - decided)
+        total = metrics.get_counter("verification.tier.local.decided") + metrics.get_counter("verification.tier.escalated")
+        metrics.set_gauge("verification.tier.escalation_rate", metrics.get_counter("verification.tier.escalated") / total)
+
+    async def verify(self, news_text: str) -> dict:
+        verdict = self._local_verdicts([news_text])[0]
+        self._record([verdict])
+        if verdict is not None:
+            return verdict
+
+        with metrics.timer("verification.tier.llm.seconds"):
+            verdict = await self.llm.verify(news_text)
+        return {**verdict, "tier": "llm"}
+
+    async def verify_batch(self, news_texts: list) -> list:
+        verdicts = self._local_verdicts(news_texts)
+        self._record(verdicts)
+        escalated = [i for i, verdict in enumerate(verdicts) if verdict is None]
+        if escalated:
+            with metrics.timer("verification.tier.llm.seconds"):
+                llm_verdicts = await self.llm.verify_batch([news_texts[i] for i in escalated])
+            for i, verdict in zip(escalated, llm_verdicts):
+                verdicts[i] = {**verdict, "tier": "llm"} if verdict is not None else None
+        return verdicts
+
+
+class FakeVerifier(Verifier):
+    """
+    Deterministic local verifier, no network involved.
+
+    The verdict is derived from a hash of the text so the same input always
+    gets the same answer. `latency` simulates LLM think time and
+    `fail_times` makes the first N calls raise, to exercise retries.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency: float = 0.0, fail_times: int = 0):
+        self.latency = latency
+        self.fail_times = fail_times
+        self.calls = 0
+
+    async def verify(self, news_text: str) -> dict:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.calls <= self.fail_times:
+            raise RuntimeError("fake verifier failure")
+
+        digest = hashlib.sha256((news_text or "").encode("utf-8")).digest()
+        credibility_score = round(digest[0] / 255 * 100, 2)
+        return {
+            "real": credibility_score >= 50,
+            "credibility_score": credibility_score,
+            "verified": True,
+        }
+
+
+_verifier = None
+
+
+def get_verifier() -> Verifier:
+    global _verifier
+    if _verifier is None:
+        _verifier = GuardedVerifier(FakeVerifier() if VERIFIER_BACKEND == "fake" else GeminiVerifier())
+        if VERIFICATION_BATCH_SIZE > 1:
+            _verifier = BatchingVerifier(_verifier)
+        if VERIFIER_LOCAL_TIER:
+            _verifier = TieredVerifier(_verifier)
+    return _verifier
+
+
+def set_verifier(verifier: Verifier):
+    """Swap the verifier used by the background workers (tests, scripts)"""
+    global _verifier
+    _verifier = verifier
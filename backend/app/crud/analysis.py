@@ -1,3 +1,4 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.analysis import Analysis
 from fastapi import HTTPException,status,Response
@@ -64,4 +65,66 @@ def delete_analysis(a_id:UUID,db:Session):
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+
+async def create_analysis_async(analysis:AnalysisBase,db:AsyncSession)->Analysis:
+    try:
+        db_analysis = Analysis(
+            user_id = analysis.user_id,
+            post_id= analysis.post_id,
+            credibility_score = analysis.credibility_score
+        )
+        db.add(db_analysis)
+        await db.commit()
+        await db.refresh(db_analysis)
+
+        return db_analysis
+
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"internal server error {e}"
+        )
+
+async def get_analysis_async(a_id:UUID,db:AsyncSession)->Analysis:
+    try:
+        db_analysis = await db.get(Analysis, a_id)
+        if db_analysis is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="analysis not found",
+            )
+
+        return db_analysis
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+async def delete_analysis_async(a_id:UUID,db:AsyncSession):
+    try:
+        db_analysis = await db.get(Analysis, a_id)
+
+        if db_analysis is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Analysis not found"
+            )
+
+        await db.delete(db_analysis)
+        await db.commit()
+
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
@@ -1,4 +1,7 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.security import create_access_token, verify_password
 from app.models.users import User
@@ -25,6 +28,16 @@ def authenticate_user(db: Session, email: str, password: str) -> User | None:
     return user
 
 
+async def authenticate_user_async(db: AsyncSession, email: str, password: str) -> User | None:
+    """authenticate_user() for async handlers, bcrypt runs in the threadpool"""
+    user = (await db.execute(select(User).where(User.email == email))).scalars().first()
+    if not user:
+        return None
+    if not await run_in_threadpool(verify_password, password, str(user.hashed_password)):
+        return None
+    return user
+
+
 def create_token_for_user(user: User) -> str:
     data = {"sub": str(user.email)}
     return create_access_token(data=data)
\ No newline at end of file
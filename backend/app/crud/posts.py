@@ -1,34 +1,41 @@
-from app.schemas.posts import PostBase, PostRead
+from app.schemas.posts import PostBase, PostPage, VerificationStatus
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 from app.models.posts import Post
-from app.core.verification import check_news_authenticity
+from app.core import near_duplicate, ranking, response_cache, search, verdict_cache, verification_worker
+from app.core.verification import verification_text
+from app.models.verification_jobs import VerificationJob
 from fastapi import HTTPException,status,Response
 from typing import List
 from uuid import UUID, uuid4
 from app.models.users import User
-from app.core.image import extractTextFromImage
+from app.core import blob_store, ocr_cache, ocr_pool
+from app.core.pagination import PAGE_DEFAULT_LIMIT, decode_cursor, encode_cursor
 import time
+from datetime import datetime
 from pathlib import Path
 from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
 from app.schemas.posts import PostBase
 
-# Local storage directory
-DEST_DIR = Path("dest")
 
-def create_post(post:PostBase,db:Session)->Post:
+def create_post(post:PostBase,db:Session,bypass_cache:bool=False,verification_result:dict=None)->Post:
+    """
+    Save a post right away. If the verdict is already known (passed in or found in the
+    verdict cache) it is stored with the post, otherwise the post is saved with
+    real/credibility_score pending and a verification job is queued for the workers.
+    """
     try:
-        # Prepare text for verification (use content or URL)
-        text_to_verify = post.content if post.content else (post.url if post.url else post.title)
-        
-        # Verify the content using Gemini AI
-        verification_result = check_news_authenticity(text_to_verify)
-        print(verification_result)
-        print(text_to_verify)
-        
-        # Extract verification results
-        is_real = verification_result.get("real", True)
-        credibility_score = verification_result.get("credibility_score", 0.5)
-        
+        news_text = verification_text(post)
+
+        # Duplicate texts are served from the verdict cache, reposts with small
+        # edits or OCR noise from the near-duplicate index
+        if verification_result is None and not bypass_cache:
+            verification_result = verdict_cache.lookup(news_text, db=db)
+            if verification_result is None:
+                verification_result = near_duplicate.find_verdict(news_text)
+
         db_post = Post(
             user_id = post.user_id,
             likes = post.likes,
@@ -36,21 +43,78 @@ def create_post(post:PostBase,db:Session)->Post:
             title= post.title,
             content = post.content,
             url=post.url,
-            real=str(is_real).lower(),  # Store as string 'true' or 'false'
-            credibility_score=str(credibility_score)  # Store as string to preserve precision
         )
-        
+
+        if verification_result is not None:
+            db_post.real = bool(verification_result.get("real", True))
+            db_post.credibility_score = float(verification_result.get("credibility_score", 0.5))
+
         db.add(db_post)
+        if verification_result is None:
+            # Post id is needed for the job, flush assigns it without committing
+            db.flush()
+            db.add(VerificationJob(post_id=db_post.id, bypass_cache=bypass_cache))
         db.commit()
         db.refresh(db_post)
+        ranking.add_post(db_post)
+        search.add_post(db_post.id, db_post.title, db_post.content)
+        response_cache.invalidate(response_cache.FEED_SCOPE, response_cache.user_scope(db_post.user_id))
+
+        if verification_result is None:
+            verification_worker.notify()
+        else:
+            near_duplicate.add_post(db_post.id, news_text, verification_result)
         return db_post
     
+    except blob_store.BlobMissingError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The image this post points at does not exist anymore, upload it again"
+        )
     except Exception as e:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"internal server error {e}"
         )
+
+def get_verification_status(p_id:UUID,db:Session)->VerificationStatus:
+    try:
+        db_post = db.query(Post).filter(Post.id == p_id).first()
+        if db_post is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="posts not found",
+            )
+
+        job = db.query(VerificationJob).filter(VerificationJob.post_id == p_id).first()
+
+        # Posts served from the verdict cache never get a job
+        if job is None:
+            return VerificationStatus(
+                post_id=p_id,
+                status="done" if db_post.real is not None else "pending",
+                real=db_post.real,
+                credibility_score=db_post.credibility_score,
+            )
+
+        return VerificationStatus(
+            post_id=p_id,
+            status=job.status,
+            attempts=job.attempts,
+            last_error=job.last_error,
+            next_attempt_at=job.next_attempt_at if job.status in ("pending", "unverified") else None,
+            real=db_post.real,
+            credibility_score=db_post.credibility_score,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
         
 def get_post(p_id:UUID,db:Session)->List[Post]:
     try:
@@ -70,26 +134,111 @@ def get_post(p_id:UUID,db:Session)->List[Post]:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-def get_posts(db: Session, page: int = 1, limit: int = 20) -> List[Post]:
+def _feed_keys(sort: str) -> tuple:
+    """Columns a feed page is ordered (and resumed) by"""
+    if sort == "score":
+        return (Post.credibility_score, Post.id)
+    return (Post.created_at, Post.id)
+
+
+def _feed_query(cursor: str = None, limit: int = PAGE_DEFAULT_LIMIT, credible_only: bool = False, sort: str = "recent"):
+    """
+    Posts ordered by (created_at, id), or by (credibility_score, id) for
+    sort="score", descending, so the order is total and stable. A page after
+    `cursor` starts right below the last post of the previous one (an index
+    range scan on ix_posts_created_at_id, or on the partial indexes for the
+    credible-only and score orders), so deep pages cost the same as the first.
+    Posts waiting for a verdict have no score and are left out of sort="score".
+    One extra row tells if there is a next page.
+    """
+    keys = _feed_keys(sort)
+    query = (
+        select(Post)
+        .options(joinedload(Post.user))
+        .order_by(*(column.desc() for column in keys))
+        .limit(limit + 1)
+    )
+    if credible_only:
+        query = query.where(Post.real.is_(True))
+    if sort == "score":
+        query = query.where(Post.credibility_score.isnot(None))
+    if cursor is not None:
+        position = decode_cursor(cursor, tuple(column.key for column in keys))
+        try:
+            if sort == "score":
+                last = float(position["credibility_score"])
+            else:
+                last = datetime.fromisoformat(position["created_at"])
+            post_id = UUID(position["id"])
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.where(tuple_(*keys) < (last, post_id))
+    return query
+
+
+def _feed_page(posts: list, limit: int, sort: str = "recent") -> PostPage:
+    if len(posts) <= limit:
+        return PostPage(items=posts, next_cursor=None)
+    last = posts[limit - 1]
+    if sort == "score":
+        position = {"credibility_score": last.credibility_score, "id": str(last.id)}
+    else:
+        position = {"created_at": last.created_at.isoformat(), "id": str(last.id)}
+    return PostPage(items=posts[:limit], next_cursor=encode_cursor(position))
+
+
+def _posts_by_ids_query(ids: list):
+    return select(Post).options(joinedload(Post.user)).where(Post.id.in_(ids))
+
+
+def _ordered_page(ids: list, posts: list, next_cursor: str, forget) -> PostPage:
+    """
+    Posts in the order of `ids` (from the hot ranking or the search index).
+    Posts deleted without going through delete_post (with their user) are
+    passed to `forget` to drop them from where the ids came from, that page
+    is shorter.
+    """
+    by_id = {post.id: post for post in posts}
+    for post_id in ids:
+        if post_id not in by_id:
+            forget(post_id)
+    return PostPage(items=[by_id[post_id] for post_id in ids if post_id in by_id], next_cursor=next_cursor)
+
+
+def get_posts(
+    db: Session,
+    cursor: str = None,
+    limit: int = PAGE_DEFAULT_LIMIT,
+    credible_only: bool = False,
+    sort: str = "recent",
+) -> PostPage:
     try:
-        # Calculate offset based on page number
-        offset = (page - 1) * limit
+        if sort == "hot":
+            # Order and page come from the precomputed ranking, the query only loads the posts by id
+            ids, next_cursor = ranking.page(cursor, limit, credible_only)
+            posts = db.execute(_posts_by_ids_query(ids)).scalars().all() if ids else []
+            return _ordered_page(ids, list(posts), next_cursor, ranking.remove_post)
+        posts = db.execute(_feed_query(cursor, limit, credible_only, sort)).scalars().all()
+        return _feed_page(list(posts), limit, sort)
 
-        # Query posts with pagination and eagerly load user relationship
-        db_posts = (
-            db.query(Post)
-            .options(joinedload(Post.user))
-            .offset(offset)
-            .limit(limit)
-            .all()
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
         )
 
-        if not db_posts:
-            # Return empty list instead of raising error for better UX
-            return []
-
-        return db_posts
+def search_posts(db: Session, query: str, cursor: str = None, limit: int = PAGE_DEFAULT_LIMIT) -> PostPage:
+    """Posts matching `query`, best BM25 match first, ranked by the in-process search index"""
+    try:
+        ids, next_cursor = search.search(query, cursor, limit)
+        posts = db.execute(_posts_by_ids_query(ids)).scalars().all() if ids else []
+        return _ordered_page(ids, list(posts), next_cursor, search.remove_post)
 
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -124,13 +273,18 @@ def update_post(post_id:UUID,post:PostBase,db:Session):
                 detail="user not found",
             )
 
-        db.query(Post).filter(Post.id == post_id).update(
-            {
-                Post.title:post.title,
-                Post.content:post.content,
-            }
-        )
+        updated = db.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(title=post.title, content=post.content, edited_at=datetime.utcnow())
+            .returning(Post.user_id)
+        ).first()
         db.commit()
+        if updated is not None:
+            search.add_post(post_id, post.title, post.content)
+            response_cache.invalidate(
+                response_cache.post_scope(post_id), response_cache.FEED_SCOPE, response_cache.user_scope(updated.user_id)
+            )
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     except HTTPException:
         raise
@@ -150,8 +304,16 @@ def delete_post(post_id:UUID,db:Session):
                 detail="Post not found"
             )
 
+        # Attributes expire on commit and the row is gone by then
+        owner_id = db_post.user_id
         db.delete(db_post)
         db.commit()
+        near_duplicate.remove_post(post_id)
+        ranking.remove_post(post_id)
+        search.remove_post(post_id)
+        response_cache.invalidate(
+            response_cache.post_scope(post_id), response_cache.FEED_SCOPE, response_cache.user_scope(owner_id)
+        )
 
         return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -163,150 +325,308 @@ def delete_post(post_id:UUID,db:Session):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
         
-async def upload_image(file:UploadFile, post_id: UUID = None):
+async def upload_image(file:UploadFile, db: AsyncSession):
     try:
-        # Read the file content
-        file_bytes = await file.read()
-
-        # Get file extension from original filename
-        file_extension = Path(file.filename).suffix if file.filename else ".jpg"
-        
-        # Create file name using post_id if provided, otherwise use UUID
-        if post_id:
-            file_name = f"{post_id}{file_extension}"
-        else:
-            # Use UUID as temporary name, will be renamed when post is created
-            file_name = f"{uuid4()}{file_extension}"
-
-        # Ensure dest directory exists
-        DEST_DIR.mkdir(parents=True, exist_ok=True)
-
-        # Save file locally
-        file_path = DEST_DIR / file_name
-        with open(file_path, "wb") as f:
-            f.write(file_bytes)
-
-        # Return relative path that can be used to serve the file
-        # In production, you might want to serve this via a static file endpoint
-        public_url = f"/dest/{file_name}"
+        # Stream the file into content-addressed storage, uploading the same
+        # image twice returns the same url
+        public_url = await blob_store.store_upload(file, db)
 
         return {
             "message": "Upload successful",
-            "file_name": file_name,
-            "file_path": str(file_path),
+            "file_name": Path(public_url).name,
             "public_url": public_url,
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def rename_image_to_post_id(old_url: str, post_id: UUID, db: Session = None):
-    """
-    Rename an uploaded image file to use the post ID as the filename.
-    This is called after post creation to ensure files are named with their post ID.
-    """
-    try:
-        # Extract filename from URL (e.g., "/dest/uuid.jpg" -> "uuid.jpg")
-        if not old_url.startswith("/dest/"):
-            return  # Not a local file, skip renaming
-        
-        old_filename = old_url.replace("/dest/", "")
-        old_file_path = DEST_DIR / old_filename
-        
-        # Check if file exists
-        if not old_file_path.exists():
-            return  # File doesn't exist, skip renaming
-        
-        # Get file extension
-        file_extension = Path(old_filename).suffix
-        
-        # Create new filename with post ID
-        new_filename = f"{post_id}{file_extension}"
-        new_file_path = DEST_DIR / new_filename
-        
-        # Rename the file
-        old_file_path.rename(new_file_path)
-        
-        # Update post URL in database if db session is provided
-        if db:
-            new_url = f"/dest/{new_filename}"
-            db.query(Post).filter(Post.id == post_id).update({Post.url: new_url})
-            db.commit()
-        
-        return new_file_path
-        
-    except Exception as e:
-        # Log error but don't fail the post creation
-        print(f"Error renaming image file: {e}")
-        return None
-
 async def upload_image_and_create_post(
     file: UploadFile,
     user_id: UUID,
     title: str,
-    db: Session
+    db: AsyncSession
 ) -> Post:
     """
     Upload an image, extract text from it, and create a post with the extracted text.
-    The post URL will be set to the post ID.
+    The post URL points at the image in content-addressed storage.
     """
     try:
-        # Step 1: Upload and save the image locally with UUID
-        file_bytes = await file.read()
-        file_extension = Path(file.filename).suffix if file.filename else ".jpg"
-        temp_file_name = f"{uuid4()}{file_extension}"
-        
-        # Ensure dest directory exists
-        DEST_DIR.mkdir(parents=True, exist_ok=True)
-        
-        # Save file locally
-        temp_file_path = DEST_DIR / temp_file_name
-        with open(temp_file_path, "wb") as f:
-            f.write(file_bytes)
-        
-        # Step 2: Extract text from the image
-        extracted_text = extractTextFromImage(str(temp_file_path))
-        
-        # Step 3: Create post with extracted text
-        # The URL will be set to the post ID after creation
+        # Step 1: Stream the image to a local temp file
+        stored = await blob_store.receive_upload(file)
+        image_path = str(stored.path)
+
+        # Step 2: Extract text from the local copy, reusing the text of a
+        # perceptually identical upload or else in the OCR process pool
+        try:
+            image_hash = await run_in_threadpool(ocr_cache.image_hash, image_path)
+            extracted_text = await run_in_threadpool(ocr_cache.lookup, image_hash)
+            if extracted_text is None:
+                extracted_text = await ocr_pool.extract_text(image_path)
+                ocr_cache.store(image_hash, extracted_text)
+        except ocr_pool.OCRQueueFullError:
+            stored.path.unlink(missing_ok=True)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many images are being processed, try again shortly",
+                headers={"Retry-After": str(ocr_pool.OCR_RETRY_AFTER_SECONDS)},
+            )
+        except ocr_pool.OCRTimeoutError:
+            stored.path.unlink(missing_ok=True)
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="Text extraction took too long",
+            )
+        except BaseException:
+            stored.path.unlink(missing_ok=True)
+            raise
+
+        # Step 3: Move the image into content-addressed storage
+        image_url = await blob_store.place_upload(stored, db)
+
+        # Step 4: Create the post, which takes a reference on the image
         post_data = PostBase(
             user_id=user_id,
             title=title,
             content=extracted_text,
-            url=f"/dest/{temp_file_name}",  # Temporary URL, will be updated
+            url=image_url,
             likes=0,
             dislikes=0
         )
-        
-        # Step 4: Create the post
-        created_post = create_post(post=post_data, db=db)
-        
-        # Step 5: Rename image file to use post ID
-        file_extension = Path(temp_file_name).suffix
-        new_file_name = f"{created_post.id}{file_extension}"
-        new_file_path = DEST_DIR / new_file_name
-        temp_file_path.rename(new_file_path)
-        
-        # Step 6: Update post URL to use post ID
-        new_url = f"/dest/{created_post.id}{file_extension}"
-        db.query(Post).filter(Post.id == created_post.id).update({Post.url: new_url})
-        db.commit()
-        db.refresh(created_post)
-        
-        # Ensure the URL is set correctly in the returned object
-        created_post.url = new_url
-        
-        return created_post
-        
+        return await create_post_async(post=post_data, db=db)
+
+    except HTTPException:
+        # An image left without a post is reclaimed by the blob GC
+        raise
     except Exception as e:
-        db.rollback()
-        # Clean up temp file if it exists
-        if 'temp_file_path' in locals() and temp_file_path.exists():
-            try:
-                temp_file_path.unlink()
-            except:
-                pass
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error uploading image and creating post: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+# Async versions for the request handlers, on an AsyncSession. The sync
+# functions above stay for scripts and the background workers.
+
+async def create_post_async(post:PostBase,db:AsyncSession,bypass_cache:bool=False,verification_result:dict=None)->Post:
+    """create_post() for async handlers"""
+    try:
+        news_text = verification_text(post)
+
+        if verification_result is None and not bypass_cache:
+            verification_result = await verdict_cache.lookup_async(news_text, db=db)
+            if verification_result is None:
+                # MinHash of the text is CPU work, kept off the event loop
+                verification_result = await run_in_threadpool(near_duplicate.find_verdict, news_text)
+
+        db_post = Post(
+            user_id = post.user_id,
+            likes = post.likes,
+            dislikes = post.dislikes,
+            title= post.title,
+            content = post.content,
+            url=post.url,
+        )
+
+        if verification_result is not None:
+            db_post.real = bool(verification_result.get("real", True))
+            db_post.credibility_score = float(verification_result.get("credibility_score", 0.5))
+
+        db.add(db_post)
+        if verification_result is None:
+            # Post id is needed for the job, flush assigns it without committing
+            await db.flush()
+            db.add(VerificationJob(post_id=db_post.id, bypass_cache=bypass_cache))
+        await db.commit()
+        await db.refresh(db_post)
+        ranking.add_post(db_post)
+        # Tokenizing a long OCR'd text is CPU work, kept off the event loop
+        await run_in_threadpool(search.add_post, db_post.id, db_post.title, db_post.content)
+        await response_cache.invalidate_async(response_cache.FEED_SCOPE, response_cache.user_scope(db_post.user_id))
+
+        if verification_result is None:
+            verification_worker.notify()
+        else:
+            await run_in_threadpool(near_duplicate.add_post, db_post.id, news_text, verification_result)
+        return db_post
+
+    except blob_store.BlobMissingError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The image this post points at does not exist anymore, upload it again"
+        )
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"internal server error {e}"
+        )
+
+async def get_verification_status_async(p_id:UUID,db:AsyncSession)->VerificationStatus:
+    try:
+        db_post = await db.get(Post, p_id)
+        if db_post is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="posts not found",
+            )
+
+        job = (await db.execute(select(VerificationJob).where(VerificationJob.post_id == p_id))).scalars().first()
+
+        # Posts served from the verdict cache never get a job
+        if job is None:
+            return VerificationStatus(
+                post_id=p_id,
+                status="done" if db_post.real is not None else "pending",
+                real=db_post.real,
+                credibility_score=db_post.credibility_score,
+            )
+
+        return VerificationStatus(
+            post_id=p_id,
+            status=job.status,
+            attempts=job.attempts,
+            last_error=job.last_error,
+            next_attempt_at=job.next_attempt_at if job.status in ("pending", "unverified") else None,
+            real=db_post.real,
+            credibility_score=db_post.credibility_score,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+async def get_post_async(p_id:UUID,db:AsyncSession)->Post:
+    try:
+        db_post = await db.get(Post, p_id)
+        if db_post is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="posts not found",
+            )
+
+        return db_post
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+async def get_posts_async(
+    db: AsyncSession,
+    cursor: str = None,
+    limit: int = PAGE_DEFAULT_LIMIT,
+    credible_only: bool = False,
+    sort: str = "recent",
+) -> PostPage:
+    try:
+        if sort == "hot":
+            ids, next_cursor = ranking.page(cursor, limit, credible_only)
+            posts = (await db.execute(_posts_by_ids_query(ids))).scalars().all() if ids else []
+            return _ordered_page(ids, list(posts), next_cursor, ranking.remove_post)
+        # The user relationship is loaded up front, lazy loads can't run on an AsyncSession
+        posts = (await db.execute(_feed_query(cursor, limit, credible_only, sort))).scalars().all()
+        return _feed_page(list(posts), limit, sort)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+async def search_posts_async(db: AsyncSession, query: str, cursor: str = None, limit: int = PAGE_DEFAULT_LIMIT) -> PostPage:
+    try:
+        # Scoring runs in NumPy over the postings of every query term, off the event loop
+        ids, next_cursor = await run_in_threadpool(search.search, query, cursor, limit)
+        posts = (await db.execute(_posts_by_ids_query(ids))).scalars().all() if ids else []
+        return _ordered_page(ids, list(posts), next_cursor, search.remove_post)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+async def get_posts_by_user_async(user_id: UUID, db: AsyncSession) -> List[Post]:
+    """Get all posts created by a specific user"""
+    try:
+        result = await db.execute(
+            select(Post)
+            .options(joinedload(Post.user))
+            .where(Post.user_id == user_id)
+            .order_by(Post.created_at.desc())  # Most recent first
+        )
+        return list(result.scalars().all())
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+async def update_post_async(post_id:UUID,post:PostBase,db:AsyncSession):
+    try:
+        updated = (
+            await db.execute(
+                update(Post)
+                .where(Post.id == post_id)
+                .values(title=post.title, content=post.content, edited_at=datetime.utcnow())
+                .returning(Post.user_id)
+            )
+        ).first()
+        await db.commit()
+        if updated is not None:
+            await run_in_threadpool(search.add_post, post_id, post.title, post.content)
+            await response_cache.invalidate_async(
+                response_cache.post_scope(post_id), response_cache.FEED_SCOPE, response_cache.user_scope(updated.user_id)
+            )
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+async def delete_post_async(post_id:UUID,db:AsyncSession):
+    try:
+        db_post = await db.get(Post, post_id)
+
+        if db_post is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Post not found"
+            )
+
+        owner_id = db_post.user_id
+        await db.delete(db_post)
+        await db.commit()
+        near_duplicate.remove_post(post_id)
+        ranking.remove_post(post_id)
+        search.remove_post(post_id)
+        await response_cache.invalidate_async(
+            response_cache.post_scope(post_id), response_cache.FEED_SCOPE, response_cache.user_scope(owner_id)
+        )
+
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
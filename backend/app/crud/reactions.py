@@ -0,0 +1,104 @@
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import reactions
+from app.models.posts import Post
+from app.models.reactions import Reaction
+from app.schemas.posts import ReactionCounts
+
+REACTION_VALUES = {"like": 1, "dislike": -1}
+
+
+def _deltas(value: int, sign: int) -> tuple:
+    """(likes, dislikes) change for adding (sign 1) or removing (sign -1) a reaction"""
+    return (sign, 0) if value == 1 else (0, sign)
+
+
+async def _counts(post_id: UUID, reaction: str | None, db: AsyncSession) -> ReactionCounts:
+    """Counts as stored plus what is still waiting in the reaction buffer"""
+    db_post = await db.get(Post, post_id, populate_existing=True)
+    if db_post is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="posts not found",
+        )
+    likes, dislikes = reactions.pending(post_id)
+    return ReactionCounts(
+        post_id=post_id,
+        likes=(db_post.likes or 0) + likes,
+        dislikes=(db_post.dislikes or 0) + dislikes,
+        reaction=reaction,
+    )
+
+
+async def react_async(post_id: UUID, user_id: UUID, reaction: str, db: AsyncSession) -> ReactionCounts:
+    """
+    Like or dislike a post. A user has one reaction per post: repeating it
+    changes nothing, the other one replaces it.
+    """
+    value = REACTION_VALUES[reaction]
+    try:
+        if await db.get(Post, post_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="posts not found",
+            )
+        # One statement decides what changed, so double clicks can't count twice.
+        # No row: same reaction as before. xmax = 0: the row is new.
+        changed = (
+            await db.execute(
+                insert(Reaction)
+                .values(user_id=user_id, post_id=post_id, value=value)
+                .on_conflict_do_update(
+                    index_elements=[Reaction.user_id, Reaction.post_id],
+                    set_={"value": value, "updated_at": datetime.utcnow()},
+                    where=Reaction.value != value,
+                )
+                .returning(literal_column("xmax = 0").label("inserted"))
+            )
+        ).first()
+        await db.commit()
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"internal server error {e}"
+        )
+
+    if changed is not None:
+        likes, dislikes = _deltas(value, 1)
+        if not changed.inserted:
+            # Switched from the opposite reaction
+            undo_likes, undo_dislikes = _deltas(-value, -1)
+            likes, dislikes = likes + undo_likes, dislikes + undo_dislikes
+        reactions.record(post_id, likes, dislikes)
+    return await _counts(post_id, reaction, db)
+
+
+async def remove_reaction_async(post_id: UUID, user_id: UUID, db: AsyncSession) -> ReactionCounts:
+    try:
+        value = (
+            await db.execute(
+                delete(Reaction)
+                .where(Reaction.user_id == user_id, Reaction.post_id == post_id)
+                .returning(Reaction.value)
+            )
+        ).scalar()
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"internal server error {e}"
+        )
+
+    if value is not None:
+        reactions.record(post_id, *_deltas(value, -1))
+    return await _counts(post_id, None, db)
@@ -1,5 +1,9 @@
 from app.schemas.users import UserCreate,UserRead,UserUpdate
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core import auth_cache, response_cache
 from app.core.security import get_password_hash
 from app.models.users import User
 from fastapi import HTTPException,status,Response
@@ -67,6 +71,7 @@ def update_user(id: UUID, user: UserUpdate, db: Session):
             )
 
         db.commit()
+        auth_cache.invalidate_user(id)
 
         return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -84,7 +89,7 @@ def update_user(id: UUID, user: UserUpdate, db: Session):
         )
 
 
-def delete_user(u_id: UUID, current_user: User, db: Session):
+def delete_user(u_id: UUID, current_user: UserRead, db: Session):
     try:
         if current_user.id != u_id:
             raise HTTPException(
@@ -99,7 +104,14 @@ def delete_user(u_id: UUID, current_user: User, db: Session):
                 detail="no such user in database",
             )
         db.delete(db_user)
+        # Deleted with the user by the ORM cascade, their cached responses go too
+        post_ids = [post.id for post in db_user.posts]
         db.commit()
+        # Requests with the user's tokens get a 401 from now on
+        auth_cache.invalidate_user(u_id)
+        response_cache.invalidate(
+            response_cache.FEED_SCOPE, response_cache.user_scope(u_id), *map(response_cache.post_scope, post_ids)
+        )
         return Response(status_code=status.HTTP_204_NO_CONTENT)
 
     except Exception as e:
@@ -107,4 +119,113 @@ def delete_user(u_id: UUID, current_user: User, db: Session):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"unable to delete user {str(e)}",
-        )
\ No newline at end of file
+        )
+
+
+# Async versions for the request handlers. Password hashing is CPU bound
+# (bcrypt), it runs in the threadpool so it doesn't stall the event loop.
+
+async def create_user_async(user:UserCreate,db:AsyncSession)->UserRead:
+    try:
+        # Check if user with this email already exists
+        existing_user = (await db.execute(select(User).where(User.email == user.email))).scalars().first()
+        if existing_user:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="An account with this email already exists. Please sign in instead.",
+            )
+
+        db_user = User(
+            username=user.username,
+            email=user.email,
+            hashed_password=await run_in_threadpool(get_password_hash, user.hashed_password),
+        )
+
+        db.add(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+        return db_user
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except IntegrityError as e:
+        await db.rollback()
+        # Handle unique constraint violation (email already exists)
+        if "email" in str(e).lower() or "unique" in str(e).lower():
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="An account with this email already exists. Please sign in instead.",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"unable to create a user {str(e)}",
+        )
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"unable to create a user {str(e)}",
+        )
+
+async def update_user_async(id: UUID, user: UserUpdate, db: AsyncSession):
+    try:
+        hashed_password = await run_in_threadpool(get_password_hash, user.hashed_password)
+        result = await db.execute(
+            update(User).where(User.id == id).values(hashed_password=hashed_password)
+        )
+        if result.rowcount == 0:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="user not found",
+            )
+
+        await db.commit()
+        auth_cache.invalidate_user(id)
+
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"unable to update user {str(e)}",
+        )
+
+
+async def delete_user_async(u_id: UUID, current_user: UserRead, db: AsyncSession):
+    try:
+        if current_user.id != u_id:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="you do not have necessary permissions",
+            )
+
+        db_user = await db.get(User, u_id)
+        if not db_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="no such user in database",
+            )
+        # Loads the posts for the ORM cascade (and the blob reference counting)
+        await db.delete(db_user)
+        post_ids = [post.id for post in db_user.posts]
+        await db.commit()
+        auth_cache.invalidate_user(u_id)
+        await response_cache.invalidate_async(
+            response_cache.FEED_SCOPE, response_cache.user_scope(u_id), *map(response_cache.post_scope, post_ids)
+        )
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"unable to delete user {str(e)}",
+        )
@@ -0,0 +1,74 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core import metrics
+
+# Waiting for a connection is normally well under a millisecond, the upper
+# buckets show exhaustion (requests queuing up to DB_POOL_TIMEOUT)
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class _InstrumentedPool:
+    """
+    Times every connection checkout, including the time spent waiting for a
+    free connection when the pool is exhausted, as db.pool.<name>.wait_seconds,
+    and publishes the pool's occupancy as db.pool.<name>.* gauges whenever a
+    connection leaves or comes back.
+    """
+
+    metrics_name = "db"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            metrics.inc(f"db.pool.{self.metrics_name}.timeouts")
+            raise
+        finally:
+            metrics.observe(f"db.pool.{self.metrics_name}.wait_seconds", time.perf_counter() - start, WAIT_BUCKETS)
+        self._publish()
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._publish()
+
+    def _publish(self):
+        for stat, value in pool_stats(self).items():
+            metrics.set_gauge(f"db.pool.{self.metrics_name}.{stat}", value)
+
+
+class SyncPool(_InstrumentedPool, QueuePool):
+    metrics_name = "sync"
+
+
+class AsyncPool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    metrics_name = "async"
+
+
+def pool_stats(pool) -> dict:
+    """Current occupancy of a queue pool"""
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # Connections opened beyond `size` (negative while the pool is still filling up)
+        "overflow": pool.overflow(),
+    }
+
+
+def instrument(engine, name: str):
+    """Count new and invalidated connections as db.pool.<name>.connects / .invalidated"""
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        metrics.inc(f"db.pool.{name}.connects")
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidate(dbapi_connection, connection_record, exception):
+        # Pre-ping failures and connections lost mid-query (e.g. after a failover)
+        metrics.inc(f"db.pool.{name}.invalidated")
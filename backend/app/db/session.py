@@ -1,10 +1,15 @@
 import logging
 import os
+from uuid import uuid4
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from app.db.pool import AsyncPool, SyncPool, instrument
+
 load_dotenv()
 
 logging.basicConfig(
@@ -18,9 +23,91 @@ if DATABASE_URL is None:
     logger.info("database url is none")
     os._exit(1)
 
-engine = create_engine(DATABASE_URL)
+
+def async_database_url(url: str) -> str:
+    """PG_DB rewritten for asyncpg (driver name, and psycopg2's sslmode as asyncpg's ssl)"""
+    url = make_url(url).set(drivername="postgresql+asyncpg")
+    if "sslmode" in url.query:
+        url = url.update_query_dict({"ssl": url.query["sslmode"]}).difference_update_query(["sslmode"])
+    return url.render_as_string(hide_password=False)
+
+
+# Same database as PG_DB unless ASYNC_PG_DB points somewhere else (e.g. a pooler)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_PG_DB") or async_database_url(DATABASE_URL)
+
+# Connection pool, per engine and per process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Seconds a request waits for a free connection before failing
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+# Connections older than this are replaced (-1 keeps them forever)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Test connections on checkout, so stale ones (failover, idle kill) are replaced before use
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true")
+# Server-side limit per statement, 0 disables it
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+# Connecting through PgBouncer in transaction pooling mode: no startup
+# parameters, no session state and no named prepared statements survive
+# between transactions
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() in ("1", "true")
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def _sync_connect_args() -> dict:
+    if DB_STATEMENT_TIMEOUT_MS and not DB_PGBOUNCER:
+        return {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return {}
+
+
+def _async_connect_args() -> dict:
+    if DB_PGBOUNCER:
+        # asyncpg prepares every statement, a prepared statement made on one
+        # server connection is missing (or clashes by name) on the next one
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    if DB_STATEMENT_TIMEOUT_MS:
+        return {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+    return {}
+
+
+def _set_local_statement_timeout(engine):
+    """PgBouncer drops startup parameters, the timeout is set per transaction instead"""
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {DB_STATEMENT_TIMEOUT_MS}")
+
+
+# Sync engine: Alembic, scripts and the background workers running in threads
+engine = create_engine(DATABASE_URL, poolclass=SyncPool, connect_args=_sync_connect_args(), **_pool_options())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the request handlers, so a DB round trip neither blocks
+# the event loop nor holds a threadpool slot
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, poolclass=AsyncPool, connect_args=_async_connect_args(), **_pool_options()
+)
+
+instrument(engine, SyncPool.metrics_name)
+instrument(async_engine.sync_engine, AsyncPool.metrics_name)
+if DB_PGBOUNCER and DB_STATEMENT_TIMEOUT_MS:
+    _set_local_statement_timeout(engine)
+    _set_local_statement_timeout(async_engine.sync_engine)
+# expire_on_commit=False: objects are still readable (serialized) after the commit
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -33,3 +120,8 @@ async def get_db():
     # logger.info(f"{str(e)}")
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
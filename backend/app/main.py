@@ -1,9 +1,13 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from pathlib import Path
+from starlette.concurrency import run_in_threadpool
+import asyncio
 
 from app.api.v1 import analysis, auth, posts, users
+from app.core import blob_store, local_scorer, metrics, near_duplicate, ocr_pool, ranking, reactions, renditions, search, storage, verification, verification_worker
+from app.core.uploads import UploadSizeLimitMiddleware
+from app.db.pool import pool_stats
+from app.db.session import async_engine, engine
 
 app = FastAPI()
 
@@ -13,6 +17,10 @@ origins = [
     "http://127.0.0.1:3000",  # Alternative localhost
 ]
 
+# Oversized uploads are refused while they are still streaming in.
+# Added before CORS so CORS stays outermost and the 413 carries its headers.
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # Enable CORS middleware - MUST be added before routers
 app.add_middleware(
     CORSMiddleware,
@@ -29,11 +37,99 @@ app.include_router(posts.router, prefix="/api/v1")
 app.include_router(analysis.router, prefix="/api/v1")
 app.include_router(auth.router, prefix="/api/v1")
 
-# Mount static files directory for uploaded images (after routers to avoid conflicts)
-dest_dir = Path("dest")
-dest_dir.mkdir(exist_ok=True)
-app.mount("/dest", StaticFiles(directory="dest"), name="dest")
+@app.api_route("/dest/{key:path}", methods=["GET", "HEAD"], include_in_schema=False)
+def read_image(key: str, request: Request):
+    # Uploaded images, answered by the storage backend with a redirect to the
+    # bucket/CDN or an X-Accel-Redirect for the proxy, so the image bytes don't
+    # go through the API workers. Dot segments cover temp files and traversal.
+    if any(part.startswith(".") for part in key.split("/")):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    not_modified = storage.not_modified(key, request.headers.get("if-none-match"))
+    if not_modified is not None:
+        return not_modified
+    # Thumbnails and WebP/AVIF variants are rendered on first request
+    if renditions.parse_key(key) is not None and not renditions.ensure(key):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    return storage.get_backend().response(key)
+
+@app.on_event("startup")
+async def build_ranking():
+    # Built before the workers and the reaction flusher start, they update it incrementally
+    await run_in_threadpool(ranking.rebuild)
+
+@app.on_event("startup")
+async def start_verification_workers():
+    await verification_worker.start()
+
+@app.on_event("startup")
+async def start_reaction_flusher():
+    # Replays reactions logged but not flushed before the last shutdown or crash
+    await reactions.start()
+
+@app.on_event("startup")
+def start_ocr_pool():
+    ocr_pool.start()
+
+@app.on_event("startup")
+async def rebuild_near_duplicate_index():
+    # Runs in the background, until it finishes lookups only see posts verified since startup
+    asyncio.create_task(run_in_threadpool(near_duplicate.rebuild))
+
+@app.on_event("startup")
+async def build_search_index():
+    # Loads the last snapshot and catches up, in the background: until it
+    # finishes, search only finds posts created or edited since startup
+    asyncio.create_task(run_in_threadpool(search.rebuild))
+    app.state.search_snapshot_task = asyncio.create_task(search.snapshot_periodically())
+
+@app.on_event("startup")
+async def train_local_scorer():
+    # Until the first training finishes every item is escalated to the LLM
+    app.state.local_scorer_task = asyncio.create_task(local_scorer.retrain_periodically())
+
+@app.on_event("startup")
+async def start_blob_gc():
+    app.state.blob_gc_task = asyncio.create_task(blob_store.collect_periodically())
+
+@app.on_event("shutdown")
+async def stop_verification_workers():
+    app.state.local_scorer_task.cancel()
+    app.state.blob_gc_task.cancel()
+    await verification_worker.stop()
+    await verification.close_client()
+
+@app.on_event("shutdown")
+async def stop_reaction_flusher():
+    await reactions.stop()
+
+@app.on_event("shutdown")
+async def save_search_snapshot():
+    app.state.search_snapshot_task.cancel()
+    try:
+        await run_in_threadpool(search.save_snapshot)
+    except Exception as e:
+        print(f"Search snapshot failed: {e}")
+
+@app.on_event("shutdown")
+def stop_ocr_pool():
+    ocr_pool.stop()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await async_engine.dispose()
 
 @app.get("/")
 def root():
     return {"message": "root endpoint works"}
+
+@app.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
+
+@app.get("/metrics/db")
+def get_db_pool_metrics():
+    # Live pool occupancy, the db.pool.* gauges in /metrics are only updated on checkout/checkin
+    return {
+        "sync": pool_stats(engine.pool),
+        "async": pool_stats(async_engine.sync_engine.pool),
+    }
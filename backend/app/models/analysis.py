@@ -12,6 +12,7 @@ class Analysis(Base):
     __tablename__ = "analysis"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID, ForeignKey(User.id, ondelete="CASCADE"))
-    post_id = Column(UUID, ForeignKey(Post.id, ondelete="CASCADE"))
+    # Indexed for the ON DELETE CASCADE lookups when a user or post is deleted
+    user_id = Column(UUID, ForeignKey(User.id, ondelete="CASCADE"), index=True)
+    post_id = Column(UUID, ForeignKey(Post.id, ondelete="CASCADE"), index=True)
     credibility_score = Column(Integer)
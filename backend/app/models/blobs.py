@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, text
+
+from app.db.session import Base
+
+
+class Blob(Base):
+    """An uploaded image, stored once per content under dest/<sha[:2]>/<sha[2:4]>/<sha><extension>"""
+
+    __tablename__ = "blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    extension = Column(String(8), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    # Number of posts whose url points at this blob
+    ref_count = Column(Integer, nullable=False, default=0)
+    # When ref_count last dropped to 0 (or the blob was uploaded), the GC waits a grace period after it
+    unreferenced_since = Column(DateTime, nullable=True, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # The GC only ever reads unreferenced blobs, oldest first
+        Index(
+            "ix_blobs_unreferenced",
+            "unreferenced_since",
+            postgresql_where=text("ref_count = 0"),
+        ),
+    )
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Boolean, Column, Integer, Float, String, ForeignKey, DateTime, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from app.models.users import User
 
@@ -20,7 +20,29 @@ class Post(Base):
     content = Column(String, nullable=False)
     url = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    real = Column(String, nullable=True)  # 'true' or 'false' as string for compatibility
-    credibility_score = Column(String, nullable=True)  # Store as string to preserve precision
+    # Last change of the title or content, NULL if never edited (the search
+    # index catches up on posts edited since its snapshot)
+    edited_at = Column(DateTime, nullable=True)
+    # Both NULL until the post is verified, the score is on a 0-100 scale
+    real = Column(Boolean, nullable=True)
+    credibility_score = Column(Float, nullable=True)
 
-    user = relationship("User", back_populates="posts")
\ No newline at end of file
+    user = relationship("User", back_populates="posts")
+
+    __table_args__ = (
+        # Feed order, pages are read by keyset on (created_at, id)
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        # A user's posts, newest first (also the lookup behind the users -> posts cascade)
+        Index("ix_posts_user_id_created_at", "user_id", "created_at"),
+        # Feed order restricted to credible posts
+        Index("ix_posts_credible_created_at_id", "created_at", "id", postgresql_where=text("real")),
+        # Feed sorted by score, only verified posts are ranked
+        Index(
+            "ix_posts_credibility_score_id",
+            "credibility_score",
+            "id",
+            postgresql_where=text("credibility_score IS NOT NULL"),
+        ),
+        # Posts edited since a point in time, only edited posts are in it
+        Index("ix_posts_edited_at", "edited_at", postgresql_where=text("edited_at IS NOT NULL")),
+    )
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, SmallInteger, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.session import Base
+from app.models.posts import Post
+from app.models.users import User
+
+
+class Reaction(Base):
+    """A user's like (1) or dislike (-1) of a post, at most one per user and post"""
+
+    __tablename__ = "reactions"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey(User.id, ondelete="CASCADE"), primary_key=True)
+    # Indexed for the ON DELETE CASCADE lookup when a post is deleted
+    post_id = Column(UUID(as_uuid=True), ForeignKey(Post.id, ondelete="CASCADE"), primary_key=True, index=True)
+    value = Column(SmallInteger, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class ReactionLogCheckpoint(Base):
+    """Last reaction log record (by sequence number) whose counts reached the posts table"""
+
+    __tablename__ = "reaction_log_checkpoints"
+
+    log_name = Column(String, primary_key=True)
+    seq = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
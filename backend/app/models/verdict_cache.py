@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, Float, String
+
+from app.db.session import Base
+
+
+class VerdictCache(Base):
+    __tablename__ = "verdict_cache"
+
+    # sha256 of the normalized news text
+    text_hash = Column(String(64), primary_key=True)
+    real = Column(Boolean, nullable=False)
+    credibility_score = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
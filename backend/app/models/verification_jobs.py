@@ -0,0 +1,36 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.session import Base
+from app.models.posts import Post
+
+
+class VerificationJob(Base):
+    __tablename__ = "verification_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    post_id = Column(UUID(as_uuid=True), ForeignKey(Post.id, ondelete="CASCADE"), nullable=False, unique=True)
+    status = Column(String, nullable=False, default="pending")  # pending, running, unverified (LLM unavailable), done or failed
+    attempts = Column(Integer, nullable=False, default=0)
+    bypass_cache = Column(Boolean, nullable=False, default=False)
+    last_error = Column(String, nullable=True)
+    # What produced the verdict: llm, local or cache
+    verified_by = Column(String, nullable=True)
+    # When a pending job may be picked up again (used for retry backoff)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Lease on a running job, an expired lease means the worker died and the job is picked up again
+    locked_until = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_verification_jobs_claimable",
+            "status",
+            "next_attempt_at",
+            postgresql_where=text("status IN ('pending', 'running', 'unverified')"),
+        ),
+    )
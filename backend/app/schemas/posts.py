@@ -1,6 +1,8 @@
 from uuid import UUID
 from datetime import datetime
-from pydantic import BaseModel, field_validator
+from typing import Literal
+from pydantic import BaseModel, computed_field
+from app.core.renditions import rendition_urls
 from app.schemas.users import UserRead
 
 class PostBase(BaseModel):
@@ -17,33 +19,36 @@ class PostRead(PostBase):
     created_at: datetime | None = None
     real: bool | None = None
     credibility_score: float | None = None
-    
-    @field_validator('real', mode='before')
-    @classmethod
-    def convert_real(cls, v):
-        """Convert string 'true'/'false' to bool"""
-        if v is None:
-            return None
-        if isinstance(v, bool):
-            return v
-        if isinstance(v, str):
-            return v.lower() == 'true'
-        return None
-    
-    @field_validator('credibility_score', mode='before')
-    @classmethod
-    def convert_credibility_score(cls, v):
-        """Convert string to float"""
-        if v is None:
-            return None
-        if isinstance(v, (int, float)):
-            return float(v)
-        if isinstance(v, str):
-            try:
-                return float(v)
-            except ValueError:
-                return None
-        return None
-    
+
+    @computed_field
+    @property
+    def renditions(self) -> dict[str, dict[str, str]] | None:
+        """Thumbnail urls by size and format ({"thumb": {"webp": ...}}), None unless the image was uploaded here"""
+        return rendition_urls(self.url)
+
     class Config:
         from_attributes = True
+
+class PostPage(BaseModel):
+    items:list[PostRead]
+    # Pass back as ?cursor= for the next page, None on the last page
+    next_cursor:str | None = None
+
+class VerificationStatus(BaseModel):
+    post_id:UUID
+    status:str  # pending, running, unverified, done or failed
+    attempts:int = 0
+    last_error:str | None = None
+    next_attempt_at:datetime | None = None
+    real:bool | None = None
+    credibility_score:float | None = None
+
+class ReactionCreate(BaseModel):
+    reaction:Literal["like", "dislike"]
+
+class ReactionCounts(BaseModel):
+    post_id:UUID
+    likes:int
+    dislikes:int
+    # The current user's reaction, None after removing it
+    reaction:Literal["like", "dislike"] | None = None
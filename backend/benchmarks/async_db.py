@@ -0,0 +1,146 @@
+"""
+Request concurrency of the sync (psycopg2 session in the threadpool) and the
+async (asyncpg AsyncSession) database paths, in one process with the same
+connection pool size.
+
+Each simulated request does what GET /api/v1/posts/ does: load the current
+user by email, then a feed page of posts with their users. `--db-latency`
+adds one round trip of that many ms (pg_sleep) to stand in for a database
+that isn't on localhost.
+
+While the load runs, two probes measure what the rest of the app sees:
+  - loop lag: how late a 10 ms asyncio.sleep wakes up
+  - threadpool wait: how long a no-op run_in_threadpool call (what every
+    sync route, file operation and OCR cache lookup does) waits for a thread
+
+Run from the backend directory with PG_DB set, against a database with a few posts:
+    python -m benchmarks.async_db --concurrency 10 50 200 --db-latency 5
+"""
+import argparse
+import asyncio
+import time
+
+import anyio.to_thread
+import numpy as np
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from app.db.session import ASYNC_DATABASE_URL, DATABASE_URL
+from app.models.posts import Post
+from app.models.users import User
+
+
+def sync_request(session_factory, email: str, latency: float):
+    db = session_factory()
+    try:
+        if latency:
+            db.execute(text("SELECT pg_sleep(:s)"), {"s": latency})
+        db.query(User).filter(User.email == email).first()
+        return db.query(Post).options(joinedload(Post.user)).limit(20).all()
+    finally:
+        db.close()
+
+
+async def async_request(session_factory, email: str, latency: float):
+    async with session_factory() as db:
+        if latency:
+            await db.execute(text("SELECT pg_sleep(:s)"), {"s": latency})
+        (await db.execute(select(User).where(User.email == email))).scalars().first()
+        return (await db.execute(select(Post).options(joinedload(Post.user)).limit(20))).scalars().all()
+
+
+async def loop_lag_probe(samples: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        samples.append(time.perf_counter() - start - 0.01)
+
+
+async def threadpool_probe(samples: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await run_in_threadpool(lambda: None)
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(0.02)
+
+
+async def run_load(request, concurrency: int, requests: int) -> dict:
+    latencies, lags, waits = [], [], []
+    remaining = requests
+    stop = asyncio.Event()
+
+    async def client():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            await request()
+            latencies.append(time.perf_counter() - start)
+
+    probes = [asyncio.create_task(loop_lag_probe(lags, stop)), asyncio.create_task(threadpool_probe(waits, stop))]
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(*probes)
+
+    return {
+        "rps": requests / elapsed,
+        "p50": np.percentile(latencies, 50) * 1000,
+        "p99": np.percentile(latencies, 99) * 1000,
+        "lag_p99": np.percentile(lags, 99) * 1000 if lags else 0.0,
+        "wait_p99": np.percentile(waits, 99) * 1000 if waits else 0.0,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--requests", type=int, default=2_000, help="requests per run")
+    parser.add_argument("--pool-size", type=int, default=20, help="connections, for both engines")
+    parser.add_argument("--threads", type=int, default=40, help="threadpool size (Starlette's default is 40)")
+    parser.add_argument("--db-latency", type=float, default=2.0, help="extra round trip per request, ms")
+    args = parser.parse_args()
+
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threads
+    latency = args.db_latency / 1000
+
+    sync_engine = create_engine(DATABASE_URL, pool_size=args.pool_size, max_overflow=0)
+    sync_sessions = sessionmaker(bind=sync_engine, autoflush=False)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_size=args.pool_size, max_overflow=0)
+    async_sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    with sync_engine.connect() as connection:
+        email = connection.execute(text("SELECT email FROM users LIMIT 1")).scalar() or "nobody@example.com"
+
+    def sync_path():
+        return run_in_threadpool(sync_request, sync_sessions, email, latency)
+
+    def async_path():
+        return async_request(async_sessions, email, latency)
+
+    # Warm both pools up
+    await run_load(sync_path, args.pool_size, args.pool_size * 2)
+    await run_load(async_path, args.pool_size, args.pool_size * 2)
+
+    print(f"pool {args.pool_size} connections, {args.threads} threads, +{args.db_latency} ms per request")
+    print(
+        f"{'path':<8}{'clients':>8}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}"
+        f"{'loop lag p99':>14}{'thread wait p99':>17}"
+    )
+    for concurrency in args.concurrency:
+        for name, path in (("sync", sync_path), ("async", async_path)):
+            result = await run_load(path, concurrency, args.requests)
+            print(
+                f"{name:<8}{concurrency:>8}{result['rps']:>10.0f}{result['p50']:>9.1f}{result['p99']:>9.1f}"
+                f"{result['lag_p99']:>14.1f}{result['wait_p99']:>17.1f}"
+            )
+
+    sync_engine.dispose()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
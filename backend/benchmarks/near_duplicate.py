@@ -0,0 +1,130 @@
+"""
+Recall and latency of the near-duplicate index (app/core/near_duplicate.py).
+
+Fills the index with `--size` posts, then queries it with OCR-style noisy
+copies of indexed posts (should match) and with fresh unrelated posts
+(should not match).
+
+Run from the backend directory (PG_DB must be set, nothing is read from it):
+    python -m benchmarks.near_duplicate --size 1000000
+"""
+import argparse
+import random
+import string
+import time
+
+import numpy as np
+
+from app.core import near_duplicate
+
+CONFUSIONS = {"o": "0", "l": "1", "i": "l", "s": "5", "e": "c", "b": "8", "m": "rn"}
+
+
+def make_vocabulary(rng: random.Random, size: int = 20_000) -> list:
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10))) for _ in range(size)]
+
+
+def make_post(rng: random.Random, vocabulary: list) -> str:
+    return " ".join(rng.choices(vocabulary, k=rng.randint(40, 150)))
+
+
+def ocr_noise(rng: random.Random, text: str, rate: float) -> str:
+    """Character confusions, drops and stray punctuation, roughly what tesseract does to screenshots"""
+    out = []
+    for ch in text:
+        r = rng.random()
+        if r < rate * 0.5:
+            out.append(CONFUSIONS.get(ch, rng.choice(string.ascii_lowercase)))
+        elif r < rate * 0.75:
+            continue
+        elif r < rate:
+            out.append(ch + rng.choice(".,' "))
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def small_edit(rng: random.Random, text: str, vocabulary: list) -> str:
+    """Prepend/append a few words, as when a repost adds a comment"""
+    words = text.split()
+    prefix = rng.choices(vocabulary, k=rng.randint(0, 4))
+    suffix = rng.choices(vocabulary, k=rng.randint(0, 4))
+    return " ".join(prefix + words + suffix)
+
+
+def percentile_us(samples: list, q: float) -> float:
+    return float(np.percentile(samples, q) * 1e6)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=1_000_000, help="posts in the index")
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng)
+    index = near_duplicate.LSHIndex(near_duplicate.NEAR_DUP_SIMILARITY)
+
+    # Posts we will query for, indexed from real text
+    originals = [make_post(rng, vocabulary) for _ in range(args.queries)]
+    signatures = np.stack([near_duplicate.minhash(text) for text in originals])
+    index.add_many(list(range(args.queries)), signatures)
+
+    # Filler: unrelated texts have independent MinHash values, so random
+    # signatures stand in for them without hashing millions of texts
+    filler = max(0, args.size - args.queries)
+    start = time.perf_counter()
+    np_rng = np.random.default_rng(args.seed)
+    chunk = 200_000
+    for offset in range(0, filler, chunk):
+        n = min(chunk, filler - offset)
+        keys = list(range(args.queries + offset, args.queries + offset + n))
+        index.add_many(keys, np_rng.integers(0, 1 << 32, size=(n, near_duplicate.NUM_PERM), dtype=np.uint32))
+    print(f"index: {len(index):,} posts, bulk build {time.perf_counter() - start:.1f}s")
+
+    # Incremental inserts on top of the bulk-built index
+    start = time.perf_counter()
+    for i in range(1_000):
+        index.add(f"incremental-{i}", near_duplicate.minhash(make_post(rng, vocabulary)))
+    print(f"incremental add: {(time.perf_counter() - start) / 1_000 * 1e6:.0f} us/post (incl. MinHash)")
+
+    print(f"threshold: {near_duplicate.NEAR_DUP_SIMILARITY}")
+    print(f"{'query set':<24}{'match rate':>12}{'p50 us':>10}{'p99 us':>10}")
+
+    query_sets = {
+        "ocr noise 1%": [(i, ocr_noise(rng, originals[i], 0.01)) for i in range(args.queries)],
+        "ocr noise 3%": [(i, ocr_noise(rng, originals[i], 0.03)) for i in range(args.queries)],
+        "ocr noise 5%": [(i, ocr_noise(rng, originals[i], 0.05)) for i in range(args.queries)],
+        "edited + 2% noise": [
+            (i, ocr_noise(rng, small_edit(rng, originals[i], vocabulary), 0.02)) for i in range(args.queries)
+        ],
+        "unrelated (false pos.)": [(None, make_post(rng, vocabulary)) for _ in range(args.queries)],
+    }
+
+    for name, queries in query_sets.items():
+        signatures = [near_duplicate.minhash(text) for _, text in queries]
+        latencies, matched = [], 0
+        for (expected, _), signature in zip(queries, signatures):
+            start = time.perf_counter()
+            match = index.nearest(signature)
+            latencies.append(time.perf_counter() - start)
+            if expected is None:
+                matched += match is not None
+            else:
+                matched += match is not None and match[0] == expected
+        print(
+            f"{name:<24}{matched / len(queries):>12.3f}"
+            f"{percentile_us(latencies, 50):>10.1f}{percentile_us(latencies, 99):>10.1f}"
+        )
+
+    # MinHash cost is paid once per created post, outside the lookup above
+    start = time.perf_counter()
+    for text in originals[:500]:
+        near_duplicate.minhash(text)
+    print(f"minhash: {(time.perf_counter() - start) / 500 * 1e6:.0f} us/post")
+
+
+if __name__ == "__main__":
+    main()
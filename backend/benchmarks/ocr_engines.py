@@ -0,0 +1,62 @@
+"""
+Per-image latency and accuracy of the OCR engines in app/core/image.py on
+synthetic news screenshots (benchmarks/screenshots.py).
+
+Compares the subprocess path (pytesseract: new tesseract process, temp
+files and model loading per image) with the persistent in-process engine
+(tesserocr), when it is installed.
+
+Run from the backend directory (PG_DB does not need to point anywhere):
+    python -m benchmarks.ocr_engines --images 50
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.core import image
+from benchmarks.screenshots import accuracy, make_corpus
+
+
+def run(engine: image.OCREngine, corpus: list) -> tuple:
+    # Warm-up call, a persistent engine pays its model loading here only
+    engine.image_to_text(corpus[0][0])
+
+    latencies, scores = [], []
+    for screenshot, expected in corpus:
+        start = time.perf_counter()
+        text = engine.image_to_text(screenshot)
+        latencies.append(time.perf_counter() - start)
+        scores.append(accuracy(expected, text))
+    return np.array(latencies) * 1000, float(np.mean(scores))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--lang", default=image.OCR_LANG)
+    parser.add_argument("--psm", type=int, default=image.OCR_PSM)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.images, seed=args.seed)
+    engines = ["pytesseract"] + (["tesserocr"] if image.tesserocr is not None else [])
+    if image.tesserocr is None:
+        print("tesserocr is not installed, only the subprocess path is measured")
+
+    print(f"{args.images} screenshots, lang={args.lang} psm={args.psm}")
+    print(f"{'engine':<14}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'accuracy':>10}")
+    for name in engines:
+        engine = image.create_engine(name, lang=args.lang, psm=args.psm)
+        try:
+            latencies, score = run(engine, corpus)
+        finally:
+            engine.close()
+        print(
+            f"{name:<14}{latencies.mean():>10.1f}{np.percentile(latencies, 50):>10.1f}"
+            f"{np.percentile(latencies, 95):>10.1f}{score:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+OCR wall time and accuracy with and without the preprocessing pipeline
+(app/core/preprocess.py), on large synthetic news screenshots, a quarter of
+them stored sideways with an EXIF orientation tag like phone photos.
+
+Besides the full pipeline, every step is also switched off on its own to
+show what it contributes. Exits with status 1 when the full pipeline loses
+more than --max-accuracy-drop accuracy against the raw images, so it can be
+used as a regression check.
+
+Run from the backend directory (PG_DB does not need to point anywhere):
+    python -m benchmarks.ocr_preprocess --images 20
+"""
+import argparse
+import io
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from app.core import image, preprocess
+from benchmarks.screenshots import accuracy, make_corpus
+
+
+def rotate_with_exif(screenshot: Image.Image) -> Image.Image:
+    """Store the pixels sideways and tag them so a viewer (or exif_transpose) turns them upright"""
+    rotated = screenshot.transpose(Image.Transpose.ROTATE_90)
+    exif = Image.Exif()
+    exif[preprocess.EXIF_ORIENTATION] = 6
+    buffer = io.BytesIO()
+    rotated.save(buffer, format="JPEG", quality=90, exif=exif)
+    buffer.seek(0)
+    return Image.open(buffer)
+
+
+def run(engine: image.OCREngine, corpus: list, steps: list) -> dict:
+    ocr_seconds, total_seconds, scores = [], [], []
+    step_seconds = {name: 0.0 for name in steps}
+    for screenshot, expected in corpus:
+        start = time.perf_counter()
+        processed, timings = preprocess.preprocess(screenshot.copy(), steps)
+        ocr_start = time.perf_counter()
+        text = engine.image_to_text(processed)
+        ocr_seconds.append(time.perf_counter() - ocr_start)
+        total_seconds.append(time.perf_counter() - start)
+        scores.append(accuracy(expected, text))
+        for name, seconds in timings.items():
+            step_seconds[name] += seconds
+    return {
+        "ocr_ms": np.mean(ocr_seconds) * 1000,
+        "total_ms": np.mean(total_seconds) * 1000,
+        "accuracy": float(np.mean(scores)),
+        "steps_ms": {name: seconds / len(corpus) * 1000 for name, seconds in step_seconds.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--width", type=int, default=2160)
+    parser.add_argument("--height", type=int, default=3840)
+    parser.add_argument("--engine", default=image.OCR_ENGINE)
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.01)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.images, seed=args.seed, width=args.width, height=args.height)
+    corpus = [(rotate_with_exif(shot) if i % 4 == 3 else shot, text) for i, (shot, text) in enumerate(corpus)]
+
+    engine = image.create_engine(args.engine)
+    print(f"{args.images} screenshots of {args.width}x{args.height}, engine={engine.name}")
+    engine.image_to_text(corpus[0][0])
+
+    all_steps = list(preprocess.STEPS)
+    configurations = {"raw": [], "full pipeline": all_steps}
+    for name in all_steps:
+        configurations[f"without {name}"] = [step for step in all_steps if step != name]
+
+    results = {}
+    print(f"{'configuration':<22}{'total ms':>10}{'ocr ms':>10}{'accuracy':>10}")
+    for label, steps in configurations.items():
+        results[label] = run(engine, corpus, steps)
+        r = results[label]
+        print(f"{label:<22}{r['total_ms']:>10.1f}{r['ocr_ms']:>10.1f}{r['accuracy']:>10.3f}")
+
+    print("full pipeline step cost: " + ", ".join(
+        f"{name} {ms:.1f} ms" for name, ms in results["full pipeline"]["steps_ms"].items()
+    ))
+    engine.close()
+
+    drop = results["raw"]["accuracy"] - results["full pipeline"]["accuracy"]
+    speedup = results["raw"]["total_ms"] / results["full pipeline"]["total_ms"]
+    print(f"speedup {speedup:.2f}x, accuracy change {-drop:+.3f}")
+    if drop > args.max_accuracy_drop:
+        print(f"FAIL: preprocessing lost {drop:.3f} accuracy (allowed {args.max_accuracy_drop})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
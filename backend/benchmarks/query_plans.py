@@ -0,0 +1,193 @@
+"""
+Query plan regression check for the hot database queries.
+
+Seeds users, posts, analysis rows, verification jobs and reactions, runs the CRUD
+functions the API serves (and the lookups behind the ON DELETE CASCADE
+foreign keys), captures every statement they send and EXPLAINs it with
+the same parameters. Fails when a plan reads one of the seeded tables
+with a sequential scan, i.e. when a query lost (or never had) its index.
+
+Everything runs in one transaction that is rolled back, nothing seeded
+is left behind. The database must be migrated to head.
+
+Run from the backend directory with PG_DB set:
+    python -m benchmarks.query_plans --posts 100000
+Exits 1 when a sequential scan is found.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+
+from app.core import search, verdict_cache
+from app.crud import posts as posts_crud
+from app.crud import users as users_crud
+from app.db.session import engine
+from app.models.posts import Post
+from app.models.users import User
+from app.schemas.posts import PostBase
+
+# Tables big enough in production that a sequential scan is a regression
+HOT_TABLES = {"users", "posts", "analysis", "verification_jobs", "reactions"}
+
+# Lookups Postgres runs itself for the ON DELETE CASCADE foreign keys,
+# they never go through SQLAlchemy so they are listed here
+CASCADE_LOOKUPS = {
+    "cascade posts -> analysis": "DELETE FROM analysis WHERE post_id = %(id)s",
+    "cascade posts -> verification_jobs": "DELETE FROM verification_jobs WHERE post_id = %(id)s",
+    "cascade posts -> reactions": "DELETE FROM reactions WHERE post_id = %(id)s",
+    "cascade users -> posts": "DELETE FROM posts WHERE user_id = %(id)s",
+    "cascade users -> analysis": "DELETE FROM analysis WHERE user_id = %(id)s",
+    "cascade users -> reactions": "DELETE FROM reactions WHERE user_id = %(id)s",
+}
+
+
+def seed(connection, users: int, posts: int):
+    connection.execute(
+        text(
+            "INSERT INTO users (id, email, username, hashed_password) "
+            "SELECT gen_random_uuid(), 'plan-' || i || '@example.com', 'plan', 'x' "
+            "FROM generate_series(1, :users) AS i"
+        ),
+        {"users": users},
+    )
+    connection.execute(
+        text(
+            "WITH u AS (SELECT id, row_number() OVER () AS n FROM users WHERE email LIKE 'plan-%%') "
+            "INSERT INTO posts (id, user_id, likes, dislikes, title, content, created_at, real, credibility_score) "
+            "SELECT gen_random_uuid(), u.id, 0, 0, 'plan', 'seeded post ' || g, "
+            "now() - g * interval '1 second', "
+            "g % 5 <> 0, g % 100 "
+            "FROM generate_series(1, :posts) AS g JOIN u ON u.n = 1 + g % :users"
+        ),
+        {"posts": posts, "users": users},
+    )
+    connection.execute(
+        text(
+            "INSERT INTO analysis (id, user_id, post_id, credibility_score) "
+            "SELECT gen_random_uuid(), user_id, id, 50 FROM posts WHERE title = 'plan'"
+        )
+    )
+    connection.execute(
+        text(
+            "INSERT INTO verification_jobs (id, post_id, status, attempts, bypass_cache, next_attempt_at, created_at, updated_at) "
+            "SELECT gen_random_uuid(), id, 'done', 1, false, now(), now(), now() "
+            "FROM posts WHERE title = 'plan' AND random() < 0.2"
+        )
+    )
+    connection.execute(
+        text(
+            "INSERT INTO reactions (user_id, post_id, value, created_at, updated_at) "
+            "SELECT user_id, id, 1, now(), now() FROM posts WHERE title = 'plan'"
+        )
+    )
+    for table in sorted(HOT_TABLES):
+        connection.execute(text(f"ANALYZE {table}"))
+
+
+def seq_scans(plan: dict) -> list:
+    """Relations read with a sequential scan anywhere in the plan tree"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def explain(connection, statement: str, parameters) -> list:
+    rows = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    plan = rows if isinstance(rows, list) else json.loads(rows)
+    return seq_scans(plan[0]["Plan"])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--posts", type=int, default=100_000)
+    args = parser.parse_args()
+
+    connection = engine.connect()
+    transaction = connection.begin()
+    captured = []
+    recording = False
+
+    @event.listens_for(connection, "before_cursor_execute")
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if recording and not executemany:
+            captured.append((statement, parameters))
+
+    try:
+        seed(connection, args.users, args.posts)
+        # CRUD commits only release a savepoint, the outer transaction is rolled back at the end
+        db = Session(bind=connection, join_transaction_mode="create_savepoint")
+
+        user = db.execute(select(User).where(User.email == "plan-1@example.com")).scalar_one()
+        user_posts = db.execute(select(Post.id).where(Post.user_id == user.id).limit(3)).scalars().all()
+        victim = db.execute(select(User).where(User.email == "plan-2@example.com")).scalar_one()
+        first_page = posts_crud.get_posts(db, limit=20)
+        deep_cursor = first_page.next_cursor
+        for _ in range(5):
+            deep_cursor = posts_crud.get_posts(db, cursor=deep_cursor, limit=100).next_cursor
+        score_cursor = posts_crud.get_posts(db, limit=100, sort="score").next_cursor
+
+        checks = {
+            "user by email (login, current user)": lambda: db.execute(
+                select(User).where(User.email == "plan-1@example.com")
+            ).first(),
+            "feed first page": lambda: posts_crud.get_posts(db, limit=20),
+            "feed deep page": lambda: posts_crud.get_posts(db, cursor=deep_cursor, limit=20),
+            "feed credible only": lambda: posts_crud.get_posts(db, limit=20, credible_only=True),
+            "feed by score": lambda: posts_crud.get_posts(db, cursor=score_cursor, limit=20, sort="score"),
+            "posts by user": lambda: posts_crud.get_posts_by_user(user.id, db),
+            "post by id": lambda: posts_crud.get_post(user_posts[0], db),
+            "verification status": lambda: posts_crud.get_verification_status(user_posts[0], db),
+            "verdict cache lookup": lambda: verdict_cache._load_from_db("0" * 64, db),
+            "search catch-up after a snapshot": lambda: search._changed_since(
+                db, datetime.utcnow() - timedelta(hours=1)
+            ).all(),
+            "update post": lambda: posts_crud.update_post(
+                user_posts[1], PostBase(user_id=user.id, title="plan", content="edited"), db
+            ),
+            "delete post": lambda: posts_crud.delete_post(user_posts[2], db),
+            "delete user": lambda: users_crud.delete_user(victim.id, victim, db),
+        }
+
+        failures = 0
+        print(f"seeded {args.users:,} users, {args.posts:,} posts at {datetime.utcnow():%H:%M:%S}")
+        print(f"{'query':<40}{'statements':>11}  seq scans")
+        for label, run in checks.items():
+            captured.clear()
+            recording = True
+            try:
+                run()
+            finally:
+                recording = False
+            statements = [
+                (statement, parameters) for statement, parameters in captured
+                if statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE")
+            ]
+            scans = [t for statement, parameters in statements for t in explain(connection, statement, parameters)]
+            bad = sorted({t for t in scans if t in HOT_TABLES})
+            failures += bool(bad)
+            print(f"{label:<40}{len(statements):>11}  {', '.join(bad) or '-'}")
+
+        for label, statement in CASCADE_LOOKUPS.items():
+            bad = sorted({t for t in explain(connection, statement, {"id": str(user.id)}) if t in HOT_TABLES})
+            failures += bool(bad)
+            print(f"{label:<40}{1:>11}  {', '.join(bad) or '-'}")
+    finally:
+        transaction.rollback()
+        connection.close()
+
+    if failures:
+        print(f"FAIL: {failures} queries use a sequential scan on a hot table")
+        sys.exit(1)
+    print("OK: every hot query uses an index")
+
+
+if __name__ == "__main__":
+    main()
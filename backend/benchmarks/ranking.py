@@ -0,0 +1,124 @@
+"""
+Cost of the hot feed at 1M+ posts: the precomputed ranking (app.core.ranking)
+against ranking on every request.
+
+Posts are synthetic (no database): creation times spread over the ranking
+window, heavy-tailed vote counts, a verdict on most of them. Reported:
+  - build: ranking every post at startup, and the memory it holds
+  - update: moving a post after a vote (what a reaction flush does per post)
+  - page: first page, and a page 50 pages deep reached through the cursor
+  - per request: scoring every post with NumPy and taking the top K
+    (argpartition), the lower bound for any ranking computed per request
+
+Run from the backend directory:
+    python -m benchmarks.ranking --posts 1000000 2000000
+"""
+import argparse
+import time
+import tracemalloc
+import uuid
+
+import numpy as np
+
+from app.core.ranking import RANK_CREDIBILITY_WEIGHT, RANK_DECAY_SECONDS, HotRanking
+
+
+def make_posts(count: int, window_seconds: float, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    now = time.time()
+    created = np.sort(now - rng.uniform(0, window_seconds, count))
+    likes = rng.zipf(1.8, count).clip(max=1_000_000) - 1
+    dislikes = rng.zipf(2.2, count).clip(max=1_000_000) - 1
+    credibility = rng.uniform(0, 100, count)
+    verified = rng.random(count) < 0.9
+    return [
+        (uuid.uuid4(), float(created[i]), int(likes[i]), int(dislikes[i]),
+         float(credibility[i]) if verified[i] else None, bool(credibility[i] >= 50) if verified[i] else None)
+        for i in range(count)
+    ]
+
+
+def percentiles(samples: list) -> str:
+    return f"p50 {np.percentile(samples, 50) * 1e6:8.1f} us  p99 {np.percentile(samples, 99) * 1e6:8.1f} us"
+
+
+def per_request_top_k(created, likes, dislikes, credibility, k: int):
+    votes = likes - dislikes
+    scores = (
+        np.sign(votes) * np.log10(np.maximum(np.abs(votes), 1))
+        + RANK_CREDIBILITY_WEIGHT * credibility
+        + created / RANK_DECAY_SECONDS
+    )
+    top = np.argpartition(-scores, k)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def run(count: int, page_size: int, updates: int, window_seconds: float):
+    posts = make_posts(count, window_seconds)
+    ranking = HotRanking(max_age_seconds=window_seconds * 2)
+    start = time.perf_counter()
+    ranking.load(posts)
+    build = time.perf_counter() - start
+
+    # Tracing slows allocations down, memory is measured on a separate load
+    sample = posts[:100_000]
+    tracemalloc.start()
+    sampled = HotRanking(max_age_seconds=window_seconds * 2)
+    sampled.load(sample)
+    memory = tracemalloc.get_traced_memory()[0] / len(sample)
+    tracemalloc.stop()
+    del sampled
+
+    rng = np.random.default_rng(1)
+    targets = rng.integers(0, count, updates)
+    update_times = []
+    for i in targets:
+        start = time.perf_counter()
+        ranking.add_votes(posts[i][0], 1, 0)
+        update_times.append(time.perf_counter() - start)
+
+    first_times, deep_times = [], []
+    for _ in range(200):
+        start = time.perf_counter()
+        ids, last = ranking.page(None, page_size)
+        first_times.append(time.perf_counter() - start)
+    for _ in range(50):
+        ids, last = ranking.page(last, page_size)
+    for _ in range(200):
+        start = time.perf_counter()
+        ranking.page(last, page_size)
+        deep_times.append(time.perf_counter() - start)
+
+    created = np.array([p[1] for p in posts])
+    likes = np.array([p[2] for p in posts], dtype=np.int64)
+    dislikes = np.array([p[3] for p in posts], dtype=np.int64)
+    credibility = np.array([0.0 if p[4] is None else (p[4] - 50) / 50 for p in posts])
+    scan_times = []
+    for _ in range(10):
+        start = time.perf_counter()
+        per_request_top_k(created, likes, dislikes, credibility, page_size)
+        scan_times.append(time.perf_counter() - start)
+
+    print(f"{count:,} posts, pages of {page_size}")
+    # Post ids are allocated by the caller (the database rows), not counted here
+    print(f"  build           {build:8.2f} s     {memory:6.0f} bytes/post ({memory * count / 2**20:,.0f} MiB)")
+    print(f"  update          {percentiles(update_times)}")
+    print(f"  first page      {percentiles(first_times)}")
+    print(f"  page 51         {percentiles(deep_times)}")
+    print(f"  per request     {percentiles(scan_times)}  (NumPy full scan + top-K)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--updates", type=int, default=100_000)
+    parser.add_argument("--window-days", type=float, default=30)
+    args = parser.parse_args()
+
+    for count in args.posts:
+        run(count, args.page_size, args.updates, args.window_days * 86400)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Synthetic "news screenshot" corpus shared by the OCR benchmarks.
+
+Each image is a phone-sized screenshot with a header bar, a headline and a
+few paragraphs of body text, optionally on a tinted background and saved as
+a recompressed JPEG, together with the text that was drawn on it.
+"""
+import io
+import random
+
+from PIL import Image, ImageDraw, ImageFont
+
+WORDS = (
+    "government minister announced new policy today after reports claimed that the "
+    "city council approved funding for hospitals schools and roads while officials "
+    "denied any wrongdoing police said the investigation continues witnesses reported "
+    "heavy rain flooding several districts experts warned prices could rise next month "
+    "the company confirmed record profits despite protests outside its headquarters "
+    "scientists discovered evidence supporting earlier findings about climate change "
+    "election results show a close race between the two main parties in the region"
+).split()
+
+
+def _sentence(rng: random.Random, low: int, high: int) -> str:
+    words = rng.choices(WORDS, k=rng.randint(low, high))
+    return " ".join(words).capitalize() + "."
+
+
+def _wrap(draw: ImageDraw.ImageDraw, text: str, font, width: int) -> list:
+    lines, line = [], ""
+    for word in text.split():
+        candidate = f"{line} {word}".strip()
+        if draw.textlength(candidate, font=font) <= width:
+            line = candidate
+        else:
+            lines.append(line)
+            line = word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def make_screenshot(rng: random.Random, width: int = 1080, height: int = 1920, jpeg: bool = True):
+    """Return (PIL image, ground truth text)"""
+    background = rng.choice([(255, 255, 255), (250, 248, 240), (235, 240, 250)])
+    image = Image.new("RGB", (width, height), background)
+    draw = ImageDraw.Draw(image)
+    margin = width // 18
+
+    # Status / app bar, no text of interest on it
+    draw.rectangle([0, 0, width, height // 14], fill=rng.choice([(30, 60, 120), (180, 20, 30), (20, 20, 20)]))
+
+    headline_font = ImageFont.load_default(size=width // 18)
+    body_font = ImageFont.load_default(size=width // 30)
+    y = height // 14 + margin
+    drawn = []
+
+    for line in _wrap(draw, _sentence(rng, 6, 12), headline_font, width - 2 * margin):
+        draw.text((margin, y), line, fill=(10, 10, 10), font=headline_font)
+        drawn.append(line)
+        y += int(headline_font.size * 1.3)
+    y += margin // 2
+
+    while y < height - margin * 3:
+        paragraph = " ".join(_sentence(rng, 8, 16) for _ in range(rng.randint(1, 3)))
+        for line in _wrap(draw, paragraph, body_font, width - 2 * margin):
+            if y > height - margin * 2:
+                break
+            draw.text((margin, y), line, fill=(40, 40, 40), font=body_font)
+            drawn.append(line)
+            y += int(body_font.size * 1.4)
+        y += margin // 2
+
+    if jpeg:
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=rng.randint(60, 90))
+        buffer.seek(0)
+        image = Image.open(buffer)
+        image.load()
+    return image, "\n".join(drawn)
+
+
+def make_corpus(count: int, seed: int = 7, **kwargs) -> list:
+    rng = random.Random(seed)
+    return [make_screenshot(rng, **kwargs) for _ in range(count)]
+
+
+def accuracy(expected: str, actual: str) -> float:
+    """Character-level similarity (0..1) of whitespace-normalized, lowercased texts"""
+    import difflib
+
+    a = " ".join(expected.lower().split())
+    b = " ".join(actual.lower().split())
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
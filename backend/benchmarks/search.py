@@ -0,0 +1,166 @@
+"""
+Cost of the in-process search index (app.core.search) on 100k to 1M posts.
+
+Posts are synthetic (no database): words drawn from a Zipf distribution
+over a generated vocabulary, a title and an OCR-length content, and OCR
+noise (letters read as digits, hyphenated line breaks) on a share of them.
+Reported:
+  - build: indexing every post, and the memory the index holds
+  - snapshot: writing and loading it (what a warm start costs instead of the build)
+  - incremental: adding, editing and deleting one post
+  - query: a common word, a rare word, three words, and page 5 through the cursor
+  - scan: one word looked up in every post's text, what a LIKE '%word%' query does
+
+Run from the backend directory (PG_DB must be set, nothing is read from it):
+    python -m benchmarks.search --posts 100000 1000000
+"""
+import argparse
+import random
+import string
+import time
+import tracemalloc
+import uuid
+
+import numpy as np
+
+from app.core.search import InvertedIndex
+
+OCR_DIGITS = {"o": "0", "l": "1", "s": "5", "b": "8"}
+
+
+def make_vocabulary(rng: random.Random, size: int) -> list:
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 11))) for _ in range(size)]
+
+
+def ocr_noise(rng: random.Random, text: str, rate: float = 0.02) -> str:
+    out = []
+    for word in text.split(" "):
+        r = rng.random()
+        if r < rate:
+            word = "".join(OCR_DIGITS.get(ch, ch) for ch in word)
+        elif r < rate * 2 and len(word) > 5:
+            word = word[:3] + "-\n" + word[3:]
+        out.append(word)
+    return " ".join(out)
+
+
+def make_posts(count: int, vocabulary: list, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    title_lengths = np_rng.integers(4, 12, count)
+    content_lengths = np_rng.integers(20, 200, count)
+    words = (np_rng.zipf(1.1, int(title_lengths.sum() + content_lengths.sum())) - 1) % len(vocabulary)
+    posts, offset = [], 0
+    for i in range(count):
+        title = " ".join(vocabulary[w] for w in words[offset:offset + title_lengths[i]])
+        offset += title_lengths[i]
+        content = " ".join(vocabulary[w] for w in words[offset:offset + content_lengths[i]])
+        offset += content_lengths[i]
+        # Image posts, about a third, are OCR'd
+        if i % 3 == 0:
+            content = ocr_noise(rng, content)
+        posts.append((uuid.uuid4(), title, content))
+    return posts
+
+
+def percentiles(samples: list) -> str:
+    return f"p50 {np.percentile(samples, 50) * 1e3:8.2f} ms  p99 {np.percentile(samples, 99) * 1e3:8.2f} ms"
+
+
+def timed(function, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(count: int, vocabulary: list, page_size: int, repeat: int):
+    posts = make_posts(count, vocabulary)
+    index = InvertedIndex()
+    start = time.perf_counter()
+    for post_id, title, content in posts:
+        index.add(post_id, title, content)
+    build = time.perf_counter() - start
+
+    # Tracing slows allocations down, memory is measured on a separate build
+    sample = posts[:100_000]
+    tracemalloc.start()
+    sampled = InvertedIndex()
+    for post_id, title, content in sample:
+        sampled.add(post_id, title, content)
+    memory = tracemalloc.get_traced_memory()[0] / len(sample)
+    tracemalloc.stop()
+    del sampled
+
+    start = time.perf_counter()
+    data = index.dumps()
+    dump = time.perf_counter() - start
+    start = time.perf_counter()
+    InvertedIndex.loads(data)
+    load = time.perf_counter() - start
+    size = len(data)
+    del data
+
+    rng = random.Random(1)
+    extra = make_posts(1000, vocabulary, seed=1)
+    add_times = []
+    for post_id, title, content in extra:
+        start = time.perf_counter()
+        index.add(post_id, title, content)
+        add_times.append(time.perf_counter() - start)
+    edit_times, delete_times = [], []
+    for post_id, title, content in extra[:500]:
+        start = time.perf_counter()
+        index.add(post_id, title, content + " edited")
+        edit_times.append(time.perf_counter() - start)
+    for post_id, _, _ in extra[500:]:
+        start = time.perf_counter()
+        index.remove(post_id)
+        delete_times.append(time.perf_counter() - start)
+
+    # Word ranks: vocabulary[0] is in most posts, rank 5000 in a few hundred per million
+    common, rare = vocabulary[2], vocabulary[5000]
+    mixed = " ".join(rng.sample(vocabulary[:500], 3))
+    common_times = timed(lambda: index.search(common, None, page_size), repeat)
+    rare_times = timed(lambda: index.search(rare, None, page_size), repeat)
+    mixed_times = timed(lambda: index.search(mixed, None, page_size), repeat)
+    last = None
+    for _ in range(4):
+        _, last = index.search(common, last, page_size)
+    deep_times = timed(lambda: index.search(common, last, page_size), repeat)
+
+    # The synthetic posts are lowercase already, a real scan also pays for lower()
+    scan_times = timed(lambda: [post_id for post_id, title, content in posts if rare in title or rare in content], 3)
+
+    matches = len(index.search(common, None, count)[0])
+    print(f"{count:,} posts, {len(index._postings):,} terms, pages of {page_size}")
+    print(f"  build           {build:8.2f} s     {count / build:,.0f} posts/s")
+    print(f"  memory          {memory:8.0f} bytes/post ({memory * count / 2**20:,.0f} MiB)")
+    print(f"  snapshot        write {dump:6.2f} s  load {load:6.2f} s  {size / 2**20:,.0f} MiB")
+    print(f"  add             {percentiles(add_times)}")
+    print(f"  edit            {percentiles(edit_times)}")
+    print(f"  delete          {percentiles(delete_times)}")
+    print(f"  common word     {percentiles(common_times)}  ({matches:,} matches)")
+    print(f"  rare word       {percentiles(rare_times)}")
+    print(f"  three words     {percentiles(mixed_times)}")
+    print(f"  common, page 5  {percentiles(deep_times)}")
+    print(f"  scan            {percentiles(scan_times)}  (substring search of every post)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--vocabulary", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    vocabulary = make_vocabulary(random.Random(0), args.vocabulary)
+    for count in args.posts:
+        run(count, vocabulary, args.page_size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,8 @@ export interface Post {
   title: string;
   content: string;
   imageUrl?: string;
+  // srcSet strings for the thumbnail renditions, keyed by format
+  imageSources?: { webp: string; avif?: string };
   likes: number;
   dislikes: number;
   comments: Comment[];
@@ -3,6 +3,10 @@ import { motion } from "motion/react";
 import { PostCard } from "./PostCard";
 import type { Post, User } from "../App";
 import { getApiUrl, getApiEndpoint } from "../utils/api";
+import { Button } from "./ui/button";
+
+// Posts per feed page (the API caps it at 100)
+const PAGE_SIZE = 20;
 
 interface CommunityPageProps {
   posts: Post[];
@@ -18,13 +22,21 @@ export function CommunityPage({
   const [fetchedPosts, setFetchedPosts] = useState<Post[]>([]);
   const [loading, setLoading] = useState<boolean>(false);
   const [error, setError] = useState<string | null>(null);
+  // Cursor of the next page, null once the last page is loaded
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
-  const fetchPosts = async () => {
+  // Fetches the first page, or the page after `cursor` and appends it
+  const fetchPosts = async (cursor?: string) => {
     setLoading(true);
     setError(null);
 
     try {
-      const response = await fetch(getApiEndpoint("/api/v1/posts"), {
+      // Ranked by votes, credibility and age
+      const params = new URLSearchParams({ limit: String(PAGE_SIZE), sort: "hot" });
+      if (cursor) {
+        params.set("cursor", cursor);
+      }
+      const response = await fetch(getApiEndpoint(`/api/v1/posts?${params}`), {
         method: "GET",
         headers: {
           "Authorization": `Bearer ${localStorage.getItem("access_token")}`,
@@ -39,7 +51,7 @@ export function CommunityPage({
       const data = await response.json();
 
       // Transform backend posts to match frontend Post interface
-      const transformedPosts: Post[] = data.map((post: any) => {
+      const transformedPosts: Post[] = data.items.map((post: any) => {
         // Convert UUIDs to strings
         const postId = typeof post.id === 'string' ? post.id : post.id.toString();
         const userId = typeof post.user_id === 'string' ? post.user_id : post.user_id.toString();
@@ -47,6 +59,7 @@ export function CommunityPage({
         // Determine post type based on content
         let postType: "url" | "text" | "image" = "text";
         let imageUrl: string | undefined = undefined;
+        let imageSources: Post["imageSources"] = undefined;
         let contentValue: string = post.content || "";
         
         if (post.url) {
@@ -56,6 +69,15 @@ export function CommunityPage({
             // Construct full URL to backend
             imageUrl = `${getApiUrl()}${post.url}`;
             contentValue = post.content || ""; // Use extracted text content
+            // Feed cards load the thumbnails, the original is only the fallback
+            if (post.renditions) {
+              const srcSet = (format: string) =>
+                `${getApiUrl()}${post.renditions.thumb[format]} 1x, ${getApiUrl()}${post.renditions.card[format]} 2x`;
+              imageSources = {
+                webp: srcSet("webp"),
+                avif: post.renditions.thumb.avif ? srcSet("avif") : undefined,
+              };
+            }
           } else {
             const imagePattern = /\.(jpg|jpeg|png|gif|webp|svg)$/i;
             if (imagePattern.test(post.url)) {
@@ -79,6 +101,7 @@ export function CommunityPage({
           title: post.title,
           content: contentValue,
           imageUrl: imageUrl,
+          imageSources: imageSources,
           likes: post.likes || 0,
           dislikes: post.dislikes || 0,
           comments: [], // Comments not yet implemented in backend
@@ -88,7 +111,15 @@ export function CommunityPage({
         };
       });
       
-      setFetchedPosts(transformedPosts);
+      // A post whose rank changed since the previous page can come back, keep the first copy
+      setFetchedPosts((previous) => {
+        if (!cursor) {
+          return transformedPosts;
+        }
+        const seen = new Set(previous.map((post) => post.id));
+        return [...previous, ...transformedPosts.filter((post) => !seen.has(post.id))];
+      });
+      setNextCursor(data.next_cursor ?? null);
     } catch (err: any) {
       console.error("Error fetching posts:", err);
       setError("Failed to load posts. Please try again later.");
@@ -119,13 +150,6 @@ export function CommunityPage({
           </p>
         </motion.div>
 
-        {/* Loading State */}
-        {loading && (
-          <div className="text-center text-gray-500 dark:text-gray-400 py-6">
-            Loading posts...
-          </div>
-        )}
-
         {/* Error State */}
         {error && (
           <div className="text-center text-red-500 dark:text-red-400 py-6">
@@ -133,15 +157,15 @@ export function CommunityPage({
           </div>
         )}
 
-        {/* Posts */}
-        {!loading && !error && (
+        {/* Posts (kept on screen while the next page loads) */}
+        {!error && (
           <div className="space-y-4">
             {fetchedPosts.map((post, i) => (
               <motion.div
                 key={post.id}
                 initial={{ opacity: 0, y: 20 }}
                 animate={{ opacity: 1, y: 0 }}
-                transition={{ duration: 0.5, delay: i * 0.1 }}
+                transition={{ duration: 0.5, delay: (i % PAGE_SIZE) * 0.1 }}
               >
                 <PostCard
                   post={post}
@@ -151,7 +175,7 @@ export function CommunityPage({
               </motion.div>
             ))}
 
-            {fetchedPosts.length === 0 && (
+            {fetchedPosts.length === 0 && !loading && (
               <div className="text-center py-12">
                 <p className="text-gray-500 dark:text-gray-400">
                   No posts yet. Be the first to verify something!
@@ -160,6 +184,21 @@ export function CommunityPage({
             )}
           </div>
         )}
+
+        {/* Loading State */}
+        {loading && (
+          <div className="text-center text-gray-500 dark:text-gray-400 py-6">
+            Loading posts...
+          </div>
+        )}
+
+        {!loading && !error && nextCursor && (
+          <div className="text-center py-6">
+            <Button variant="outline" onClick={() => fetchPosts(nextCursor)}>
+              Load more
+            </Button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -18,6 +18,7 @@ import { Badge } from "./ui/badge";
 import { Textarea } from "./ui/textarea";
 import { CommentCard } from "./CommentCard";
 import type { Post, User, Comment } from "../App";
+import { getApiEndpoint } from "../utils/api";
 
 interface PostCardProps {
   post: Post;
@@ -31,6 +32,32 @@ export function PostCard({ post, currentUser, onUpdatePost }: PostCardProps) {
   const [likes, setLikes] = useState(post.likes);
   const [dislikes, setDislikes] = useState(post.dislikes);
   const [comments, setComments] = useState(post.comments);
+  const [reaction, setReaction] = useState<"like" | "dislike" | null>(null);
+
+  // One reaction per user, clicking the active one takes it back
+  const handleReaction = async (value: "like" | "dislike") => {
+    const removing = reaction === value;
+    try {
+      const response = await fetch(getApiEndpoint(`/api/v1/posts/${post.id}/reaction`), {
+        method: removing ? "DELETE" : "PUT",
+        headers: {
+          "Content-Type": "application/json",
+          "Authorization": `Bearer ${localStorage.getItem("access_token")}`,
+        },
+        body: removing ? undefined : JSON.stringify({ reaction: value }),
+      });
+      if (!response.ok) {
+        throw new Error(`Failed to react: ${response.status}`);
+      }
+      const counts = await response.json();
+      setLikes(counts.likes);
+      setDislikes(counts.dislikes);
+      setReaction(counts.reaction);
+      onUpdatePost({ ...post, likes: counts.likes, dislikes: counts.dislikes });
+    } catch (err) {
+      console.error("Error reacting to post:", err);
+    }
+  };
 
   const handleAddComment = () => {
     if (commentText.trim() && currentUser) {
@@ -154,15 +181,25 @@ export function PostCard({ post, currentUser, onUpdatePost }: PostCardProps) {
             <div className="space-y-3">
               {/* Display the image */}
               <div className="rounded-lg overflow-hidden border border-gray-200 dark:border-gray-700">
-                <img
-                  src={post.imageUrl}
-                  alt={post.title}
-                  className="w-full h-auto max-h-96 object-contain"
-                  onError={(e) => {
-                    // Fallback if image fails to load
-                    console.error("Failed to load image:", post.imageUrl);
-                  }}
-                />
+                <picture>
+                  {post.imageSources?.avif && (
+                    <source type="image/avif" srcSet={post.imageSources.avif} />
+                  )}
+                  {post.imageSources && (
+                    <source type="image/webp" srcSet={post.imageSources.webp} />
+                  )}
+                  <img
+                    src={post.imageUrl}
+                    alt={post.title}
+                    loading="lazy"
+                    decoding="async"
+                    className="w-full h-auto max-h-96 object-contain"
+                    onError={(e) => {
+                      // Fallback if image fails to load
+                      console.error("Failed to load image:", post.imageUrl);
+                    }}
+                  />
+                </picture>
               </div>
               {/* Display extracted text content if available */}
               {post.content && post.content.trim() && (
@@ -182,23 +219,17 @@ export function PostCard({ post, currentUser, onUpdatePost }: PostCardProps) {
         {/* Interaction Buttons */}
         <div className="flex items-center gap-2 pt-2 border-t border-gray-200 dark:border-gray-700">
           <Button
-            variant="ghost"
+            variant={reaction === "like" ? "secondary" : "ghost"}
             size="sm"
-            onClick={() => {
-              setLikes(likes + 1);
-              onUpdatePost({ ...post, likes: likes + 1 });
-            }}
+            onClick={() => handleReaction("like")}
           >
             <ThumbsUp className="size-4 mr-1" />
             {likes}
           </Button>
           <Button
-            variant="ghost"
+            variant={reaction === "dislike" ? "secondary" : "ghost"}
             size="sm"
-            onClick={() => {
-              setDislikes(dislikes + 1);
-              onUpdatePost({ ...post, dislikes: dislikes + 1 });
-            }}
+            onClick={() => handleReaction("dislike")}
           >
             <ThumbsDown className="size-4 mr-1" />
             {dislikes}